@@ -0,0 +1,110 @@
+"""Signal backtest over multi-year synthetic histories
+
+Usage: python main/benchmarks/bench_backtest.py [--symbols 500] [--years 5]
+Exits non-zero if the backtest's signals on the last bar differ from what IndicatorEngine reports,
+if its hit rates differ from a per-bar loop over a few symbols, or if its basket drawdown differs
+from a per-date loop.
+"""
+import argparse, os, sys, time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from indicator_engine import IndicatorEngine
+from signal_backtest import SIGNALS, SignalBacktest
+from fakes import synthetic_ohlcv
+
+# Last-bar signal of the backtest -> (indicator, signal value) in the technical analysis dict
+REPORTED = {
+    'sma_bullish': ('sma', 'sma_trend', 'bullish'), 'sma_bearish': ('sma', 'sma_trend', 'bearish'),
+    'rsi_oversold': ('rsi', 'signal', 'oversold'), 'rsi_overbought': ('rsi', 'signal', 'overbought'),
+    'macd_bullish': ('macd', 'signal', 'bullish'),
+    'bb_upper_touch': ('bollinger_bands', 'signal', 'upper_touch'), 'bb_lower_touch': ('bollinger_bands', 'signal', 'lower_touch'),
+}
+
+def loop_hit_rate(close, active, horizon, direction):
+    """Reference hit rate for one symbol, one bar at a time"""
+    hits = total = 0
+    for t in range(len(close) - horizon):
+        if active[t] and not np.isnan(close[t + horizon]):
+            total += 1
+            hits += (close[t + horizon] / close[t] - 1) * direction > 0
+    return hits / total if total else None
+
+def loop_strategy_drawdown(closes, backtest, name, direction):
+    """Reference basket drawdown, one calendar date at a time, from each symbol's own gap-free series"""
+    held_on, prices = {}, closes.ffill()
+    for symbol in closes.columns:
+        own = closes[symbol].dropna()
+        active = backtest.signals(own.to_frame().reset_index(drop=True))[name][:, 0]
+        # Held from each of its bars until its next one, never past its last
+        held_on[symbol] = pd.Series(active, index=own.index).reindex(closes.index).ffill().fillna(False).astype(bool)
+        held_on[symbol][closes.index >= own.index[-1]] = False
+    equity = peak = 1.0
+    worst = 0.0
+    for t in range(len(closes.index) - 1):
+        moves = [(prices[symbol].iloc[t + 1] / prices[symbol].iloc[t] - 1) * direction
+                 for symbol in closes.columns if held_on[symbol].iloc[t] and not np.isnan(prices[symbol].iloc[t])]
+        equity *= 1 + (sum(moves) / len(moves) if moves else 0.0)
+        peak = max(peak, equity)
+        worst = min(worst, equity / peak - 1)
+    return worst
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--years', type=float, default=5)
+    args = parser.parse_args()
+
+    end = datetime.now()
+    start = end - timedelta(days=round(365.25 * args.years))
+    closes = pd.DataFrame({f"SYM{i:05d}": synthetic_ohlcv(f"SYM{i:05d}", start, end)['Close'] for i in range(args.symbols)})
+    # Every third symbol stands in for a TSX listing, closed on its own holidays in the shared date index
+    closes.iloc[::37, ::3] = np.nan
+    backtest = SignalBacktest('5,20')
+
+    begin = time.perf_counter()
+    results = backtest.run(closes)
+    seconds = time.perf_counter() - begin
+    print(f"{results['symbols']} symbols x {results['bars']} bars: {seconds:.2f}s "
+          f"({results['symbols'] * results['bars'] / seconds / 1e6:.1f}M bars/s)")
+    for name, stats in results['signals'].items():
+        scores = stats['horizons'][20]
+        if scores['occurrences']:
+            print(f"  {name:20} {scores['occurrences']:8} signals, hit rate {scores['hit_rate'] * 100:5.1f}%, "
+                  f"avg 20-bar return {scores['avg_forward_return'] * 100:6.2f}%, strategy drawdown {stats['strategy_drawdown'] * 100:6.1f}%")
+
+    failed = False
+    close = IndicatorEngine.align_right(closes)
+    signals = backtest.signals(close)
+    reported = IndicatorEngine().compute(closes, start, end)
+    for name, (indicator, field, value) in REPORTED.items():
+        expected = np.array([reported[symbol][indicator][field] == value for symbol in closes.columns])
+        if not np.array_equal(signals[name][-1], expected):
+            print(f"MISMATCH: last-bar {name} differs from IndicatorEngine")
+            failed = True
+
+    single = SignalBacktest('20').run(closes.iloc[:, :3])
+    prices = IndicatorEngine.align_right(closes.iloc[:, :3]).to_numpy()
+    single_signals = backtest.signals(IndicatorEngine.align_right(closes.iloc[:, :3]))
+    for name, stats in single['signals'].items():
+        active = single_signals[name]
+        for j in range(3):
+            per_symbol = SignalBacktest('20').run(closes.iloc[:, [j]])['signals'][name]['horizons'][20]['hit_rate']
+            expected = loop_hit_rate(prices[:, j], active[:, j], 20, stats['direction'])
+            if (per_symbol is None) != (expected is None) or (expected is not None and not np.isclose(per_symbol, expected)):
+                print(f"MISMATCH: {name} hit rate for column {j}: {per_symbol} vs {expected}")
+                failed = True
+    subset = closes.iloc[:, :6]
+    for name in ('sma_bullish', 'macd_bearish'):
+        got = SignalBacktest('20').run(subset)['signals'][name]['strategy_drawdown']
+        expected = loop_strategy_drawdown(subset, backtest, name, SIGNALS[name])
+        if not np.isclose(got, expected):
+            print(f"MISMATCH: {name} strategy drawdown {got} vs {expected} by date")
+            failed = True
+    print("parity: " + ("FAILED" if failed else "ok"))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
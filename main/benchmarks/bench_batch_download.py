@@ -0,0 +1,38 @@
+"""Serial vs. batched price download through TechnicalAnalysis, against a stubbed yf.download
+
+Usage: python main/benchmarks/bench_batch_download.py [num_symbols]
+"""
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.makedirs('logs', exist_ok=True)
+
+import settings, technical_analysis
+from technical_analysis import TechnicalAnalysis
+from fakes import FakeDownload
+
+# Measure the network path only, not the on-disk price cache
+settings.PRICE_CACHE_PATH = ""
+
+def run(symbols, batched):
+    fake = FakeDownload()
+    technical_analysis.yf.download = fake
+    analysis = TechnicalAnalysis()
+    start = time.perf_counter()
+    if batched:
+        analysis.prefetch_prices(symbols)
+    for symbol in symbols:
+        analysis.technical_analysis(symbol)
+    return time.perf_counter() - start, fake.calls
+
+def main():
+    num_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    symbols = [f"SYM{i:04d}" for i in range(num_symbols)]
+    serial_time, serial_calls = run(symbols, batched=False)
+    batched_time, batched_calls = run(symbols, batched=True)
+    print(f"{num_symbols} symbols")
+    print(f"serial:  {serial_time:8.2f}s  {serial_calls} download calls")
+    print(f"batched: {batched_time:8.2f}s  {batched_calls} download calls")
+    print(f"speedup: {serial_time / batched_time:8.2f}x")
+
+if __name__ == "__main__":
+    main()
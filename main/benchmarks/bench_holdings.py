@@ -0,0 +1,51 @@
+"""Serial vs. concurrent Authentication.get_holdings against a fake WSTrade with injected latency
+
+Usage: python main/benchmarks/bench_holdings.py [num_accounts] [latency_seconds]
+"""
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.makedirs('logs', exist_ok=True)
+
+import settings
+from authentication import Authentication, position_record
+from fakes import FakeWSTrade
+
+def serial_holdings(ws):
+    """The previous one-account-at-a-time fetch, for comparison"""
+    positions_by_account = {}
+    for account in ws.get_accounts():
+        positions_by_account[account['id']] = [position_record(position, account['id']) for position in ws.get_positions(id=account['id'])]
+    return positions_by_account
+
+def main():
+    num_accounts = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    kinds = ('tfsa', 'rrsp', 'fhsa', 'non-registered', 'crypto')
+    accounts = [f"{kinds[i % len(kinds)]}-{i}" for i in range(num_accounts)]
+    settings.HOLDINGS_CONCURRENCY = str(num_accounts)
+
+    start = time.perf_counter()
+    serial = serial_holdings(FakeWSTrade(accounts=accounts, latency=latency))
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    holdings = Authentication(ws=FakeWSTrade(accounts=accounts, latency=latency)).get_holdings()
+    concurrent_time = time.perf_counter() - start
+
+    # One flaky account (recovers on retry) and one that never answers within the timeout
+    settings.HOLDINGS_TIMEOUT_SECONDS = str(latency * 3)
+    ws = FakeWSTrade(accounts=accounts, latency=latency, failing=accounts[:1], hanging=accounts[-1:], hang_seconds=latency * 10)
+    start = time.perf_counter()
+    partial = Authentication(ws=ws).get_holdings()
+    partial_time = time.perf_counter() - start
+
+    positions = sum(len(records) for records in holdings.positions.values())
+    print(f"{num_accounts} accounts, {latency:.2f}s per request")
+    print(f"serial:     {serial_time:8.2f}s  ({sum(len(records) for records in serial.values())} positions)")
+    print(f"concurrent: {concurrent_time:8.2f}s  ({positions} positions, concurrency {settings.HOLDINGS_CONCURRENCY})")
+    print(f"speedup:    {serial_time / concurrent_time:8.2f}x")
+    print(f"with a flaky and a hung account: {partial_time:.2f}s, {sum(len(records) for records in partial.positions.values())} positions fetched, "
+          f"failures: {partial.failures}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Per-symbol technical_analysis (full, latest-only and streaming modes) vs. the panel IndicatorEngine: timing and result parity
+
+Usage: python main/benchmarks/bench_indicator_engine.py [num_symbols]
+Exits non-zero if any symbol's results differ between the paths, or if a run whose downloads all
+fail does not report "No historical data available" for each symbol.
+"""
+import math, os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.makedirs('logs', exist_ok=True)
+
+import settings, technical_analysis
+from technical_analysis import TechnicalAnalysis
+from streaming_indicators import StreamingIndicators
+from fakes import FakeDownload
+
+settings.PRICE_CACHE_PATH = ""
+
+def same(a, b):
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, str) or isinstance(b, str) or a is None or b is None:
+        return a == b
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+def main():
+    num_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    # Every third symbol is a TSX listing so it can get its own holiday gaps below
+    symbols = [f"SYM{i:04d}" + ('.TO' if i % 3 == 0 else '') for i in range(num_symbols)]
+    technical_analysis.yf.download = FakeDownload(0, 0)
+    analysis = TechnicalAnalysis()
+    analysis.prefetch_prices(symbols)
+    # Short listing histories and exchange holidays so the panel has ragged, gappy columns
+    for j, symbol in enumerate(symbols[:num_symbols // 4]):
+        analysis.price_data.loc[analysis.price_data.index[:j % 260], symbol] = float('nan')
+    tsx = [s for s in symbols if s.endswith('.TO')]
+    analysis.price_data.loc[analysis.price_data.index[::37], tsx] = float('nan')
+
+    start = time.perf_counter()
+    per_symbol = {symbol: analysis.technical_analysis(symbol) for symbol in symbols}
+    per_symbol_time = time.perf_counter() - start
+
+    settings.INDICATOR_MODE = 'latest'
+    start = time.perf_counter()
+    latest = {symbol: analysis.technical_analysis(symbol) for symbol in symbols}
+    latest_time = time.perf_counter() - start
+    # Streaming from scratch builds the state once; the timed run resumes it with no new bars
+    settings.INDICATOR_MODE = 'streaming'
+    settings.INDICATOR_STATE_DIR = os.path.join('cache', 'bench_indicator_state')
+    for symbol in symbols:
+        analysis.technical_analysis(symbol)
+    start = time.perf_counter()
+    streaming = {symbol: analysis.technical_analysis(symbol) for symbol in symbols}
+    streaming_time = time.perf_counter() - start
+    settings.INDICATOR_MODE = 'full'
+
+    start = time.perf_counter()
+    panel = analysis.engine.compute(analysis.close_matrix(symbols), analysis.start_date, analysis.end_date, analysis.indicator_names)
+    panel_time = time.perf_counter() - start
+
+    # The mode must reach analyze_performance too, where the panel engine would otherwise answer first
+    positions = {'TFSA': [{'symbol': symbol.removesuffix('.TO'), 'exchange': 'TSX' if symbol.endswith('.TO') else 'NYSE'} for symbol in symbols]}
+    routed = {}
+    for mode in ('latest', 'streaming'):
+        settings.INDICATOR_MODE = mode
+        calls = []
+        analysis.technical_analysis = lambda symbol, compute=analysis.technical_analysis: calls.append(symbol) or compute(symbol)
+        results = analysis.analyze_performance(positions, research=False)
+        del analysis.technical_analysis
+        routed[mode] = {entry['yf_symbol']: entry['technical_analysis'] for entry in results['TFSA'].values()}
+        if len(calls) != len(symbols):
+            print(f"{mode} mode: analyze_performance ran {len(calls)} of {len(symbols)} symbols through the {mode} path")
+            routed[mode] = {}
+    settings.INDICATOR_MODE = 'full'
+
+    # Revising today's bar in place must give what feeding the final bar in the first place does
+    revision_mismatches = []
+    for symbol in symbols[-20:]:
+        close = analysis.get_price_data(symbol)['Close'].dropna()
+        final = (close.index[-1], close.iloc[-1] * 0.97)
+        revised, direct = StreamingIndicators(), StreamingIndicators()
+        for bar in close.items():
+            revised.update(bar)
+        for bar in list(close.items())[:-1] + [final]:
+            direct.update(bar)
+        revised.update((close.index[-1], close.iloc[-1] * 1.05))
+        revised.update(final)
+        if not same(revised.result(analysis.start_date, analysis.end_date), direct.result(analysis.start_date, analysis.end_date)):
+            revision_mismatches.append(symbol)
+
+    # With every download failing there are no rows at all; each symbol reports the error instead of the run aborting
+    def failing_download(*args, **kwargs):
+        raise ConnectionError("download failed")
+    technical_analysis.yf.download = failing_download
+    offline = TechnicalAnalysis().analyze_performance({'TFSA': positions['TFSA'][:10]}, research=False)
+    empty_ok = [entry['technical_analysis'] for entry in offline['TFSA'].values()] == [{"error": "No historical data available"}] * 10
+
+    mismatches = [symbol for symbol in symbols if not (same(per_symbol[symbol], panel[symbol]) and same(per_symbol[symbol], latest[symbol])
+                                                 and same(per_symbol[symbol], streaming[symbol])
+                                                 and all(same(per_symbol[symbol], results.get(symbol)) for results in routed.values()))]
+    print(f"{num_symbols} symbols, rsi_smoothing={settings.RSI_SMOOTHING}")
+    print(f"per-symbol: {per_symbol_time:8.3f}s")
+    print(f"latest:     {latest_time:8.3f}s  ({per_symbol_time / latest_time:.1f}x)")
+    print(f"streaming:  {streaming_time:8.3f}s  ({per_symbol_time / streaming_time:.1f}x, resumed state)")
+    print(f"panel:      {panel_time:8.3f}s  ({per_symbol_time / panel_time:.1f}x)")
+    print(f"parity:     {'OK' if not mismatches else f'{len(mismatches)} mismatches, e.g. {mismatches[:5]}'}")
+    print(f"revision:   {'OK' if not revision_mismatches else f'{len(revision_mismatches)} mismatches, e.g. {revision_mismatches[:5]}'}")
+    print(f"no data:    {'OK' if empty_ok else 'FAILED'}")
+    sys.exit(1 if mismatches or revision_mismatches or not empty_ok else 0)
+
+if __name__ == "__main__":
+    main()
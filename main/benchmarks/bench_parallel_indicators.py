@@ -0,0 +1,66 @@
+"""Scaling of sharded indicator math across worker processes on a synthetic universe
+
+Usage: python main/benchmarks/bench_parallel_indicators.py [--symbols 5000] [--workers 1,2,4,8] [--per-symbol]
+Exits non-zero if any worker count gives results that differ from the in-process computation.
+"""
+import argparse, os, sys, time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import pandas as pd
+from indicator_engine import IndicatorEngine
+from indicator_registry import REGISTRY
+from parallel_indicators import ShardedIndicators, _compute_shard
+from bench_indicator_engine import same
+from fakes import synthetic_ohlcv
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= max(2, os.cpu_count() or 1)))
+    parser.add_argument('--per-symbol', action='store_true', help="Shard the per-symbol registry functions instead of the panel engine")
+    args = parser.parse_args()
+
+    end = datetime.now()
+    start = end - timedelta(days=365)
+    closes = pd.DataFrame({f"SYM{i:05d}": synthetic_ohlcv(f"SYM{i:05d}", start, end)['Close'] for i in range(args.symbols)})
+    names = list(REGISTRY)
+    mode = 'per-symbol' if args.per_symbol else 'panel'
+
+    begin = time.perf_counter()
+    if args.per_symbol:
+        # The same worker function, run in this process over all columns
+        baseline = _compute_shard_local(closes, start, end, names)
+    else:
+        baseline = IndicatorEngine().compute(closes, start, end, set(names))
+    baseline_time = time.perf_counter() - begin
+    print(f"{args.symbols} symbols x {len(closes)} days, {mode}, {os.cpu_count()} CPUs")
+    print(f"in-process:  {baseline_time:8.2f}s")
+
+    mismatched = False
+    for workers in (int(n) for n in args.workers.split(',')):
+        sharded = ShardedIndicators(workers)
+        sharded.compute(closes.iloc[:, :workers], start, end, names, per_symbol=args.per_symbol)  # start the pool
+        begin = time.perf_counter()
+        results = sharded.compute(closes, start, end, names, per_symbol=args.per_symbol)
+        seconds = time.perf_counter() - begin
+        sharded.close()
+        ok = list(results) == list(baseline) and all(same(results[s], baseline[s]) for s in baseline)
+        mismatched |= not ok
+        print(f"{workers:2d} workers:  {seconds:8.2f}s  {baseline_time / seconds:5.2f}x  {'parity ok' if ok else 'MISMATCH'}")
+    sys.exit(1 if mismatched else 0)
+
+def _compute_shard_local(closes, start, end, names):
+    from multiprocessing import shared_memory
+    import numpy as np
+    values = np.ascontiguousarray(closes.to_numpy(dtype=float))
+    shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    try:
+        np.ndarray(values.shape, dtype=float, buffer=shm.buf)[:] = values
+        return _compute_shard(shm.name, values.shape, 0, values.shape[1], list(closes.columns), start, end, names, True, False)
+    finally:
+        shm.close()
+        shm.unlink()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Portfolio risk analytics at growing holding counts, checked against a dense covariance computation
+
+Usage: python main/benchmarks/bench_portfolio_risk.py [--sizes 100,1000,5000] [--accounts 5] [--days 365]
+Exits non-zero if volatility or risk contributions differ from the np.cov based reference.
+"""
+import argparse, os, sys, time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from portfolio_risk import PortfolioRisk, returns_matrix
+from fakes import synthetic_ohlcv
+
+def reference(closes, holdings):
+    """Total-portfolio volatility and variance shares from the full np.cov matrix"""
+    returns = returns_matrix(closes)
+    values = pd.Series(dict((symbol, 0.0) for symbol in closes.columns))
+    for _, symbol, value in holdings:
+        values[symbol] += value
+    weights = values.to_numpy() / values.sum()
+    covariance = np.cov(returns, rowvar=False)
+    variance = weights @ covariance @ weights
+    return np.sqrt(variance), dict(zip(closes.columns, weights * (covariance @ weights) / variance))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,5000')
+    parser.add_argument('--accounts', type=int, default=5)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--check-up-to', type=int, default=2000, help="Largest size to compare against np.cov")
+    args = parser.parse_args()
+
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+    failed = False
+    for size in (int(size) for size in args.sizes.split(',')):
+        symbols = [f"SYM{i:05d}" for i in range(size)]
+        closes = pd.DataFrame({symbol: synthetic_ohlcv(symbol, start, end)['Close'] for symbol in symbols})
+        rng = np.random.default_rng(size)
+        holdings = [(f"ACCOUNT{i % args.accounts}", symbol, float(rng.uniform(100, 10_000))) for i, symbol in enumerate(symbols)]
+
+        begin = time.perf_counter()
+        risk = PortfolioRisk().analyze(closes, holdings)
+        seconds = time.perf_counter() - begin
+        total = risk['portfolios']['Total']
+        print(f"{size:6} holdings x {risk['observations']} days: {seconds:7.3f}s, volatility {total['volatility_annual'] * 100:.2f}%, "
+              f"VaR {total['var_historical'] * 100:.2f}%, CVaR {total['cvar_historical'] * 100:.2f}%")
+        if size <= args.check_up_to:
+            volatility, shares = reference(closes, holdings)
+            ok = np.isclose(total['volatility_daily'], volatility) and all(
+                np.isclose(holding['contribution'], shares[holding['symbol']]) for holding in total['risk_contributions'])
+            print(f"{'':6} matches np.cov: {ok}")
+            failed |= not ok
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
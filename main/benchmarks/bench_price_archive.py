@@ -0,0 +1,117 @@
+"""Read throughput of the memory-mapped price archive against CSV, Parquet and the SQLite price cache
+
+Usage: python main/benchmarks/bench_price_archive.py [--symbols 500] [--years 10] [--window-days 365]
+Parquet is included when pyarrow or fastparquet is installed. Exits non-zero if any format reads back
+different bars than the archive, or if appending to the archive loses or changes archived bars.
+"""
+import argparse, os, sys, tempfile, time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from price_archive import PriceArchive
+from price_cache import COLUMNS, PriceCache
+from fakes import synthetic_ohlcv
+
+def parquet_engine():
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return engine
+        except ImportError:
+            pass
+    return None
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--window-days', type=int, default=365, help="Size of the recent window read in the second pass")
+    args = parser.parse_args()
+
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=round(365.25 * args.years))
+    window_start = end - timedelta(days=args.window_days)
+    symbols = [f"SYM{i:05d}" for i in range(args.symbols)]
+    engine = parquet_engine()
+
+    with tempfile.TemporaryDirectory() as work:
+        dirs = {name: os.path.join(work, name) for name in ('csv', 'parquet', 'sqlite', 'archive', 'archive32')}
+        for path in dirs.values():
+            os.makedirs(path)
+        archive = PriceArchive(dirs['archive'], dtype='float64')
+        archive32 = PriceArchive(dirs['archive32'], dtype='float32')
+        cache = PriceCache(os.path.join(dirs['sqlite'], 'prices.sqlite'), ttl_hours=1e6, max_symbols=len(symbols))
+        rows = 0
+        for symbol in symbols:
+            frame = synthetic_ohlcv(symbol, start, end)
+            rows += len(frame)
+            frame.to_csv(os.path.join(dirs['csv'], f"{symbol}.csv"))
+            if engine:
+                frame.to_parquet(os.path.join(dirs['parquet'], f"{symbol}.parquet"), engine=engine)
+            cache.store(symbol, frame, start)
+            archive.store(symbol, frame, start)
+            archive32.store(symbol, frame, start)
+        print(f"{len(symbols)} symbols, {rows} bars ({rows // len(symbols)} per symbol), parquet engine: {engine or 'not installed'}")
+
+        def window(frame):
+            return frame[frame.index >= pd.Timestamp(window_start)]
+        readers = {
+            'csv': lambda symbol, since: window(pd.read_csv(os.path.join(dirs['csv'], f"{symbol}.csv"), index_col='Date', parse_dates=True))
+                   if since else pd.read_csv(os.path.join(dirs['csv'], f"{symbol}.csv"), index_col='Date', parse_dates=True),
+            'sqlite': lambda symbol, since: cache.load(symbol, since or start, end),
+            'archive (DataFrame)': lambda symbol, since: archive.load(symbol, since, end),
+            'archive (close view)': lambda symbol, since: archive.window(symbol, since, end)[1][:, COLUMNS.index('Close')],
+            'archive float32': lambda symbol, since: archive32.load(symbol, since, end),
+        }
+        if engine:
+            readers['parquet'] = lambda symbol, since: (window if since else (lambda frame: frame))(
+                pd.read_parquet(os.path.join(dirs['parquet'], f"{symbol}.parquet"), engine=engine))
+        sizes = {'csv': dirs['csv'], 'parquet': dirs['parquet'], 'sqlite': dirs['sqlite'],
+                 'archive (DataFrame)': dirs['archive'], 'archive (close view)': dirs['archive'], 'archive float32': dirs['archive32']}
+
+        failed = False
+        reference = {symbol: archive.load(symbol, window_start, end) for symbol in symbols[:5]}
+        print(f"{'format':22} {'disk MB':>8} {'full s':>8} {'bars/s':>12} {'window s':>9} {'bars/s':>12}")
+        for name, read in readers.items():
+            timings = []
+            for since in (None, window_start):
+                begin = time.perf_counter()
+                bars = sum(len(read(symbol, since)) for symbol in symbols)
+                timings.append((time.perf_counter() - begin, bars))
+            print(f"{name:22} {directory_mb(sizes[name]):8.1f} " + " ".join(f"{seconds:8.3f}s {bars / seconds:12,.0f}" for seconds, bars in timings))
+            if name in ('csv', 'sqlite', 'parquet'):
+                for symbol, expected in reference.items():
+                    got = read(symbol, window_start)[COLUMNS]
+                    if not np.allclose(got.to_numpy(dtype=float), expected.to_numpy(), rtol=1e-12, equal_nan=True):
+                        print(f"MISMATCH: {name} {symbol}")
+                        failed = True
+
+        begin = time.perf_counter()
+        for symbol in symbols:
+            archive.append(symbol, synthetic_ohlcv(symbol, end, end + timedelta(days=3)))
+        print(f"appending ~3 new bars to each symbol in place: {time.perf_counter() - begin:.3f}s")
+
+        # A refresh that revises the last bar, or skips archived days, must keep every archived row,
+        # and a reader still mapping the files must see its old bars
+        symbol = symbols[0]
+        before = archive.load(symbol).copy()
+        mapped = archive.window(symbol)[1]
+        revised = before.iloc[[-1]] * 1.01
+        archive.append(symbol, revised)
+        gappy = pd.concat([before.iloc[[-10, -2]], synthetic_ohlcv(symbol, end + timedelta(days=4), end + timedelta(days=8))])
+        archive.append(symbol, gappy)
+        after = archive.load(symbol)
+        expected = pd.concat([before.iloc[:-1], revised, gappy.loc[gappy.index > before.index[-1]]])
+        if not (after.index.equals(expected.index) and np.allclose(after.to_numpy(), expected.to_numpy(), equal_nan=True)
+                and np.array_equal(np.asarray(mapped[:-1]), before.to_numpy(dtype=archive.dtype)[:-1])):
+            print(f"MISMATCH: appending to {symbol} lost or changed archived bars")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
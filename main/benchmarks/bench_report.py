@@ -0,0 +1,54 @@
+"""Report rendering: whole-document string concatenation vs. streaming sections to a buffered file
+
+Usage: python main/benchmarks/bench_report.py [num_positions]
+"""
+import os, sys, tempfile, time, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.makedirs('logs', exist_ok=True)
+
+from report import ReportGenerator
+from fakes import synthetic_analysis_results
+
+def concatenated(report, analysis_results, output_file):
+    """The previous implementation: grow one string with += and write it at the end"""
+    html_content = ""
+    for chunk in report.render(analysis_results):
+        html_content += chunk
+    with open(output_file, 'w') as f:
+        f.write(html_content)
+
+def streamed(report, analysis_results, output_file):
+    report.generate_report(output_file, analysis_results)
+
+def measure(fn, report, analysis_results, output_file):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(report, analysis_results, output_file)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    num_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    analysis_results = synthetic_analysis_results(num_positions)
+    # Symbols listed for less than 200 trading days have no SMA 200, and a few none of their other indicators either
+    for i, analysis in enumerate(position for positions in analysis_results.values() for position in positions.values()):
+        technical = analysis['technical_analysis']
+        if i % 10 == 0:
+            technical['sma']['sma200'] = None
+        if i % 50 == 0:
+            technical['sma']['sma50'] = technical['rsi']['value'] = None
+            technical['macd'].update(signal_line=float('nan'), histogram=float('nan'))
+    report = ReportGenerator()
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'report.html')
+        before = measure(concatenated, report, analysis_results, output_file)
+        size = os.path.getsize(output_file)
+        after = measure(streamed, report, analysis_results, output_file)
+    print(f"{num_positions} positions, {size / 1e6:.1f} MB report")
+    print(f"concatenated: {before[0]:7.3f}s  peak {before[1] / 1e6:7.1f} MB")
+    print(f"streamed:     {after[0]:7.3f}s  peak {after[1] / 1e6:7.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Serial vs. concurrent vs. batched ResearchAnalysis against a local fake OpenAI server
+
+Usage: python main/benchmarks/bench_research.py [num_symbols] [latency_seconds] [batch_tokens]
+With one symbol's news hung, each mode should still finish with a single timeout error for it.
+"""
+import os, sys, threading, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+os.makedirs('logs', exist_ok=True)
+
+import settings, research_analysis
+from research_analysis import ResearchAnalysis
+from fakes import FakeOpenAIServer, FakeTicker
+
+class HungTicker(FakeTicker):
+    """FakeTicker whose news never arrives for the first symbol, like a stalled Yahoo request"""
+    @property
+    def news(self):
+        if self.symbol == "SYM0000":
+            threading.Event().wait()
+        return self._news
+
+    @news.setter
+    def news(self, value):
+        self._news = value
+
+def main():
+    num_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    batch_tokens = sys.argv[3] if len(sys.argv) > 3 else "3000"
+    symbols = [f"SYM{i:04d}" for i in range(num_symbols)]
+    research_analysis.yf.Ticker = FakeTicker
+    # Batched answers take longer per symbol, and every 13th symbol goes missing to exercise the fallback
+    with FakeOpenAIServer(latency=latency, rate_limit_every=7, symbol_latency=latency / 10, drop_every=13) as server:
+        settings.API_KEY = "fake-key"
+        settings.OPENAI_BASE_URL = server.base_url
+        settings.RESEARCH_CACHE_PATH = ""  # measure the network path, not cached results
+        settings.RESEARCH_RPM = settings.RESEARCH_TPM = "0"  # otherwise the serial run drains the token budget for the others
+        research = ResearchAnalysis()
+        runs = []
+        def measure(name, function):
+            requests, start = server.requests, time.perf_counter()
+            results = function()
+            runs.append((name, time.perf_counter() - start, server.requests - requests, sum('error' in r for r in results.values())))
+
+        measure("serial", lambda: {symbol: research.research_analysis(symbol) for symbol in symbols})
+        measure("concurrent", lambda: research.research_many(symbols))
+        settings.RESEARCH_BATCH_TOKENS = batch_tokens
+        measure("batched", lambda: research.research_many(symbols))
+        # A hung news fetch costs its symbol the research timeout and an error, not the whole run
+        research_analysis.yf.Ticker = HungTicker
+        research.timeout = 2 * latency + 1
+        measure("hung news", lambda: research.research_many(symbols))
+        settings.RESEARCH_BATCH_TOKENS = "0"
+        measure("hung single", lambda: research.research_many(symbols))
+
+    print(f"{num_symbols} symbols, {latency:.2f}s server latency, every 7th request throttled, "
+          f"concurrency {settings.RESEARCH_CONCURRENCY}, batch budget {batch_tokens} tokens")
+    for name, seconds, requests, errors in runs:
+        print(f"{name + ':':12}{seconds:8.2f}s  {requests:5d} requests  {errors} errors  {runs[0][1] / seconds:6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Screen mode throughput and peak memory at growing universe sizes, plus an interrupted-and-resumed run
+
+Usage: python main/benchmarks/bench_screener.py [--sizes 1000,5000,20000] [--chunk-size 250]
+Exits non-zero if the resumed screen's ranking differs from an uninterrupted one.
+"""
+import argparse, filecmp, os, sys, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import settings, technical_analysis
+from screener import Screener
+from technical_analysis import TechnicalAnalysis
+from fakes import FakeDownload
+from run_suite import measure
+
+class InterruptingDownload(FakeDownload):
+    """FakeDownload that raises KeyboardInterrupt on request number interrupt_at, like a Ctrl+C mid-screen"""
+    def __init__(self, interrupt_at, **kwargs):
+        super().__init__(**kwargs)
+        self.interrupt_at = interrupt_at
+    def __call__(self, tickers, **kwargs):
+        if self.calls + 1 == self.interrupt_at:
+            self.calls += 1
+            raise KeyboardInterrupt
+        return super().__call__(tickers, **kwargs)
+
+def write_universe(path, size):
+    with open(path, 'w') as f:
+        f.write("symbol,name\n")
+        f.writelines(f"SYM{i:06d},Synthetic Company {i}\n" for i in range(size))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,5000,20000')
+    parser.add_argument('--chunk-size', type=int, default=250)
+    parser.add_argument('--download-latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    settings.PRICE_CACHE_PATH = ""
+    settings.LOG_SAMPLE_RATE = "0"
+    print(f"{'symbols':>8} {'time':>9} {'symbols/s':>10} {'peak':>10}")
+    with tempfile.TemporaryDirectory() as work:
+        for size in (int(size) for size in args.sizes.split(',')):
+            universe = os.path.join(work, f"universe_{size}.csv")
+            write_universe(universe, size)
+            technical_analysis.yf.download = FakeDownload(args.download_latency, 0.0005)
+            screener = Screener(TechnicalAnalysis(), args.chunk_size)
+            summary = {}
+            seconds, peak_mb, _ = measure(lambda: summary.update(screener.run(universe, os.path.join(work, f"screen_{size}.csv"))))
+            print(f"{size:8} {seconds:8.2f}s {summary['symbols_per_second']:10.1f} {peak_mb:8.1f} MB", flush=True)
+
+        size = int(args.sizes.split(',')[0])
+        universe = os.path.join(work, f"universe_{size}.csv")
+        complete = os.path.join(work, f"screen_{size}.csv")
+        resumed = os.path.join(work, "resumed.csv")
+        technical_analysis.yf.download = InterruptingDownload(interrupt_at=5, request_latency=0, symbol_latency=0)
+        try:
+            Screener(TechnicalAnalysis(), args.chunk_size).run(universe, resumed)
+        except KeyboardInterrupt:
+            pass
+        technical_analysis.yf.download = FakeDownload(0, 0)
+        summary = Screener(TechnicalAnalysis(), args.chunk_size).run(universe, resumed)
+        same = filecmp.cmp(complete, resumed, shallow=False)
+        print(f"resume: {summary['skipped']} symbols kept from the checkpoint, {summary['screened']} screened, "
+              f"ranking {'identical' if same else 'DIFFERENT'}")
+    sys.exit(0 if same else 1)
+
+if __name__ == "__main__":
+    main()
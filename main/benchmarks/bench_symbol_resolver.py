@@ -0,0 +1,78 @@
+"""Symbol resolution round-trips on a cold and a warm index
+
+Half the synthetic holdings carry their exchange and half do not (as in holdings saved by older
+versions); the rest must be probed, including tickers listed both in the US and on the TSX. The second run against the same index should need no downloads.
+
+Usage: python main/benchmarks/bench_symbol_resolver.py [--symbols 1000]
+Exits non-zero if the warm run makes any probe request or resolves a symbol differently.
+"""
+import argparse, os, sys, tempfile, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import settings, technical_analysis
+from technical_analysis import TechnicalAnalysis
+from fakes import FakeDownload
+
+class ListedDownload(FakeDownload):
+    """FakeDownload that only has data for the given tickers, like Yahoo for unlisted suffixes"""
+    def __init__(self, listed, **kwargs):
+        super().__init__(**kwargs)
+        self.listed = listed
+    def __call__(self, tickers, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frame = super().__call__(tickers, **kwargs)
+        return frame[[ticker for ticker in tickers if ticker in self.listed]]
+
+def holdings(count):
+    """(positions_by_account, expected Yahoo ticker per symbol, listed tickers); even symbols are TSX listings
+
+    Some holdings without an exchange are listed in both places, so their currency has to decide;
+    without a currency, the plain US ticker should win. T (AT&T and Telus) is one of those.
+    """
+    positions, expected, listed = [], {}, set()
+    for i in range(count):
+        symbol = f"S{i:04d}"
+        canadian = i % 2 == 0
+        expected[symbol] = f"{symbol}.TO" if canadian else symbol
+        listed.add(expected[symbol])
+        exchange = ('TSX' if canadian else 'NASDAQ') if i % 4 < 2 else None
+        currency = 'CAD' if canadian else 'USD'
+        if i % 8 >= 6:
+            listed.update({symbol, f"{symbol}.TO"})
+            if i % 16 >= 14:
+                currency, expected[symbol] = None, symbol
+        positions.append({'symbol': symbol, 'exchange': exchange, 'currency': currency})
+    positions.append({'symbol': 'T', 'exchange': None, 'currency': None})
+    expected['T'] = 'T'
+    listed.update({'T', 'T.TO'})
+    return {'TFSA': positions}, expected, listed
+
+def run(positions):
+    analysis = TechnicalAnalysis()
+    start = time.perf_counter()
+    work_plan, _ = analysis._work_plan(positions)
+    return time.perf_counter() - start, {symbol: yf_symbol for yf_symbol, held in work_plan.items() for _, symbol, _ in held}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=1000)
+    args = parser.parse_args()
+
+    positions, expected, listed = holdings(args.symbols)
+    download = ListedDownload(listed, request_latency=0.05, symbol_latency=0.001)
+    technical_analysis.yf.download = download
+    settings.PRICE_CACHE_PATH = ""
+    settings.LOG_SAMPLE_RATE = "0"
+    failed = False
+    with tempfile.TemporaryDirectory() as index_dir:
+        settings.SYMBOL_INDEX_PATH = os.path.join(index_dir, "symbols.sqlite")
+        for label in ('cold', 'warm'):
+            before = download.calls
+            seconds, resolved = run(positions)
+            wrong = sum(resolved[symbol] != yf_symbol for symbol, yf_symbol in expected.items())
+            print(f"{label}: {seconds:7.3f}s, {download.calls - before} probe requests, {wrong} wrong of {len(expected)}")
+            failed |= wrong > 0 or (label == 'warm' and download.calls != before)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Cold-start import budget for the cheap CLI commands, measured with python -X importtime
+
+Exits 1 if a command imports more than the budget or pulls in a heavy dependency it does not need.
+Usage: python main/benchmarks/check_import_time.py [budget_ms]
+"""
+import json, os, subprocess, sys, tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+HEAVY = ('pandas', 'numpy', 'yfinance', 'openai', 'wealthsimple', 'ta')
+
+def import_profile(argv, cwd):
+    """(total import microseconds, top-level package names imported) for one CLI invocation"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(SRC, 'main.py'), *argv],
+                          cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"main.py {' '.join(argv)} failed:\n{proc.stderr[-2000:]}")
+    total, packages = 0, set()
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total += int(self_us)
+        packages.add(name.strip().split('.')[0])
+    return total, packages
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 150
+    with tempfile.TemporaryDirectory() as cwd:
+        with open(os.path.join(cwd, 'analysis.json'), 'w') as f:
+            json.dump({'TFSA': {'ABC': {
+                'position_data': {'symbol': 'ABC', 'name': 'ABC Corp', 'quantity': 1, 'quote': 10.0, 'market_value': 10.0},
+                'technical_analysis': {'error': 'No historical data available'},
+                'research_analysis': {'error': 'Research was not run'},
+                'summary': {'overall_recommendation': 'HOLD', 'key_points': []},
+            }}}, f)
+        failed = False
+        for argv in (['--help'], ['report', '-o', 'report.html']):
+            total_us, packages = import_profile(argv, cwd)
+            heavy = sorted(packages.intersection(HEAVY))
+            ok = total_us / 1000 <= budget_ms and not heavy
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} main.py {' '.join(argv):24} {total_us / 1000:7.1f} ms imports"
+                  f"{'  heavy: ' + ', '.join(heavy) if heavy else ''}")
+    print(f"budget: {budget_ms:g} ms")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
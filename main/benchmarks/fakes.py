@@ -0,0 +1,218 @@
+"""Deterministic local stand-ins for the external services used by the tracker"""
+import time, zlib
+import numpy as np
+import pandas as pd
+
+def synthetic_ohlcv(symbol, start, end):
+    """Random-walk daily OHLCV bars for one symbol, seeded by the symbol name"""
+    dates = pd.bdate_range(start=pd.Timestamp(start).normalize(), end=pd.Timestamp(end).normalize())
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+    spread = close * rng.uniform(0.001, 0.02, len(dates))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.2, len(dates)),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 5_000_000, len(dates)).astype(float),
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+
+class FakeDownload:
+    """Replacement for yf.download with a fixed per-request and per-symbol latency"""
+    def __init__(self, request_latency=0.05, symbol_latency=0.001):
+        self.request_latency = request_latency
+        self.symbol_latency = symbol_latency
+        self.calls = 0
+
+    def __call__(self, tickers, start=None, end=None, group_by='column', progress=True, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.calls += 1
+        time.sleep(self.request_latency + self.symbol_latency * len(tickers))
+        frames = {ticker: synthetic_ohlcv(ticker, start, end) for ticker in tickers}
+        # Same column layout yfinance returns: (Ticker, Price) when grouped by ticker, (Price, Ticker) otherwise
+        data = pd.concat(frames, axis=1, names=['Ticker', 'Price'])
+        return data if group_by == 'ticker' else data.swaplevel(axis=1).sort_index(axis=1)
+
+class FakeOpenAIServer:
+    """Local OpenAI-compatible /v1/chat/completions endpoint with configurable latency and 429s
+
+    Point settings.OPENAI_BASE_URL at server.base_url to route ResearchAnalysis to it. Prompts with a
+    "Symbols: A, B" line get a JSON object keyed by symbol, taking symbol_latency longer per symbol;
+    with drop_every, every Nth symbol is left out of those answers.
+    """
+    def __init__(self, latency=0.2, rate_limit_every=0, symbol_latency=0.0, drop_every=0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import json, re, threading
+        server = self
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.symbol_latency = symbol_latency
+        self.drop_every = drop_every
+        self.symbols_answered = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with server.lock:
+                    server.requests += 1
+                    throttled = server.rate_limit_every and server.requests % server.rate_limit_every == 0
+                prompt = body.get("messages", [{}])[-1].get("content", "")
+                listed = re.search(r"^Symbols: (.+)$", prompt, re.MULTILINE)
+                symbols = [symbol.strip() for symbol in listed.group(1).split(",")] if listed else []
+                time.sleep(server.latency + server.symbol_latency * len(symbols))
+                if throttled:
+                    return self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}})
+                analysis = {
+                    "sentiment": "neutral",
+                    "key_drivers": ["Synthetic driver"],
+                    "risks": ["Synthetic risk"],
+                    "future_outlook": "Stable",
+                }
+                if symbols:
+                    answer = {}
+                    for symbol in symbols:
+                        with server.lock:
+                            server.symbols_answered += 1
+                            dropped = server.drop_every and server.symbols_answered % server.drop_every == 0
+                        if not dropped:
+                            answer[symbol] = analysis
+                    content = json.dumps(answer)
+                else:
+                    content = json.dumps(analysis)
+                self._send(200, {
+                    "id": f"chatcmpl-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 120, "completion_tokens": 60, "total_tokens": 180},
+                })
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class FakeTicker:
+    """Replacement for yf.Ticker that only serves a fixed set of news items"""
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.news = [
+            {'title': f"{symbol} headline {i}", 'publisher': 'Fake Wire',
+             'link': f"https://example.com/{symbol}/{i}", 'providerPublishTime': 1_700_000_000 + i * 3600}
+            for i in range(5)
+        ]
+
+class FakeWSTrade:
+    """Replacement for wealthsimple.WSTrade serving synthetic accounts and positions with a fixed latency
+
+    Accounts listed in failing raise on their first `failures` get_positions calls; those in hanging
+    block for hang_seconds on every call. With shared_symbols every account holds the same tickers,
+    otherwise each account holds its own.
+    """
+    def __init__(self, accounts=('tfsa-1', 'rrsp-1', 'non-registered-1', 'fhsa-1', 'crypto-1'),
+                 positions_per_account=20, latency=0.2, failing=(), failures=1, hanging=(), hang_seconds=5.0,
+                 shared_symbols=True):
+        import threading
+        self.accounts = list(accounts)
+        self.positions_per_account = positions_per_account
+        self.shared_symbols = shared_symbols
+        self.latency = latency
+        self.failing = set(failing)
+        self.failures = failures
+        self.hanging = set(hanging)
+        self.hang_seconds = hang_seconds
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def get_accounts(self):
+        time.sleep(self.latency)
+        return [{'id': account_id} for account_id in self.accounts]
+
+    def get_positions(self, id):
+        with self.lock:
+            self.calls[id] = self.calls.get(id, 0) + 1
+            calls = self.calls[id]
+        time.sleep(self.hang_seconds if id in self.hanging else self.latency)
+        if id in self.failing and calls <= self.failures:
+            raise ConnectionError(f"Synthetic failure for {id}")
+        rng = np.random.default_rng(zlib.crc32(id.encode()))
+        positions = []
+        offset = 0 if self.shared_symbols else self.accounts.index(id) * self.positions_per_account
+        for i in range(self.positions_per_account):
+            symbol = f"SYM{offset + i:04d}"
+            price = round(float(rng.uniform(5, 500)), 2)
+            quantity = int(rng.integers(1, 1000))
+            positions.append({
+                'id': f"{id}-{symbol}",
+                'stock': {'symbol': symbol, 'name': f"Synthetic Company {i}", 'primary_exchange': 'NYSE',
+                          'description': 'x' * 500},
+                'quantity': quantity,
+                'quote': {'amount': price, 'currency': 'USD'},
+                'market_value': {'amount': round(price * quantity, 2), 'currency': 'USD'},
+                'book_value': {'amount': round(price * quantity * 0.9, 2), 'currency': 'USD'},
+            })
+        return positions
+
+def synthetic_analysis_results(num_positions, accounts=('TFSA', 'RRSP', 'NON-REGISTERED')):
+    """analysis_results shaped like TechnicalAnalysis.analyze_performance output, with every field filled"""
+    rng = np.random.default_rng(num_positions)
+    results = {account: {} for account in accounts}
+    for i in range(num_positions):
+        symbol = f"SYM{i:05d}"
+        price = float(rng.uniform(5, 500))
+        results[accounts[i % len(accounts)]][symbol] = {
+            'position_data': {
+                'symbol': symbol,
+                'name': f"Synthetic Company {i}",
+                'exchange': 'NYSE',
+                'quantity': int(rng.integers(1, 1000)),
+                'quote': round(price, 2),
+                'market_value': round(price * 10, 2),
+                'currency': 'USD',
+                'account': accounts[i % len(accounts)],
+            },
+            'technical_analysis': {
+                'sma': {'sma20': price * 0.99, 'sma50': price * 0.97, 'sma200': price * 0.9, 'price': price, 'sma_trend': 'bullish'},
+                'rsi': {'value': float(rng.uniform(10, 90)), 'signal': 'neutral'},
+                'macd': {'macd_line': 0.5, 'signal_line': 0.3, 'histogram': 0.2, 'signal': 'bullish'},
+                'bollinger_bands': {'upper': price * 1.05, 'middle': price, 'lower': price * 0.95, 'width': 10.0, 'signal': 'neutral'},
+                'performance': {'start_date': '2025-01-01', 'end_date': '2026-01-01', 'start_price': price * 0.8,
+                                'current_price': price, 'percent_change': 25.0, 'trend': 'up'},
+                'volatility': {'daily_std_dev': 1.5, 'annualized_volatility': 23.8},
+            },
+            'research_analysis': {
+                'sentiment': 'neutral',
+                'key_drivers': ['Synthetic driver one', 'Synthetic driver two'],
+                'risks': ['Synthetic risk'],
+                'future_outlook': 'Stable outlook for the synthetic company.',
+                'recent_news': [
+                    {'published': '2026-01-01 09:30:00', 'url': f"https://example.com/{symbol}/{n}",
+                     'headline': f"{symbol} headline {n}", 'source': 'Fake Wire'}
+                    for n in range(5)
+                ],
+            },
+            'summary': {'overall_recommendation': 'BUY', 'key_points': ['Synthetic key point']},
+        }
+    return results
@@ -0,0 +1,140 @@
+"""Offline benchmark suite: holdings, analysis, RSI and report at growing portfolio sizes
+
+Every external service is faked (FakeWSTrade, FakeDownload/FakeTicker, FakeOpenAIServer), so runs are
+deterministic and need no credentials. Each component records wall time, throughput and its peak
+memory above the starting RSS; results are written as JSON for regression tracking.
+
+Usage: python main/benchmarks/run_suite.py [--sizes 10,100,1000,10000] [--output benchmark_results.json]
+"""
+import argparse, json, math, os, platform, subprocess, sys, tempfile, threading, time, tracemalloc
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import settings, research_analysis, technical_analysis
+from authentication import Authentication
+from report import ReportGenerator
+from technical_analysis import TechnicalAnalysis
+from technical_indicators import TechnicalIndicators
+from fakes import FakeDownload, FakeOpenAIServer, FakeTicker, FakeWSTrade, synthetic_ohlcv
+
+ACCOUNTS = ('tfsa-1', 'rrsp-1', 'non-registered-1', 'fhsa-1', 'crypto-1')
+
+def current_rss():
+    """Resident set size in bytes from /proc (Linux), or None where that is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+def measure(function):
+    """(seconds, peak MB above the starting RSS, method) for one run of function
+
+    RSS is sampled from a background thread so timings are not distorted; without /proc the
+    peak comes from tracemalloc instead, which only sees Python allocations and slows the run.
+    """
+    baseline = current_rss()
+    if baseline is None:
+        tracemalloc.start()
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return seconds, peak / 1e6, 'tracemalloc'
+    peak, done = [baseline], threading.Event()
+    def sample():
+        while not done.wait(0.005):
+            peak[0] = max(peak[0], current_rss())
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        function()
+    finally:
+        seconds = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    peak[0] = max(peak[0], current_rss())
+    return seconds, (peak[0] - baseline) / 1e6, 'rss'
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_size(size, args, out_dir):
+    per_account = math.ceil(size / len(ACCOUNTS))
+    ws = FakeWSTrade(accounts=ACCOUNTS, positions_per_account=per_account, latency=args.ws_latency, shared_symbols=False)
+    auth = Authentication(ws=ws)
+    holdings = auth.get_holdings()
+    positions = holdings.positions
+    positions_count = sum(len(records) for records in positions.values())
+    analysis = {}
+
+    def analyze():
+        analysis['results'] = TechnicalAnalysis().analyze_performance(positions)
+    symbols = [record['symbol'] for records in positions.values() for record in records]
+    end = datetime.now()
+    closes = [synthetic_ohlcv(symbol, end.replace(year=end.year - 1), end)['Close'] for symbol in symbols]
+    report_file = os.path.join(out_dir, f"report_{size}.html")
+
+    components = [
+        ('get_holdings', auth.get_holdings),
+        ('analyze_performance', analyze),
+        ('calculate_rsi', lambda: [TechnicalIndicators.calculate_rsi(close) for close in closes]),
+        ('generate_report', lambda: ReportGenerator().generate_report(report_file, analysis['results'])),
+    ]
+    results = []
+    for name, function in components:
+        seconds, peak_mb, method = measure(function)
+        results.append({
+            'component': name, 'positions': positions_count, 'seconds': seconds,
+            'positions_per_second': positions_count / seconds if seconds else None,
+            'peak_mb': peak_mb, 'memory_method': method,
+        })
+        print(f"{positions_count:>7} {name:22} {seconds:9.3f}s {positions_count / seconds:12.1f}/s {peak_mb:10.1f} MB", flush=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000,10000', help="Comma separated position counts")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--ws-latency', type=float, default=0.05, help="Fake Wealthsimple latency per request")
+    parser.add_argument('--download-latency', type=float, default=0.05, help="Fake yf.download latency per request")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Fake OpenAI latency per request")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    # Measure the work itself: no caches, no rate limits and no per-symbol log lines
+    settings.PRICE_CACHE_PATH = ""
+    settings.RESEARCH_CACHE_PATH = ""
+    settings.RESEARCH_RPM = settings.RESEARCH_TPM = "0"
+    settings.RESEARCH_CONCURRENCY = "16"
+    settings.LOG_SAMPLE_RATE = "0"
+    technical_analysis.yf.download = FakeDownload(args.download_latency, 0)
+    research_analysis.yf.Ticker = FakeTicker
+
+    results = []
+    print(f"{'size':>7} {'component':22} {'time':>10} {'throughput':>14} {'peak':>13}")
+    with FakeOpenAIServer(latency=args.llm_latency) as server, tempfile.TemporaryDirectory() as out_dir:
+        settings.API_KEY = "fake-key"
+        settings.OPENAI_BASE_URL = server.base_url
+        for size in sizes:
+            results.extend(run_size(size, args, out_dir))
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': vars(args),
+            'results': results,
+        }, f, indent=2)
+    print(f"Saved {args.output}")
+
+if __name__ == "__main__":
+    main()
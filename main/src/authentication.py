@@ -1,11 +1,32 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import wealthsimple, settings
 from logger import Logger
+from metrics import metrics, timed
+from cassette import CassetteWSTrade, get_cassette
 
 class Authentication:
-    def __init__(self):
-        self.ws = self._authenticate_wealthsimple()
+    def __init__(self, ws=None):
         self.logger = Logger("Authentication")
+        self.cassette = get_cassette()
+        if self.cassette is not None and not self.cassette.recording:
+            # Replayed runs never talk to Wealthsimple, so no credentials or 2FA prompt
+            self.ws = CassetteWSTrade(self.cassette)
+        else:
+            # An already authenticated WSTrade-like client can be passed in, e.g. a stub for benchmarks
+            self._connect(ws)
+    def reauthenticate(self):
+        """Open a new session, e.g. after the current one expired in a long-running process"""
+        if self.cassette is not None and not self.cassette.recording:
+            return
+        self.logger.info("Re-authenticating with Wealthsimple")
+        self._connect()
+    def _connect(self, ws=None):
+        self.ws = ws or self._authenticate_wealthsimple()
+        if self.cassette is not None:
+            self.ws = CassetteWSTrade(self.cassette, self.ws)
 
+    @timed('auth')
     def _authenticate_wealthsimple(self):
         """Authenticate with Wealthsimple using credentials from config"""
         def my_two_factor_function():
@@ -45,31 +66,87 @@ class Authentication:
             return "RRSP"
         else:
             return "UNKNOWN"
+    @timed('get_holdings')
     def get_holdings(self):
-        """Get all account holdings from Wealthsimple"""
+        """Get all account holdings from Wealthsimple, fetching accounts concurrently
+
+        Returns a Holdings result; accounts that still fail after retries are listed in its failures.
+        """
+        holdings = Holdings()
         try:
             accounts = self.ws.get_accounts()
-            self.logger.info(f"Found {len(accounts)} accounts")
-            positions_by_account = {}
-            for account in accounts:
-                id = account["id"]
-                account_type = self.get_account_type(id)
-                self.logger.info(f"Processing account: {account_type}")
-                
-                try:
-                    positions = self.ws.get_positions(id=id)
-                    positions_by_account[account_type] = positions
-                    self.logger.info(f"Found {len(positions)} positions in {account_type}")
-                    
-                    for position in positions:
-                        symbol = position.get('stock', {}).get('symbol')
-                        if symbol:
-                            self.logger.info(f"Found position: {symbol} in {account_type}")
-                except Exception as e:
-                    self.logger.error(f"Error getting positions for account {account_type}: {str(e)}")
-            
-            return positions_by_account
-            
         except Exception as e:
             self.logger.error(f"Error getting accounts: {str(e)}")
-            return {}
\ No newline at end of file
+            holdings.failures.append({'account': None, 'account_id': None, 'error': str(e), 'attempts': 1})
+            return holdings
+        self.logger.info(f"Found {len(accounts)} accounts")
+        if not accounts:
+            return holdings
+        
+        timeout = float(settings.HOLDINGS_TIMEOUT_SECONDS)
+        max_attempts = 1 + int(settings.HOLDINGS_MAX_RETRIES)
+        workers = max(1, min(int(settings.HOLDINGS_CONCURRENCY), len(accounts)))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        pending = {}  # future -> (account id, account type, attempt, deadline)
+        def submit(account_id, account_type, attempt):
+            future = pool.submit(timed('get_positions')(self.ws.get_positions), id=account_id)
+            pending[future] = (account_id, account_type, attempt, time.monotonic() + timeout)
+        def retry_or_fail(account_id, account_type, attempt, error):
+            if attempt < max_attempts:
+                self.logger.warning(f"Retrying positions for {account_type} after attempt {attempt}: {error}")
+                submit(account_id, account_type, attempt + 1)
+            else:
+                self.logger.error(f"Error getting positions for account {account_type}: {error}")
+                holdings.failures.append({'account': account_type, 'account_id': account_id, 'error': error, 'attempts': attempt})
+        
+        try:
+            for account in accounts:
+                submit(account["id"], self.get_account_type(account["id"]), 1)
+            while pending:
+                next_deadline = min(deadline for _, _, _, deadline in pending.values())
+                done, _ = wait(pending, timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in list(pending):
+                    account_id, account_type, attempt, deadline = pending[future]
+                    if future in done:
+                        del pending[future]
+                        try:
+                            records = [position_record(position, account_type) for position in future.result()]
+                        except Exception as e:
+                            retry_or_fail(account_id, account_type, attempt, str(e))
+                            continue
+                        holdings.positions.setdefault(account_type, []).extend(records)
+                        self.logger.info(f"Found {len(records)} positions in {account_type}")
+                    elif now >= deadline:
+                        # A hung call keeps its worker thread, but no longer holds up the other accounts
+                        del pending[future]
+                        future.cancel()
+                        retry_or_fail(account_id, account_type, attempt, f"timed out after {timeout:g}s")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return holdings
+
+def position_record(position, account_type):
+    """Compact position dict with just the fields analysis and the report use, instead of the raw API JSON"""
+    stock = position.get('stock') or {}
+    quote = position.get('quote') or {}
+    market_value = position.get('market_value') or {}
+    return {
+        'symbol': stock.get('symbol'),
+        'name': stock.get('name'),
+        'exchange': stock.get('primary_exchange'),
+        'quantity': position.get('quantity'),
+        'quote': quote.get('amount'),
+        'market_value': market_value.get('amount'),
+        'currency': quote.get('currency'),
+        'account': account_type,
+    }
+
+class Holdings:
+    """Result of a holdings fetch: position records by account type plus the accounts that failed"""
+    def __init__(self):
+        self.positions = {}
+        self.failures = []  # {'account': type, 'account_id': id (both None if listing accounts failed), 'error', 'attempts'}
+    @property
+    def complete(self):
+        return not self.failures
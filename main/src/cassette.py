@@ -0,0 +1,81 @@
+import json, os, sqlite3, threading
+import settings
+from logger import Logger
+
+class CassetteMiss(KeyError):
+    """A replayed run asked for a response that was never recorded"""
+
+class Cassette:
+    """SQLite store of every external response a run used, for recording and replaying it offline
+
+    Entries are keyed by (kind, key): 'accounts', 'positions' (per account id), 'prices' (per symbol),
+    'news' (per symbol), 'completion' (per prompt hash) and 'meta' (the run's analysis window).
+    """
+    def __init__(self, path, mode):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.logger = Logger("Cassette")
+        self.path = path
+        self.mode = mode
+        if mode == 'replay' and not os.path.exists(path):
+            raise FileNotFoundError(f"No cassette at {path}; record one first")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Research workers record from their own threads
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        self.logger.info(f"{'Recording to' if self.recording else 'Replaying from'} cassette {path}")
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    def get(self, kind, key=''):
+        with self.lock:
+            row = self.conn.execute("SELECT payload FROM responses WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            raise CassetteMiss(f"{kind} {key!r} is not in cassette {self.path}")
+        return json.loads(row[0])
+
+    def put(self, kind, key, payload):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (kind, key, json.dumps(payload)))
+
+    def through(self, kind, key, fetch):
+        """Replay the stored response, or call fetch() and store its (JSON-able) result when recording"""
+        if not self.recording:
+            return self.get(kind, key)
+        payload = fetch()
+        self.put(kind, key, payload)
+        return payload
+
+class CassetteWSTrade:
+    """WSTrade stand-in that records a live client's account and position responses, or replays them"""
+    def __init__(self, cassette, ws=None):
+        self.cassette = cassette
+        self.ws = ws
+    def get_accounts(self):
+        return self.cassette.through('accounts', '', lambda: self.ws.get_accounts())
+    def get_positions(self, id):
+        return self.cassette.through('positions', id, lambda: self.ws.get_positions(id=id))
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def get_cassette():
+    """The process-wide cassette selected by CASSETTE_MODE, or None for normal live runs"""
+    global _cassette
+    if not settings.CASSETTE_MODE:
+        return None
+    with _cassette_lock:
+        if _cassette is None or (_cassette.path, _cassette.mode) != (settings.CASSETTE_PATH, settings.CASSETTE_MODE):
+            _cassette = Cassette(settings.CASSETTE_PATH, settings.CASSETTE_MODE)
+        return _cassette
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+class IndicatorEngine:
+    """Computes every indicator for all symbols at once from a wide (dates x symbols) close matrix
+
+    Produces the same per-symbol result dicts as TechnicalAnalysis.technical_analysis.
+    """
+    def __init__(self, rsi_window=14, macd_fast=12, macd_slow=26, macd_signal=9, bb_window=20, bb_dev=2, wilder_rsi=False):
+        self.rsi_window = rsi_window
+        self.wilder_rsi = wilder_rsi
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.bb_window = bb_window
+        self.bb_dev = bb_dev
+
+    @staticmethod
+    def align_right(closes):
+        """Push each column's valid prices to the bottom so every symbol ends on the last row
+
+        Symbols from different exchanges have gaps on each other's holidays once they share a
+        date index; compacting them reproduces each symbol's own gap-free series, column-wise.
+        """
+        values = closes.to_numpy(dtype=float)
+        return pd.DataFrame(np.take_along_axis(values, IndicatorEngine.align_order(values), axis=0), columns=closes.columns)
+
+    @staticmethod
+    def align_order(values):
+        """Row order per column that align_right applies; np.put_along_axis with it maps aligned rows back to dates"""
+        return np.argsort(~np.isnan(values), axis=0, kind='stable')
+
+    def series(self, close, indicators=None):
+        """Full-length indicator frames for an aligned close matrix, e.g. {'sma20': frame, 'rsi': frame}
+
+        The backtest evaluates signals on these; compute() reports their last row.
+        """
+        wanted = lambda name: indicators is None or name in indicators
+        series = {}
+        if wanted('sma'):
+            series['sma20'], series['sma50'], series['sma200'] = (close.rolling(window=w).mean() for w in (20, 50, 200))
+
+        if wanted('rsi'):
+            # Smoothed the same way as TechnicalIndicators.calculate_rsi
+            delta = close.diff()
+            gains, losses = delta.clip(lower=0), -delta.clip(upper=0)
+            if self.wilder_rsi:
+                avg_gain = gains.ewm(alpha=1 / self.rsi_window, min_periods=self.rsi_window, adjust=False).mean()
+                avg_loss = losses.ewm(alpha=1 / self.rsi_window, min_periods=self.rsi_window, adjust=False).mean()
+            else:
+                avg_gain = gains.rolling(window=self.rsi_window).mean()
+                avg_loss = losses.rolling(window=self.rsi_window).mean()
+            series['rsi'] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        if wanted('macd'):
+            # Same EMA definition as ta.trend.MACD
+            ema = lambda frame, span: frame.ewm(span=span, min_periods=span, adjust=False).mean()
+            series['macd_line'] = ema(close, self.macd_fast) - ema(close, self.macd_slow)
+            series['signal_line'] = ema(series['macd_line'], self.macd_signal)
+
+        if wanted('bollinger_bands'):
+            # Population std as in ta.volatility.BollingerBands
+            rolling = close.rolling(window=self.bb_window)
+            series['bb_middle'] = rolling.mean()
+            bb_std = rolling.std(ddof=0)
+            series['bb_upper'] = series['bb_middle'] + self.bb_dev * bb_std
+            series['bb_lower'] = series['bb_middle'] - self.bb_dev * bb_std
+        return series
+
+    def compute(self, closes, start_date, end_date, indicators=None):
+        """Return {symbol: technical analysis dict} for every column of closes
+
+        indicators limits the work and the result keys to those names (all when None).
+        """
+        wanted = lambda name: indicators is None or name in indicators
+        if len(closes) == 0:
+            # Every download failed or nothing is cached: no last row to read
+            return {symbol: {"error": "No historical data available"} for symbol in closes.columns}
+        counts = closes.notna().sum().to_numpy()
+        close = self.align_right(closes)
+        last = lambda frame: frame.iloc[-1].to_numpy()
+        missing = np.full(len(closes.columns), np.nan)
+
+        price = last(close)
+        first_price = close.bfill().iloc[0].to_numpy()
+        series = self.series(close, indicators)
+        final = lambda name: last(series[name]) if name in series else missing
+        sma20, sma50, sma200, rsi = final('sma20'), final('sma50'), final('sma200'), final('rsi')
+        macd_line, signal_line = final('macd_line'), final('signal_line')
+        bb_upper, bb_middle, bb_lower = final('bb_upper'), final('bb_middle'), final('bb_lower')
+        bb_width = (bb_upper - bb_lower) / bb_middle * 100
+        daily_std = missing
+
+        if wanted('volatility'):
+            daily_std = close.pct_change().std().to_numpy()
+
+        results = {}
+        for i, symbol in enumerate(closes.columns):
+            if counts[i] == 0:
+                results[symbol] = {"error": "No historical data available"}
+                continue
+            results[symbol] = self.symbol_result(
+                counts[i], price[i], first_price[i], sma20[i], sma50[i], sma200[i], rsi[i],
+                macd_line[i], signal_line[i], bb_upper[i], bb_middle[i], bb_lower[i], bb_width[i],
+                daily_std[i], start_date, end_date, indicators,
+            )
+        return results
+
+    def symbol_result(self, count, price, first_price, sma20, sma50, sma200, rsi, macd_line, signal_line,
+                      bb_upper, bb_middle, bb_lower, bb_width, daily_std, start_date, end_date, indicators=None):
+        """Assemble one symbol's dict from its final indicator values, keeping only indicators if given"""
+        none_if_nan = lambda value: None if pd.isna(value) else value
+        sma20, sma50, sma200 = none_if_nan(sma20), none_if_nan(sma50), none_if_nan(sma200)
+
+        sma_trend = 'neutral'
+        if sma20 is not None and sma50 is not None:
+            if sma20 > sma50 and price > sma20:
+                sma_trend = 'bullish'
+            elif sma20 < sma50 and price < sma20:
+                sma_trend = 'bearish'
+
+        rsi_value = rsi if count > 1 else None
+        rsi_signal = 'neutral'
+        if rsi_value is not None:
+            if rsi_value < 30:
+                rsi_signal = 'oversold'
+            elif rsi_value > 70:
+                rsi_signal = 'overbought'
+
+        bb_signal = 'neutral'
+        if price >= bb_upper:
+            bb_signal = 'upper_touch'
+        elif price <= bb_lower:
+            bb_signal = 'lower_touch'
+
+        results = {
+            'sma': {'sma20': sma20, 'sma50': sma50, 'sma200': sma200, 'price': price, 'sma_trend': sma_trend},
+            'rsi': {'value': rsi_value, 'signal': rsi_signal},
+            'macd': {
+                'macd_line': macd_line,
+                'signal_line': signal_line,
+                'histogram': macd_line - signal_line,
+                'signal': 'bullish' if macd_line > signal_line else 'bearish',
+            },
+            'bollinger_bands': {'upper': bb_upper, 'middle': bb_middle, 'lower': bb_lower, 'width': bb_width, 'signal': bb_signal},
+        }
+        if count > 1:
+            perf_pct = ((price - first_price) / first_price) * 100 if first_price != 0 else 0
+            results['performance'] = {
+                'start_date': start_date.strftime('%Y-%m-%d'),
+                'end_date': end_date.strftime('%Y-%m-%d'),
+                'start_price': first_price,
+                'current_price': price,
+                'percent_change': perf_pct,
+                'trend': 'up' if perf_pct > 0 else 'down',
+            }
+            results['volatility'] = {
+                'daily_std_dev': daily_std * 100,
+                'annualized_volatility': daily_std * np.sqrt(252) * 100,
+            }
+        if indicators is not None:
+            results = {name: value for name, value in results.items() if name in indicators}
+        return results
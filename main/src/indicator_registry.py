@@ -0,0 +1,167 @@
+import math
+import numpy as np
+import pandas as pd
+from technical_indicators import TechnicalIndicators
+
+class Indicator:
+    """A technical indicator: its result key, the trading days of history it needs and how to compute it
+
+    compute(close, context) takes a symbol's close series and a dict with 'start_date', 'end_date',
+    'price' and 'wilder_rsi', and returns the indicator's entry in the results dict (None to omit it).
+    A lookback of None means the indicator is defined over the whole LOOKBACK_PERIOD_DAYS window.
+    """
+    def __init__(self, name, lookback, compute):
+        self.name = name
+        self.lookback = lookback
+        self.compute = compute
+
+def _last_or_none(series, min_length):
+    """Final value of series, or None if it is NaN or the input was shorter than min_length"""
+    if len(series) < min_length:
+        return None
+    value = series.iloc[-1]
+    return None if pd.isna(value) else value
+
+def compute_sma(close, context):
+    # Simple Moving Averages (20, 50, 200 day)
+    sma20_val = _last_or_none(close.rolling(window=20).mean(), 20)
+    sma50_val = _last_or_none(close.rolling(window=50).mean(), 50)
+    sma200_val = _last_or_none(close.rolling(window=200).mean(), 200)
+    current_price = context['price']
+
+    sma_trend = 'neutral'
+    if sma20_val is not None and sma50_val is not None and current_price is not None:
+        if sma20_val > sma50_val and current_price > sma20_val:
+            sma_trend = 'bullish'
+        elif sma20_val < sma50_val and current_price < sma20_val:
+            sma_trend = 'bearish'
+
+    return {
+        'sma20': sma20_val,
+        'sma50': sma50_val,
+        'sma200': sma200_val,
+        'price': current_price,
+        'sma_trend': sma_trend
+    }
+
+def compute_rsi(close, context):
+    # RSI (Relative Strength Index)
+    rsi_value = TechnicalIndicators.calculate_rsi(close, window=14, wilder=context['wilder_rsi'])
+    rsi_signal = 'neutral'
+    if rsi_value is not None:
+        if rsi_value < 30:
+            rsi_signal = 'oversold'
+        elif rsi_value > 70:
+            rsi_signal = 'overbought'
+
+    return {
+        'value': rsi_value,
+        'signal': rsi_signal
+    }
+
+def compute_macd(close, context):
+    # MACD (Moving Average Convergence Divergence)
+    from ta.trend import MACD  # ta is only needed by the per-symbol full path, not the panel engine
+    macd = MACD(close=close)
+    macd_series, signal_series, diff_series = macd.macd(), macd.macd_signal(), macd.macd_diff()
+    macd_line = macd_series.iloc[-1] if not macd_series.empty else None
+    signal_line = signal_series.iloc[-1] if not signal_series.empty else None
+    histogram = diff_series.iloc[-1] if not diff_series.empty else None
+
+    macd_signal = 'neutral'
+    if macd_line is not None and signal_line is not None:
+        if macd_line > signal_line:
+            macd_signal = 'bullish'
+        else:
+            macd_signal = 'bearish'
+
+    return {
+        'macd_line': macd_line,
+        'signal_line': signal_line,
+        'histogram': histogram,
+        'signal': macd_signal
+    }
+
+def compute_bollinger_bands(close, context):
+    # Bollinger Bands
+    from ta.volatility import BollingerBands
+    bb = BollingerBands(close=close)
+    upper, middle, lower, width = bb.bollinger_hband(), bb.bollinger_mavg(), bb.bollinger_lband(), bb.bollinger_wband()
+    bb_upper = upper.iloc[-1] if not upper.empty else None
+    bb_middle = middle.iloc[-1] if not middle.empty else None
+    bb_lower = lower.iloc[-1] if not lower.empty else None
+    bb_width = width.iloc[-1] if not width.empty else None
+    current_price = context['price']
+
+    bb_signal = 'neutral'
+    if current_price is not None and bb_upper is not None and bb_lower is not None:
+        if current_price >= bb_upper:
+            bb_signal = 'upper_touch'
+        elif current_price <= bb_lower:
+            bb_signal = 'lower_touch'
+
+    return {
+        'upper': bb_upper,
+        'middle': bb_middle,
+        'lower': bb_lower,
+        'width': bb_width,
+        'signal': bb_signal
+    }
+
+def compute_performance(close, context):
+    # Calculate historical performance
+    if len(close) <= 1:
+        return None
+    start_price = close.iloc[0]
+    current_price = close.iloc[-1]
+    perf_pct = ((current_price - start_price) / start_price) * 100 if start_price != 0 else 0
+
+    return {
+        'start_date': context['start_date'].strftime('%Y-%m-%d'),
+        'end_date': context['end_date'].strftime('%Y-%m-%d'),
+        'start_price': start_price,
+        'current_price': current_price,
+        'percent_change': perf_pct,
+        'trend': 'up' if perf_pct > 0 else 'down'
+    }
+
+def compute_volatility(close, context):
+    # Calculate volatility (standard deviation of daily returns)
+    if len(close) <= 1:
+        return None
+    daily_returns = close.pct_change().dropna()
+    daily_std = daily_returns.std() if not daily_returns.empty else None
+    return {
+        'daily_std_dev': daily_std * 100 if daily_std is not None else None,  # as percentage
+        'annualized_volatility': daily_std * np.sqrt(252) * 100 if daily_std is not None else None  # annualized
+    }
+
+# EMA-based values depend on where the series starts; a few multiples of the slowest span lets them converge
+REGISTRY = {indicator.name: indicator for indicator in (
+    Indicator('sma', 200, compute_sma),
+    Indicator('rsi', 100, compute_rsi),
+    Indicator('macd', 3 * 26 + 9, compute_macd),
+    Indicator('bollinger_bands', 20, compute_bollinger_bands),
+    Indicator('performance', None, compute_performance),
+    Indicator('volatility', None, compute_volatility),
+)}
+
+def select_indicators(names):
+    """Registered indicators for a comma separated list of names (all of them when empty)
+
+    Returns (indicators, unknown_names).
+    """
+    requested = [name.strip().lower() for name in names.split(',') if name.strip()] if names else []
+    if not requested:
+        return list(REGISTRY.values()), []
+    unknown = [name for name in requested if name not in REGISTRY]
+    return [REGISTRY[name] for name in dict.fromkeys(requested) if name in REGISTRY], unknown
+
+def history_days(indicators, lookback_days):
+    """Calendar days of history to download: enough trading days for the largest window, capped at lookback_days"""
+    if any(indicator.lookback is None for indicator in indicators):
+        return lookback_days
+    trading_days = max((indicator.lookback for indicator in indicators), default=1)
+    # ~252 trading days per 365 calendar days (weekends and exchange holidays), plus a margin for
+    # holidays clustering in the window and an exchange's gaps when it shares a date index with another
+    return min(lookback_days, math.ceil(trading_days * 365.25 / 252) + 20)
@@ -1,8 +1,84 @@
-import logging
-from logging.handlers import RotatingFileHandler
+import atexit, json, logging, os, queue, threading, zlib
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import settings
 
 debug = settings.IS_DEBUG
+# Shared by every Logger: callers only enqueue records, one listener thread does the console and file I/O
+_queue = queue.Queue(-1)
+_listener = None
+_setup_lock = threading.Lock()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the symbol attached to per-symbol records"""
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'symbol', None):
+            entry['symbol'] = record.symbol
+        return json.dumps(entry)
+
+class ModuleFileHandler(logging.Handler):
+    """Routes each record to logs/{logger name}.log, opening one rotating file per module on first use"""
+    def __init__(self, directory, formatter):
+        super().__init__()
+        self.directory = directory
+        self.formatter = formatter
+        self.handlers = {}
+    def emit(self, record):
+        handler = self.handlers.get(record.name)
+        if handler is None:
+            suffix = 'jsonl' if settings.LOG_FORMAT == 'json' else 'log'
+            handler = RotatingFileHandler(
+                os.path.join(self.directory, f"{record.name}.{suffix}"),
+                maxBytes=int(settings.LOG_MAX_BYTES), backupCount=int(settings.LOG_BACKUP_COUNT),
+            )
+            handler.setFormatter(self.formatter)
+            self.handlers[record.name] = handler
+        handler.emit(record)
+    def close(self):
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
+def _start_listener():
+    """Create the logs directory and start the background listener, once per process"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        os.makedirs(settings.LOG_DIR, exist_ok=True)
+        format = JsonFormatter() if settings.LOG_FORMAT == 'json' else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_handler = logging.StreamHandler() # logs to the console
+        console_handler.setFormatter(format)
+        _listener = QueueListener(_queue, console_handler, ModuleFileHandler(settings.LOG_DIR, format))
+        _listener.start()
+        atexit.register(shutdown)
+        #Supress debug logs of 3rd party libraries
+        logging.getLogger("requests").setLevel(logging.WARN)
+        logging.getLogger("pymongo").setLevel(logging.WARN)
+        logging.getLogger("flask").setLevel(logging.WARN)
+
+def shutdown():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+def sampled(symbol):
+    """Whether per-symbol info/debug records for symbol pass LOG_SAMPLE_RATE; stable per symbol across runs"""
+    rate = float(settings.LOG_SAMPLE_RATE)
+    if rate >= 1:
+        return True
+    return zlib.crc32(symbol.encode()) % 10000 < rate * 10000
+
 class Logger:
     def __init__(self,module):
         self.module = module
@@ -10,57 +86,50 @@ class Logger:
         self.level = logging.DEBUG if debug else logging.INFO
         self.logger.setLevel(self.level)
         self.__initialize()
-        
 
-    def __initialize(self):
-        format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        # initialize rotating file handler
-        rotating_file_handler = RotatingFileHandler(f'logs/{self.module}.log', maxBytes=2000, backupCount=3) # logs to a file
-        rotating_file_handler.setFormatter(format)
-        rotating_file_handler.setLevel(self.level)
-        # initialize console handler
-        console_handler = logging.StreamHandler() # logs to the console
-        console_handler.setFormatter(format)
-        console_handler.setLevel(self.level)
 
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(rotating_file_handler)
-        #Supress debug logs of 3rd party libraries
-        logging.getLogger("requests").setLevel(logging.WARN)
-        logging.getLogger("pymongo").setLevel(logging.WARN)
-        logging.getLogger("flask").setLevel(logging.WARN)
+    def __initialize(self):
+        _start_listener()
+        # Loggers are shared by name, so a second Logger("X") must not add another handler
+        if not any(isinstance(handler, QueueHandler) for handler in self.logger.handlers):
+            queue_handler = QueueHandler(_queue)
+            queue_handler.setLevel(self.level)
+            self.logger.addHandler(queue_handler)
 
     def __update_handlers_level(self):
         """Update the level of all handlers to match the current logger level."""
         for handler in self.logger.handlers:
             handler.setLevel(self.level)
-    
+
     def set_level(self, level):
         """Set the logging level and update the handlers."""
         self.level = level
         self.logger.setLevel(level)  # Update the logger level
         self.__update_handlers_level()  # Update the level for all handlers
-        
-    def info(self,message):
-        self.logger.info(message)
 
-    def debug(self,message):
-        self.logger.debug(message)
+    def info(self,message,symbol=None):
+        if symbol is None or sampled(symbol):
+            self.logger.info(message, extra={'symbol': symbol})
 
-    def warning(self,message):
-        self.logger.warning(message)
+    def debug(self,message,symbol=None):
+        if symbol is None or sampled(symbol):
+            self.logger.debug(message, extra={'symbol': symbol})
 
-    def error(self,message):
-        self.logger.error(message)
+    def warning(self,message,symbol=None):
+        self.logger.warning(message, extra={'symbol': symbol})
 
-    def critical(self,message):
-        self.logger.critical(message)
+    def error(self,message,symbol=None):
+        self.logger.error(message, extra={'symbol': symbol})
+
+    def critical(self,message,symbol=None):
+        self.logger.critical(message, extra={'symbol': symbol})
 
 """
 Example usage (in another module):
 logger = Logger("app")
 logger.debug("This is a debug message")
 logger.info("This is an info message")
+logger.info("Analyzing AAPL", symbol="AAPL")  # dropped for symbols outside log_sample_rate
 logger.warning("This is a warning message")
 logger.error("This is an error message")
 logger.critical("This is a critical message")
@@ -70,4 +139,6 @@ logger.critical("This is a critical message")
 2025-03-28 18:36:45,051 - app - WARNING - This is a warning message
 2025-03-28 18:36:45,051 - app - ERROR - This is an error message
 2025-03-28 18:36:45,051 - app - CRITICAL - This is a critical message
-"""
\ No newline at end of file
+# With log_format = json, ./logs/app.jsonl holds one object per line:
+{"time": "2025-03-28 18:36:45,051", "logger": "app", "level": "INFO", "message": "Analyzing AAPL", "symbol": "AAPL"}
+"""
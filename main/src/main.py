@@ -1,15 +1,213 @@
-from authentication import Authentication 
-from technical_analysis import TechnicalAnalysis    
-from report import ReportGenerator    
-def main():
-    """Main function to run the portfolio tracker"""
+import argparse, json, sys
+import settings
+# Heavy modules (wealthsimple, yfinance, pandas, openai, ...) are imported inside the commands that need
+# them, so cheap commands such as re-rendering a saved report start quickly
+def save_json(path, data):
+    """Write intermediate results; numpy scalars are stored as plain numbers"""
+    with open(path, 'w') as f:
+        json.dump(data, f, default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+def report_metrics():
+    """Print the run's stage timings and write them to METRICS_PATH if configured"""
+    from metrics import metrics
+    print(metrics.summary(), file=sys.stderr)  # keeps 'report -o -' output clean
+    if settings.METRICS_PATH:
+        metrics.write(settings.METRICS_PATH)
+def print_failures(holdings):
+    for failure in holdings.failures:
+        print(f"Warning: could not fetch {failure['account'] or 'accounts'} after {failure['attempts']} attempt(s): {failure['error']}")
+def save_snapshot(analysis_results):
+    """Append a run to SNAPSHOT_PATH for trend queries and offline reports; replays are not history"""
+    if settings.SNAPSHOT_PATH and analysis_results and settings.CASSETTE_MODE != "replay":
+        from snapshot_store import SnapshotStore
+        SnapshotStore().save(analysis_results)
+def run_cycle(auth, tech_analysis, report, output_file='portfolio_report.html'):
+    """One holdings -> analysis -> report pass, reusing the session and caches of earlier passes"""
+    from metrics import metrics
+    metrics.reset()
+    tech_analysis.reset_window()
+    holdings = auth.get_holdings()
+    if any(failure['account'] is None for failure in holdings.failures):
+        # Listing accounts failed on a session that worked before, so it has most likely expired
+        auth.reauthenticate()
+        holdings = auth.get_holdings()
+    print_failures(holdings)
+    analysis_results = tech_analysis.analyze_performance(holdings.positions)
+    save_snapshot(analysis_results)
+    portfolio_risk = tech_analysis.portfolio_risk(analysis_results) if analysis_results else None
+    report_file = report.generate_report(output_file, analysis_results = analysis_results, portfolio_risk = portfolio_risk)
+    report_metrics()
+    return report_file
+def fetch(args):
+    """Save holdings from Wealthsimple"""
+    from authentication import Authentication
+    holdings = Authentication().get_holdings()
+    print_failures(holdings)
+    save_json(args.output, {'positions': holdings.positions, 'failures': holdings.failures})
+    print(f"Saved holdings: {args.output}")
+def analyze(args):
+    """Run technical analysis (and research with --with-research) on saved holdings"""
+    from technical_analysis import TechnicalAnalysis
+    positions = load_json(args.input)['positions']
+    results = TechnicalAnalysis(refresh_research=args.refresh_research).analyze_performance(positions, research=args.with_research)
+    save_json(args.output, results or {})
+    print(f"Saved analysis: {args.output}")
+def research(args):
+    """Add LLM research to saved analysis results"""
+    from technical_analysis import TechnicalAnalysis
+    results = TechnicalAnalysis(refresh_research=args.refresh_research).add_research(load_json(args.input))
+    save_json(args.output or args.input, results)
+    print(f"Saved analysis: {args.output or args.input}")
+def report(args):
+    """Render the HTML report from saved analysis results or a stored snapshot"""
+    from report import ReportGenerator
+    if args.snapshot is not None:
+        from snapshot_store import SnapshotStore
+        analysis_results = SnapshotStore().load(None if args.snapshot == "latest" else int(args.snapshot))
+    else:
+        analysis_results = load_json(args.input)
+    report_file = ReportGenerator().generate_report(args.output, analysis_results = analysis_results)
+    if args.output != '-':
+        print(f"Complete! Report generated: {report_file}")
+def history(args):
+    """Show stored runs, one field's history for a symbol, or portfolio value per day"""
+    from snapshot_store import SnapshotStore
+    store = SnapshotStore()
+    if args.portfolio_value:
+        for day, currency, value in store.portfolio_value(args.days):
+            print(f"{day}  {value:16,.2f} {currency or ''}")
+    elif args.symbol:
+        try:
+            rows = store.history(args.symbol, args.field, args.days)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for taken_at, account, value in rows:
+            print(f"{taken_at}  {account:20} {value}")
+    else:
+        for run_id, taken_at, positions in store.runs():
+            print(f"{run_id:6}  {taken_at}  {positions} positions")
+def backtest(args):
+    """Score the technical signals against the price history of saved holdings or given symbols"""
+    from datetime import timedelta
+    from technical_analysis import TechnicalAnalysis
+    from signal_backtest import SignalBacktest
+    tech_analysis = TechnicalAnalysis()
+    symbols = args.symbols.split(",") if args.symbols else tech_analysis.yahoo_symbols(load_json(args.input)["positions"])
+    start_date = tech_analysis.end_date - timedelta(days=round(365.25 * args.years))
+    try:
+        closes = tech_analysis.price_history(symbols, start_date, cache_only=args.cache_only)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    results = SignalBacktest(args.horizons).run(closes)
+    print(f"{results['symbols']} symbols, {results['bars']} bars")
+    print(f"{'signal':20} {'horizon':>7} {'count':>8} {'hit rate':>9} {'avg ret':>8} {'avg dd':>8} {'max dd':>8} {'strategy dd':>12}")
+    for name, stats in results["signals"].items():
+        for horizon, scores in stats["horizons"].items():
+            if not scores["occurrences"]:
+                print(f"{name:20} {horizon:7} {0:8}")
+                continue
+            print(f"{name:20} {horizon:7} {scores['occurrences']:8} {scores['hit_rate'] * 100:8.1f}% {scores['avg_forward_return'] * 100:7.2f}% "
+                  f"{scores['avg_drawdown'] * 100:7.2f}% {scores['max_drawdown'] * 100:7.2f}% {stats['strategy_drawdown'] * 100:11.2f}%")
+    if args.output:
+        save_json(args.output, results)
+        print(f"Saved backtest: {args.output}")
+def screen(args):
+    """Rank a universe of Yahoo tickers from a file by their technical signals, resumably"""
+    from technical_analysis import TechnicalAnalysis
+    from screener import Screener
+    try:
+        summary = Screener(TechnicalAnalysis(), args.chunk_size).run(
+            args.universe, args.output, args.checkpoint, restart=args.restart, rank_by=args.rank_by, ascending=args.ascending)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    except KeyboardInterrupt:
+        raise SystemExit("Interrupted; run the same command again to resume from the checkpoint")
+    print(f"Screened {summary['screened']} symbols ({summary['skipped']} already screened, {summary['errors']} without data) "
+          f"in {summary['seconds']:.1f}s, {summary['symbols_per_second'] or 0:.1f} symbols/s")
+    print(f"Saved ranking of {summary['symbols']} symbols: {summary['output']}")
+def run(args, parser):
+    """Fetch, analyze, research and report in one go, once or every update_frequency_hours"""
+    from authentication import Authentication
+    from technical_analysis import TechnicalAnalysis
+    from report import ReportGenerator
     print("Wealthsimple Portfolio Tracker with Performance Analysis")
     print("------------------------------------------------------")
-    auth, tech_analysis, report = Authentication(), TechnicalAnalysis(), ReportGenerator()
+    auth, tech_analysis, report = Authentication(), TechnicalAnalysis(refresh_research=args.refresh_research), ReportGenerator()
+    if args.daemon:
+        from scheduler import Scheduler
+        if not settings.UPDATE_FREQUENCY_HOURS:
+            parser.error("--daemon needs update_frequency_hours to be set")
+        print(f"Running every {settings.UPDATE_FREQUENCY_HOURS} hours, press Ctrl+C to stop")
+        Scheduler(settings.UPDATE_FREQUENCY_HOURS, lambda: run_cycle(auth, tech_analysis, report, args.output)).run_forever()
+        return
     print("Getting holdings, analyzing performance and generating report...")
-    report_file = report.generate_report(analysis_results = tech_analysis.analyze_performance(auth.get_holdings()))
-    
+    report_file = run_cycle(auth, tech_analysis, report, args.output)
+
     print(f"Complete! Report generated: {report_file}")
+def main():
+    """Main function to run the portfolio tracker"""
+    # SUPPRESS keeps a subcommand from resetting a flag that was given before it
+    cassette_options = argparse.ArgumentParser(add_help=False)
+    cassette_modes = cassette_options.add_mutually_exclusive_group()
+    cassette_modes.add_argument("--record", nargs="?", const=settings.CASSETTE_PATH, default=argparse.SUPPRESS, metavar="CASSETTE",
+                                help="Save every Wealthsimple, Yahoo Finance and OpenAI response to a cassette")
+    cassette_modes.add_argument("--replay", nargs="?", const=settings.CASSETTE_PATH, default=argparse.SUPPRESS, metavar="CASSETTE",
+                                help="Answer those calls from a recorded cassette, without network access")
+    run_options = argparse.ArgumentParser(add_help=False, parents=[cassette_options])
+    run_options.add_argument("--refresh-research", action="store_true", help="Ignore cached research results and call the LLM again")
+    run_options.add_argument("--daemon", action="store_true", help="Keep running and regenerate the report every update_frequency_hours")
+    run_options.add_argument("-o", "--output", default="portfolio_report.html", help="Report file ('-' for stdout)")
+    parser = argparse.ArgumentParser(description="Wealthsimple Portfolio Tracker with Performance Analysis", parents=[run_options])
+    commands = parser.add_subparsers(dest="command", metavar="command", help="run (the default) or a single step")
+
+    command = commands.add_parser("fetch", help=fetch.__doc__, parents=[cassette_options])
+    command.add_argument("-o", "--output", default="holdings.json")
+    command = commands.add_parser("analyze", help=analyze.__doc__, parents=[cassette_options])
+    command.add_argument("-i", "--input", default="holdings.json")
+    command.add_argument("-o", "--output", default="analysis.json")
+    command.add_argument("--with-research", action="store_true", help="Also run LLM research")
+    command.add_argument("--refresh-research", action="store_true", help="Ignore cached research results and call the LLM again")
+    command = commands.add_parser("research", help=research.__doc__, parents=[cassette_options])
+    command.add_argument("-i", "--input", default="analysis.json")
+    command.add_argument("-o", "--output", help="Defaults to updating the input file")
+    command.add_argument("--refresh-research", action="store_true", help="Ignore cached research results and call the LLM again")
+    command = commands.add_parser("report", help=report.__doc__)
+    command.add_argument("-i", "--input", default="analysis.json")
+    command.add_argument("-o", "--output", default="portfolio_report.html", help="Report file ('-' for stdout)")
+    command.add_argument("--snapshot", nargs="?", const="latest", metavar="RUN_ID", help="Render a stored run instead of --input (the latest if no id)")
+    command = commands.add_parser("history", help=history.__doc__)
+    command.add_argument("symbol", nargs="?", help="Position symbol or Yahoo ticker; lists stored runs when omitted")
+    command.add_argument("--field", default="rsi", help="Snapshot column, e.g. rsi, price, market_value, percent_change")
+    command.add_argument("--days", type=int, default=90)
+    command.add_argument("--portfolio-value", action="store_true", help="Market value per day and currency instead")
+    command = commands.add_parser("backtest", help=backtest.__doc__, parents=[cassette_options])
+    command.add_argument("-i", "--input", default="holdings.json", help="Holdings whose symbols are tested")
+    command.add_argument("--symbols", help="Comma separated Yahoo tickers to test instead of the holdings")
+    command.add_argument("--years", type=float, default=float(settings.BACKTEST_YEARS), help="Years of history")
+    command.add_argument("--horizons", default=settings.BACKTEST_HORIZONS, help="Comma separated forward windows in bars")
+    command.add_argument("--cache-only", action="store_true", help="Use only the local price cache, never download")
+    command.add_argument("-o", "--output", help="Also save the results as JSON")
+    command = commands.add_parser("screen", help=screen.__doc__, parents=[cassette_options])
+    command.add_argument("universe", help="File of tickers, one per line or a CSV with a symbol/ticker column")
+    command.add_argument("-o", "--output", default="screen.csv", help="Ranked results CSV")
+    command.add_argument("--checkpoint", help="Progress database (default: next to the output)")
+    command.add_argument("--restart", action="store_true", help="Discard the checkpoint and screen everything again")
+    command.add_argument("--chunk-size", type=int, help="Symbols per chunk (default screen_chunk_size)")
+    command.add_argument("--rank-by", default="score", help="score or an indicator column such as rsi or percent_change")
+    command.add_argument("--ascending", action="store_true", help="Rank lowest first")
+    commands.add_parser("run", help=run.__doc__, parents=[run_options])
+    args = parser.parse_args()
+    if getattr(args, "record", None) or getattr(args, "replay", None):
+        settings.CASSETTE_MODE = "record" if getattr(args, "record", None) else "replay"
+        settings.CASSETTE_PATH = args.record if settings.CASSETTE_MODE == "record" else args.replay
+
+    if args.command in (None, "run"):
+        run(args, parser)
+    else:
+        {"fetch": fetch, "analyze": analyze, "research": research, "report": report, "history": history, "backtest": backtest, "screen": screen}[args.command](args)
+        report_metrics()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
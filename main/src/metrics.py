@@ -0,0 +1,138 @@
+import cProfile, io, json, math, os, pstats, threading, time
+from contextlib import contextmanager
+from functools import wraps
+import settings
+
+class Metrics:
+    """Process-wide stage timers and counters for one run
+
+    Stages are timed with `with metrics.timer('stage', symbol)` or the @timed decorator; counters
+    accumulate values such as bytes downloaded and LLM tokens. reset() starts a new run.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.durations = {}  # stage -> [seconds]
+            self.symbol_durations = {}  # symbol -> {stage: seconds}
+            self.counters = {}
+            self.started = time.time()
+
+    @contextmanager
+    def timer(self, stage, symbol=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, symbol)
+
+    def observe(self, stage, seconds, symbol=None):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            if symbol is not None:
+                stages = self.symbol_durations.setdefault(symbol, {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """{'stages': {stage: {count, total, p50, p95, max}}, 'symbols': {...}, 'counters': {...}}"""
+        with self.lock:
+            return {
+                'started': self.started,
+                'elapsed': time.time() - self.started,
+                'stages': {stage: summarize(values) for stage, values in self.durations.items()},
+                'symbols': {symbol: dict(stages) for symbol, stages in self.symbol_durations.items()},
+                'counters': dict(self.counters),
+            }
+
+    def summary(self, top_symbols=10):
+        """Per-stage timing table, the slowest symbols and the counters as printable text"""
+        data = self.snapshot()
+        lines = [f"{'stage':28} {'count':>7} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for stage, stats in sorted(data['stages'].items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{stage:28} {stats['count']:7d} {stats['total']:9.2f} {stats['p50'] * 1000:9.1f} "
+                         f"{stats['p95'] * 1000:9.1f} {stats['max'] * 1000:9.1f}")
+        if data['symbols']:
+            totals = sorted(((sum(stages.values()), symbol) for symbol, stages in data['symbols'].items()), reverse=True)
+            per_symbol = summarize([total for total, _ in totals])
+            lines.append(f"per symbol: p50 {per_symbol['p50'] * 1000:.1f} ms, p95 {per_symbol['p95'] * 1000:.1f} ms, "
+                         f"max {per_symbol['max'] * 1000:.1f} ms over {len(totals)} symbols")
+            lines.append("slowest: " + ", ".join(f"{symbol} {total * 1000:.0f} ms" for total, symbol in totals[:top_symbols]))
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"{name}: {value}")
+        lines.append(f"elapsed: {data['elapsed']:.2f}s")
+        return "\n".join(lines)
+
+    def write(self, path):
+        """Write the run's metrics as a Prometheus textfile (*.prom) or JSON (anything else)"""
+        data = self.snapshot()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(prometheus_text(data))
+            else:
+                json.dump(data, f, indent=2)
+        # Atomic replace so a node_exporter scrape never sees a half-written file
+        os.replace(tmp, path)
+
+def summarize(values):
+    ordered = sorted(values)
+    # Nearest-rank percentiles; plenty for run summaries and keeps numpy out of the import path
+    rank = lambda q: ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+    return {'count': len(ordered), 'total': sum(ordered), 'p50': rank(0.5), 'p95': rank(0.95), 'max': ordered[-1]}
+
+def prometheus_text(data):
+    lines = ["# TYPE portfolio_stage_seconds summary"]
+    for stage, stats in sorted(data['stages'].items()):
+        for quantile, key in (('0.5', 'p50'), ('0.95', 'p95')):
+            lines.append(f'portfolio_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key]}')
+        lines.append(f'portfolio_stage_seconds_sum{{stage="{stage}"}} {stats["total"]}')
+        lines.append(f'portfolio_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    lines.append("# TYPE portfolio_stage_seconds_max gauge")
+    for stage, stats in sorted(data['stages'].items()):
+        lines.append(f'portfolio_stage_seconds_max{{stage="{stage}"}} {stats["max"]}')
+    for name, value in sorted(data['counters'].items()):
+        lines.append(f"# TYPE portfolio_{name} gauge")
+        lines.append(f"portfolio_{name} {value}")
+    lines.append("# TYPE portfolio_run_seconds gauge")
+    lines.append(f"portfolio_run_seconds {data['elapsed']}")
+    lines.append("# TYPE portfolio_run_timestamp_seconds gauge")
+    lines.append(f"portfolio_run_timestamp_seconds {data['started']}")
+    return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def timed(stage):
+    """Decorator timing every call of a function as stage"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def profiled(stage, symbol):
+    """cProfile the enclosed block when symbol is PROFILE_SYMBOL, writing the top functions next to the logs"""
+    if not settings.PROFILE_SYMBOL or symbol != settings.PROFILE_SYMBOL:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(settings.LOG_DIR, exist_ok=True)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(40)
+        with open(os.path.join(settings.LOG_DIR, f"profile_{stage}_{symbol}.txt"), 'w') as f:
+            f.write(out.getvalue())
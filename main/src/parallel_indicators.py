@@ -0,0 +1,84 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from indicator_engine import IndicatorEngine
+from indicator_registry import select_indicators
+
+class ShardedIndicators:
+    """Computes technical indicators for many symbols across a pool of worker processes
+
+    The (dates x symbols) close matrix is copied once into shared memory; each worker maps it and
+    works on a contiguous block of columns, so no DataFrames are pickled. Shard results are merged in
+    column order, which makes the output independent of the order in which workers finish.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+    def compute(self, closes, start_date, end_date, indicators=None, per_symbol=False, wilder_rsi=False):
+        """Return {symbol: technical analysis dict} for every column of closes
+
+        indicators is an ordered list of names (all when None); per_symbol runs the registry's
+        per-symbol indicator functions instead of the panel engine.
+        """
+        if self.pool is None:
+            # Kept for the life of the object so a daemon does not pay the worker start-up every cycle
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        values = np.ascontiguousarray(closes.to_numpy(dtype=float))
+        symbols = list(closes.columns)
+        if not symbols:
+            return {}
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            # A few shards per worker evens out the load when symbols differ in history length
+            bounds = np.linspace(0, len(symbols), min(len(symbols), self.workers * 4) + 1, dtype=int)
+            names = list(indicators) if indicators is not None else None
+            futures = [
+                self.pool.submit(_compute_shard, shm.name, values.shape, int(lo), int(hi), symbols[lo:hi],
+                                 start_date, end_date, names, per_symbol, wilder_rsi)
+                for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+            ]
+            results = {}
+            for future in futures:
+                results.update(future.result())
+            return results
+        finally:
+            shm.close()
+            shm.unlink()
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+def _compute_shard(shm_name, shape, lo, hi, symbols, start_date, end_date, indicators, per_symbol, wilder_rsi):
+    """Worker: indicator results for columns lo:hi of the shared close matrix"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        matrix = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        # Copy the shard out so nothing references the shared buffer once it is closed
+        closes = pd.DataFrame(matrix[:, lo:hi].copy(), columns=symbols)
+    finally:
+        shm.close()
+    wanted = set(indicators) if indicators is not None else None
+    if not per_symbol:
+        return IndicatorEngine(wilder_rsi=wilder_rsi).compute(closes, start_date, end_date, wanted)
+
+    selected, _ = select_indicators(','.join(indicators) if indicators else '')
+    results = {}
+    for symbol in symbols:
+        close = closes[symbol].dropna()
+        if close.empty:
+            results[symbol] = {"error": "No historical data available"}
+            continue
+        context = {'start_date': start_date, 'end_date': end_date, 'price': close.iloc[-1], 'wilder_rsi': wilder_rsi}
+        try:
+            results[symbol] = {}
+            for indicator in selected:
+                value = indicator.compute(close, context)
+                if value is not None:
+                    results[symbol][indicator.name] = value
+        except Exception as e:
+            results[symbol] = {"error": str(e)}
+    return results
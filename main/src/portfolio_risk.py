@@ -0,0 +1,131 @@
+from statistics import NormalDist
+import numpy as np
+import settings
+from logger import Logger
+from metrics import timed
+
+TRADING_DAYS = 252
+
+class PortfolioRisk:
+    """Portfolio-level risk from the analysis's price history and the positions' market values
+
+    Every holding is a column of one (dates x symbols) returns matrix and every portfolio (each
+    account, plus the total) a row of one weight matrix, so volatility, VaR/CVaR and risk contributions
+    for all of them come from a handful of matrix products. The N x N covariance matrix is never built:
+    covariance times weights is Xᵀ(Xw)/(T-1), which keeps memory linear in the number of holdings.
+    Market values are summed as reported, without converting currencies.
+    """
+    def __init__(self, confidence=None, top_holdings=10, top_pairs=10):
+        self.logger = Logger("PortfolioRisk")
+        self.confidence = float(confidence or settings.RISK_CONFIDENCE)
+        self.top_holdings = top_holdings
+        self.top_pairs = top_pairs
+
+    @timed('portfolio_risk')
+    def analyze(self, closes, holdings):
+        """Risk per account and for the whole portfolio
+
+        closes is a (dates x Yahoo symbols) close matrix and holdings a list of (account, Yahoo symbol,
+        market value). Returns {'confidence', 'observations', 'portfolios': {name: stats}, 'correlated_pairs',
+        'unpriced'} with the whole portfolio as 'Total'; VaR and CVaR are one-day losses as fractions of value.
+        """
+        returns = returns_matrix(closes)
+        symbols = list(closes.columns)
+        column = {symbol: i for i, symbol in enumerate(symbols)}
+        has_returns = np.isfinite(returns).sum(axis=0) > 1 if len(returns) else np.zeros(len(symbols), dtype=bool)
+        priced = [(account, symbol, float(value)) for account, symbol, value in holdings
+                  if symbol in column and has_returns[column[symbol]] and isinstance(value, (int, float)) and value > 0]
+        unpriced = sorted({symbol for _, symbol, _ in holdings} - {symbol for _, symbol, _ in priced})
+        if unpriced:
+            self.logger.warning(f"No price history or market value for {len(unpriced)} holdings; left out of portfolio risk")
+        if not priced:
+            return {'confidence': self.confidence, 'observations': 0, 'portfolios': {}, 'correlated_pairs': [], 'unpriced': unpriced}
+
+        names = sorted({account for account, _, _ in priced}) + ['Total']
+        values = np.zeros((len(names), len(symbols)))
+        rows = np.array([names.index(account) for account, _, _ in priced])
+        columns = np.array([column[symbol] for _, symbol, _ in priced])
+        np.add.at(values, (rows, columns), [value for _, _, value in priced])
+        values[-1] = values[:-1].sum(axis=0)
+        weights = values / values.sum(axis=1, keepdims=True)
+
+        # Demeaned returns with gaps at zero, i.e. a missing day counts as an average day for that symbol
+        mean = np.nanmean(np.where(has_returns, returns, 0.0), axis=0)
+        centered = np.nan_to_num(returns - mean, nan=0.0)
+        observations = len(centered)
+        portfolio_centered = centered @ weights.T  # (dates x portfolios)
+        portfolio_returns = portfolio_centered + weights @ mean
+        variance = (portfolio_centered ** 2).sum(axis=0) / (observations - 1)
+        volatility = np.sqrt(variance)
+        # Share of each portfolio's variance from each holding: w_i (Σw)_i / wᵀΣw, summing to 1
+        covariance_weights = centered.T @ portfolio_centered / (observations - 1)  # (symbols x portfolios)
+        contributions = weights.T * covariance_weights / np.where(variance > 0, variance, np.nan)
+
+        tail = 1 - self.confidence
+        historical_var = -np.quantile(portfolio_returns, tail, axis=0)
+        in_tail = portfolio_returns <= -historical_var
+        historical_cvar = -(portfolio_returns * in_tail).sum(axis=0) / np.maximum(in_tail.sum(axis=0), 1)
+        normal = NormalDist()
+        z = normal.inv_cdf(self.confidence)
+        expected = weights @ mean
+        parametric_var = z * volatility - expected
+        parametric_cvar = volatility * normal.pdf(z) / tail - expected
+
+        portfolios = {}
+        for p, name in enumerate(names):
+            held = np.flatnonzero(weights[p])
+            top = held[np.argsort(-np.nan_to_num(contributions[held, p]))][:self.top_holdings]
+            portfolios[name] = {
+                'value': float(values[p].sum()),
+                'holdings': int(len(held)),
+                'volatility_daily': float(volatility[p]),
+                'volatility_annual': float(volatility[p] * np.sqrt(TRADING_DAYS)),
+                'var_historical': float(historical_var[p]),
+                'cvar_historical': float(historical_cvar[p]),
+                'var_parametric': float(parametric_var[p]),
+                'cvar_parametric': float(parametric_cvar[p]),
+                'risk_contributions': [
+                    {'symbol': symbols[i], 'weight': float(weights[p, i]), 'contribution': float(contributions[i, p])} for i in top
+                ],
+            }
+        held = np.flatnonzero(values[-1])
+        return {
+            'confidence': self.confidence,
+            'observations': observations,
+            'portfolios': portfolios,
+            'correlated_pairs': top_correlations(centered[:, held], [symbols[i] for i in held], self.top_pairs),
+            'unpriced': unpriced,
+        }
+
+def returns_matrix(closes):
+    """(dates-1 x symbols) simple daily returns; NaN where either day's close is missing"""
+    prices = closes.to_numpy(dtype=float)
+    if len(prices) < 2:
+        return np.empty((0, prices.shape[1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return prices[1:] / prices[:-1] - 1
+
+def top_correlations(centered, symbols, count=10, block=512):
+    """The count most correlated distinct pairs as [(symbol, symbol, correlation)]
+
+    The correlation matrix is computed block by block of rows and only the best pairs of each block
+    are kept, so thousands of holdings never need the whole N x N matrix in memory.
+    """
+    n = len(symbols)
+    if n < 2 or count <= 0:
+        return []
+    scale = np.sqrt((centered ** 2).sum(axis=0))
+    standardized = centered / np.where(scale > 0, scale, np.inf)
+    best_values, best_pairs = np.empty(0), np.empty((0, 2), dtype=int)
+    for start in range(0, n, block):
+        correlation = standardized[:, start:start + block].T @ standardized  # (block x N)
+        # Upper triangle only: each pair once and no symbol paired with itself
+        correlation[np.arange(n)[None, :] <= np.arange(start, start + len(correlation))[:, None]] = -np.inf
+        flat = correlation.ravel()
+        keep = np.argpartition(-flat, min(count, flat.size) - 1)[:count]
+        rows, cols = np.unravel_index(keep, correlation.shape)
+        best_values = np.concatenate([best_values, flat[keep]])
+        best_pairs = np.concatenate([best_pairs, np.column_stack([rows + start, cols])])
+        order = np.argsort(-best_values)[:count]
+        best_values, best_pairs = best_values[order], best_pairs[order]
+    return [(symbols[i], symbols[j], float(value)) for (i, j), value in zip(best_pairs, best_values) if np.isfinite(value)]
@@ -0,0 +1,177 @@
+import json, os, sqlite3, time
+import numpy as np
+import pandas as pd
+import settings
+from logger import Logger
+from price_cache import COLUMNS
+
+class PriceArchive:
+    """On-disk OHLCV archive of fixed-width arrays per symbol, read through numpy.memmap
+
+    Each symbol has SYMBOL.bars, a (rows x 5) array of Open, High, Low, Close, Volume in the archive's
+    dtype, and SYMBOL.dates, the matching int64 day numbers in ascending order. Readers map the files
+    and slice the window they need without parsing or copying; new bars are written in place at the
+    end of the files, which only ever grow. Freshness bookkeeping is the same as PriceCache's, so it
+    can stand in for it.
+    """
+    def __init__(self, directory=None, dtype=None, ttl_hours=None, max_symbols=None):
+        self.logger = Logger("PriceArchive")
+        self.directory = directory or settings.PRICE_ARCHIVE_DIR
+        self.ttl_seconds = float(ttl_hours if ttl_hours is not None else settings.PRICE_CACHE_TTL_HOURS) * 3600
+        self.max_symbols = int(max_symbols if max_symbols is not None else settings.PRICE_CACHE_MAX_SYMBOLS)
+        self.hits = self.partial_hits = self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        # The dtype is fixed when the archive is created; files never mix widths
+        meta_path = os.path.join(self.directory, "archive.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        else:
+            meta = {'dtype': dtype or settings.PRICE_ARCHIVE_DTYPE, 'columns': COLUMNS}
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        if dtype and np.dtype(dtype) != np.dtype(meta['dtype']):
+            self.logger.warning(f"Archive {self.directory} stores {meta['dtype']}, not {dtype}")
+        self.dtype = np.dtype(meta['dtype'])
+        self.conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT PRIMARY KEY,
+                start_date TEXT NOT NULL,
+                last_date TEXT,
+                rows INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+
+    def window(self, symbol, start_date=None, end_date=None):
+        """(dates, bars) for a symbol between the dates, inclusive: datetime64[D] and (rows x 5) memmap views
+
+        Nothing is copied; the views stay valid until the symbol is next written. Empty arrays if it is not archived.
+        """
+        rows = self._rows(symbol)
+        if not rows:
+            return np.empty(0, dtype='datetime64[D]'), np.empty((0, len(COLUMNS)), dtype=self.dtype)
+        dates = np.memmap(self._path(symbol, 'dates'), dtype='<i8', mode='r', shape=(rows,)).view('datetime64[D]')
+        bars = np.memmap(self._path(symbol, 'bars'), dtype=self.dtype, mode='r', shape=(rows, len(COLUMNS)))
+        lo = 0 if start_date is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date).date(), 'D'), side='left')
+        hi = rows if end_date is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date).date(), 'D'), side='right')
+        return dates[lo:hi], bars[lo:hi]
+
+    def append(self, symbol, frame):
+        """Write a Date-indexed OHLCV frame's bars; returns the number of rows now archived
+
+        Bars that line up with the end of the archive are written in place, overwriting the matching
+        tail rows (the last bar may have been an intraday snapshot) and extending the files. Anything
+        else, such as earlier bars or a frame that skips archived days, is merged into new files.
+        """
+        frame = frame.reindex(columns=COLUMNS).dropna(how='all')
+        if frame.empty:
+            return self._rows(symbol)
+        new_dates = frame.index.values.astype('datetime64[D]')
+        new_bars = frame.to_numpy(dtype=self.dtype)
+        dates = self.window(symbol)[0]
+        start = int(np.searchsorted(dates, new_dates[0], side='left'))
+        # In place only if every archived day from start on is in the frame, so the files never shrink
+        in_place = np.array_equal(dates[start:], new_dates[:len(dates) - start])
+        if not in_place:
+            merged = pd.concat([self.load(symbol), frame]).reindex(columns=COLUMNS)
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            del dates
+            return self._write(symbol, 0, merged.index.values.astype('datetime64[D]'), merged.to_numpy(dtype=self.dtype), replace=True)
+        del dates  # release the map before the files change
+        return self._write(symbol, start, new_dates, new_bars)
+
+    def _write(self, symbol, start, dates, bars, replace=False):
+        """Write rows from row start on, extending the files in place, or swap in whole new files with replace
+
+        Files are never truncated: a reader may still map them, and would fault on the lost pages.
+        Replacement goes through a temporary file and a rename, leaving such readers the old file.
+        """
+        for kind, values in (('dates', dates.astype('datetime64[D]').view('<i8')), ('bars', np.ascontiguousarray(bars, dtype=self.dtype))):
+            path = self._path(symbol, kind)
+            if replace:
+                with open(f"{path}.tmp", 'wb') as f:
+                    f.write(values.tobytes())
+                os.replace(f"{path}.tmp", path)
+                continue
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                row_bytes = values.itemsize * (values.shape[1] if values.ndim == 2 else 1)
+                f.seek(start * row_bytes)
+                f.write(values.tobytes())
+        rows = start + len(dates)
+        # start_date only matters for a symbol appended without store(), which always starts at row 0
+        first_date, last_date = (str(date) for date in dates.astype('datetime64[D]')[[0, -1]])
+        now = time.time()
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO symbols (symbol, start_date, last_date, rows, fetched_at, last_access) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET last_date = excluded.last_date, rows = excluded.rows
+            """, (symbol, first_date, last_date, rows, now, now))
+        return rows
+
+    def plan(self, symbol, start_date):
+        """Return the date to download from, or None when the archived bars are still fresh"""
+        row = self.conn.execute("SELECT start_date, last_date, fetched_at FROM symbols WHERE symbol = ?", (symbol,)).fetchone()
+        start = start_date.strftime('%Y-%m-%d')
+        if row is None or row[0] > start or row[1] is None:
+            self.misses += 1
+            return start_date
+        if time.time() - row[2] < self.ttl_seconds:
+            self.hits += 1
+            return None
+        # Re-fetch the last archived bar too: it may have been an intraday snapshot
+        self.partial_hits += 1
+        return pd.Timestamp(row[1]).to_pydatetime()
+
+    def store(self, symbol, frame, start_date):
+        """Archive downloaded bars for a symbol and mark it as refreshed"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO symbols (symbol, start_date, last_date, rows, fetched_at, last_access) VALUES (?, ?, NULL, 0, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    start_date = MIN(start_date, excluded.start_date),
+                    fetched_at = excluded.fetched_at,
+                    last_access = excluded.last_access
+            """, (symbol, start_date.strftime('%Y-%m-%d'), now, now))
+        self.append(symbol, frame)
+
+    def load(self, symbol, start_date=None, end_date=None):
+        """Archived bars for a symbol as a Date-indexed OHLCV frame over the memmap (no copy where pandas allows)"""
+        with self.conn:
+            self.conn.execute("UPDATE symbols SET last_access = ? WHERE symbol = ?", (time.time(), symbol))
+        dates, bars = self.window(symbol, start_date, end_date)
+        return pd.DataFrame(bars, index=pd.DatetimeIndex(dates.astype('datetime64[ns]'), name='Date'), columns=COLUMNS, copy=False)
+
+    def evict(self, keep=()):
+        """Drop least recently used symbols beyond the configured cap, never those in keep"""
+        keep = set(keep)
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT symbol FROM symbols ORDER BY last_access DESC LIMIT -1 OFFSET ?", (self.max_symbols,)
+        ) if row[0] not in keep]
+        for symbol in stale:
+            for kind in ('dates', 'bars'):
+                if os.path.exists(self._path(symbol, kind)):
+                    os.remove(self._path(symbol, kind))
+        if stale:
+            with self.conn:
+                self.conn.executemany("DELETE FROM symbols WHERE symbol = ?", [(s,) for s in stale])
+            self.logger.info(f"Evicted {len(stale)} symbols from price archive")
+        return stale
+
+    def log_stats(self):
+        total = self.hits + self.partial_hits + self.misses
+        self.logger.info(
+            f"Price archive: {self.hits} hits, {self.partial_hits} incremental refreshes, "
+            f"{self.misses} misses ({(self.hits + self.partial_hits) / total * 100 if total else 0:.1f}% reuse)"
+        )
+
+    def _rows(self, symbol):
+        row = self.conn.execute("SELECT rows FROM symbols WHERE symbol = ?", (symbol,)).fetchone()
+        return row[0] if row else 0
+
+    def _path(self, symbol, kind):
+        # Tickers such as BRK/B would otherwise become directories
+        return os.path.join(self.directory, f"{symbol.replace(os.sep, '_')}.{kind}")
@@ -0,0 +1,100 @@
+import os, sqlite3, time
+import pandas as pd
+import settings
+from logger import Logger
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class PriceCache:
+    """SQLite store of daily OHLCV bars keyed by symbol and date"""
+    def __init__(self, path=None, ttl_hours=None, max_symbols=None):
+        self.logger = Logger("PriceCache")
+        self.path = path or settings.PRICE_CACHE_PATH
+        self.ttl_seconds = float(ttl_hours if ttl_hours is not None else settings.PRICE_CACHE_TTL_HOURS) * 3600
+        self.max_symbols = int(max_symbols if max_symbols is not None else settings.PRICE_CACHE_MAX_SYMBOLS)
+        self.hits = self.partial_hits = self.misses = 0
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL, date TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, date)
+            );
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT PRIMARY KEY,
+                start_date TEXT NOT NULL,
+                last_date TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+        """)
+
+    def plan(self, symbol, start_date):
+        """Return the date to download from, or None when the cached bars are still fresh"""
+        row = self.conn.execute(
+            "SELECT start_date, last_date, fetched_at FROM symbols WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        start = start_date.strftime('%Y-%m-%d')
+        if row is None or row[0] > start or row[1] is None:
+            self.misses += 1
+            return start_date
+        if time.time() - row[2] < self.ttl_seconds:
+            self.hits += 1
+            return None
+        # Re-fetch the last cached bar too: it may have been an intraday snapshot
+        self.partial_hits += 1
+        return pd.Timestamp(row[1]).to_pydatetime()
+
+    def store(self, symbol, frame, start_date):
+        """Upsert downloaded bars for a symbol and mark it as refreshed"""
+        frame = frame.dropna(how='all')
+        rows = [
+            (symbol, date.strftime('%Y-%m-%d'), *(None if pd.isna(row.get(col)) else float(row.get(col)) for col in COLUMNS))
+            for date, row in frame.iterrows()
+        ]
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            last_date = self.conn.execute("SELECT MAX(date) FROM bars WHERE symbol = ?", (symbol,)).fetchone()[0]
+            self.conn.execute("""
+                INSERT INTO symbols (symbol, start_date, last_date, fetched_at, last_access) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    start_date = MIN(start_date, excluded.start_date),
+                    last_date = excluded.last_date,
+                    fetched_at = excluded.fetched_at,
+                    last_access = excluded.last_access
+            """, (symbol, start_date.strftime('%Y-%m-%d'), last_date, now, now))
+
+    def load(self, symbol, start_date, end_date):
+        """Read cached bars for a symbol as a Date-indexed OHLCV frame"""
+        with self.conn:
+            self.conn.execute("UPDATE symbols SET last_access = ? WHERE symbol = ?", (time.time(), symbol))
+        frame = pd.read_sql_query(
+            "SELECT date, open, high, low, close, volume FROM bars WHERE symbol = ? AND date >= ? AND date <= ? ORDER BY date",
+            self.conn, params=(symbol, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')),
+        )
+        frame.columns = ['Date'] + COLUMNS
+        frame['Date'] = pd.to_datetime(frame['Date'])
+        return frame.set_index('Date')
+
+    def evict(self, keep=()):
+        """Drop least recently used symbols beyond the configured cap, never those in keep"""
+        keep = set(keep)
+        stale = [row[0] for row in self.conn.execute(
+            "SELECT symbol FROM symbols ORDER BY last_access DESC LIMIT -1 OFFSET ?", (self.max_symbols,)
+        ) if row[0] not in keep]
+        if stale:
+            with self.conn:
+                self.conn.executemany("DELETE FROM bars WHERE symbol = ?", [(s,) for s in stale])
+                self.conn.executemany("DELETE FROM symbols WHERE symbol = ?", [(s,) for s in stale])
+            self.logger.info(f"Evicted {len(stale)} symbols from price cache")
+        return stale
+
+    def log_stats(self):
+        total = self.hits + self.partial_hits + self.misses
+        self.logger.info(
+            f"Price cache: {self.hits} hits, {self.partial_hits} incremental refreshes, "
+            f"{self.misses} misses ({(self.hits + self.partial_hits) / total * 100 if total else 0:.1f}% reuse)"
+        )
@@ -0,0 +1,51 @@
+import threading, time
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1, deadline=None):
+        """Block until amount tokens are available; False if that would pass the deadline"""
+        if self.rate <= 0:
+            return True  # unlimited
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def release(self, amount=1):
+        """Give back tokens taken for a request that was never sent"""
+        if self.rate <= 0:
+            return
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits applied together"""
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, tokens, deadline=None):
+        """Take one request and tokens from the budgets; False, with nothing taken, if that would pass the deadline"""
+        if not self.requests.acquire(1, deadline):
+            return False
+        if not self.tokens.acquire(tokens, deadline):
+            # The request is not sent, so it must not count against the requests-per-minute budget
+            self.requests.release(1)
+            return False
+        return True
@@ -1,18 +1,46 @@
+import sys
 from logger import Logger
+from metrics import timed
 
 from datetime import datetime
 
+def number(value, spec, prefix=''):
+    """A formatted metric, or N/A when there was too little history to compute it"""
+    if value is None or value != value:
+        return "N/A"
+    return f"{prefix}{value:{spec}}"
+
 class ReportGenerator:
     def __init__(self):
         self.logger = Logger("ReportGenerator")
         pass
-    def generate_report(self, output_file='portfolio_report.html', analysis_results={}):
-        """Generate an HTML report of the portfolio analysis"""
+    @timed('report')
+    def generate_report(self, output_file='portfolio_report.html', analysis_results={}, portfolio_risk=None):
+        """Generate an HTML report of the portfolio analysis ('-' writes it to stdout)"""
         if not analysis_results:
             self.logger.warning("No analysis results available. Run analyze_performance() first.")
             return
             
-        html_content = """
+        if output_file == '-':
+            self.write_report(analysis_results, sys.stdout, portfolio_risk)
+            sys.stdout.flush()
+        else:
+            # Sections go straight to a buffered file handle; the document is never held in memory
+            with open(output_file, 'w', buffering=1024 * 1024) as f:
+                self.write_report(analysis_results, f, portfolio_risk)
+            
+        self.logger.info(f"Generated report: {output_file}")
+        return output_file
+    def write_report(self, analysis_results, stream, portfolio_risk=None):
+        """Write the report to any text stream (file, stdout, ...) section by section"""
+        for chunk in self.render(analysis_results, portfolio_risk):
+            stream.write(chunk)
+    def render(self, analysis_results, portfolio_risk=None):
+        """Yield the HTML report in chunks, one account/position section at a time
+        
+        Suitable for streaming, e.g. to an HTTP response: wfile.write(chunk.encode()) for each chunk.
+        """
+        yield """
         <!DOCTYPE html>
         <html>
         <head>
@@ -38,9 +66,12 @@ class ReportGenerator:
             <p>Generated on: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
         """
         
+        if portfolio_risk and portfolio_risk['portfolios']:
+            yield from self.render_portfolio_risk(portfolio_risk)
+        
         # Add account sections
         for account_type, positions in analysis_results.items():
-            html_content += f"""
+            yield f"""
             <div class="account">
                 <h2>{account_type} Account</h2>
                 <p>Number of positions: {len(positions)}</p>
@@ -61,12 +92,12 @@ class ReportGenerator:
                     rec_class = 'sell'
                 
                 # Position header
-                company_name = position_data.get('stock', {}).get('name', symbol)
+                company_name = position_data.get('name') or symbol
                 quantity = position_data.get('quantity', 'N/A')
-                price = position_data.get('quote', {}).get('amount', 'N/A')
-                market_value = position_data.get('market_value', {}).get('amount', 'N/A')
+                price = position_data.get('quote', 'N/A')
+                market_value = position_data.get('market_value', 'N/A')
                 
-                html_content += f"""
+                yield f"""
                 <div class="position">
                     <h3>{symbol} - {company_name}</h3>
                     <p>Quantity: {quantity} | Current Price: ${price} | Market Value: ${market_value}</p>
@@ -78,12 +109,12 @@ class ReportGenerator:
                 
                 # Add key points
                 for point in summary['key_points']:
-                    html_content += f"<li>{point}</li>\n"
+                    yield f"<li>{point}</li>\n"
                 
-                html_content += "</ul>\n"
+                yield "</ul>\n"
                 
                 # Add technical metrics section
-                html_content += """
+                yield """
                     <h4>Technical Metrics</h4>
                     <div class="metrics">
                 """
@@ -91,95 +122,95 @@ class ReportGenerator:
                 if 'error' not in technical:
                     # SMA
                     if 'sma' in technical:
-                        html_content += f"""
+                        yield f"""
                         <div class="metric">
                             <h5>Moving Averages</h5>
-                            <p>Current Price: ${technical['sma']['price']:.2f}</p>
-                            <p>SMA 20: ${technical['sma']['sma20']:.2f}</p>
-                            <p>SMA 50: ${technical['sma']['sma50']:.2f}</p>
-                            <p>SMA 200: ${technical['sma']['sma200']:.2f}</p>
+                            <p>Current Price: {number(technical['sma']['price'], '.2f', '$')}</p>
+                            <p>SMA 20: {number(technical['sma']['sma20'], '.2f', '$')}</p>
+                            <p>SMA 50: {number(technical['sma']['sma50'], '.2f', '$')}</p>
+                            <p>SMA 200: {number(technical['sma']['sma200'], '.2f', '$')}</p>
                             <p>Trend: {technical['sma']['sma_trend']}</p>
                         </div>
                         """
                     
                     # RSI
                     if 'rsi' in technical:
-                        html_content += f"""
+                        yield f"""
                         <div class="metric">
                             <h5>RSI (14-day)</h5>
-                            <p>Value: {technical['rsi']['value']:.2f}</p>
+                            <p>Value: {number(technical['rsi']['value'], '.2f')}</p>
                             <p>Signal: {technical['rsi']['signal']}</p>
                         </div>
                         """
                     
                     # MACD
                     if 'macd' in technical:
-                        html_content += f"""
+                        yield f"""
                         <div class="metric">
                             <h5>MACD</h5>
-                            <p>MACD Line: {technical['macd']['macd_line']:.4f}</p>
-                            <p>Signal Line: {technical['macd']['signal_line']:.4f}</p>
-                            <p>Histogram: {technical['macd']['histogram']:.4f}</p>
+                            <p>MACD Line: {number(technical['macd']['macd_line'], '.4f')}</p>
+                            <p>Signal Line: {number(technical['macd']['signal_line'], '.4f')}</p>
+                            <p>Histogram: {number(technical['macd']['histogram'], '.4f')}</p>
                             <p>Signal: {technical['macd']['signal']}</p>
                         </div>
                         """
                     
                     # Performance
                     if 'performance' in technical:
-                        html_content += f"""
+                        yield f"""
                         <div class="metric">
                             <h5>Historical Performance</h5>
                             <p>Period: {technical['performance']['start_date']} to {technical['performance']['end_date']}</p>
-                            <p>Change: {technical['performance']['percent_change']:.2f}%</p>
+                            <p>Change: {number(technical['performance']['percent_change'], '.2f')}%</p>
                         </div>
                         """
                 else:
-                    html_content += f"""
+                    yield f"""
                     <div class="metric">
                         <h5>Technical Analysis Error</h5>
                         <p>{technical['error']}</p>
                     </div>
                     """
                 
-                html_content += "</div>\n"  # Close metrics div
+                yield "</div>\n"  # Close metrics div
                 
                 # Add research analysis section
-                html_content += """
+                yield """
                     <h4>Research Analysis</h4>
                 """
                 
                 if 'error' not in research:
-                    html_content += f"""
+                    yield f"""
                     <p><strong>Overall Sentiment:</strong> {research.get('sentiment', 'N/A')}</p>
                     """
                     
                     # Key drivers
                     if 'key_drivers' in research and research['key_drivers']:
-                        html_content += "<h5>Key Drivers</h5><ul>\n"
+                        yield "<h5>Key Drivers</h5><ul>\n"
                         if isinstance(research['key_drivers'], list):
                             for driver in research['key_drivers']:
-                                html_content += f"<li>{driver}</li>\n"
+                                yield f"<li>{driver}</li>\n"
                         else:
-                            html_content += f"<li>{research['key_drivers']}</li>\n"
-                        html_content += "</ul>\n"
+                            yield f"<li>{research['key_drivers']}</li>\n"
+                        yield "</ul>\n"
                     
                     # Risks
                     if 'risks' in research and research['risks']:
-                        html_content += "<h5>Potential Risks</h5><ul>\n"
+                        yield "<h5>Potential Risks</h5><ul>\n"
                         if isinstance(research['risks'], list):
                             for risk in research['risks']:
-                                html_content += f"<li>{risk}</li>\n"
+                                yield f"<li>{risk}</li>\n"
                         else:
-                            html_content += f"<li>{research['risks']}</li>\n"
-                        html_content += "</ul>\n"
+                            yield f"<li>{research['risks']}</li>\n"
+                        yield "</ul>\n"
                     
                     # Future outlook
                     if 'future_outlook' in research:
-                        html_content += f"<h5>Future Outlook</h5><p>{research['future_outlook']}</p>\n"
+                        yield f"<h5>Future Outlook</h5><p>{research['future_outlook']}</p>\n"
                     
                     # Recent news
                     if 'recent_news' in research and research['recent_news']:
-                        html_content += """
+                        yield """
                         <h5>Recent News</h5>
                         <table>
                             <tr>
@@ -190,7 +221,7 @@ class ReportGenerator:
                         """
                         
                         for news_item in research['recent_news']:
-                            html_content += f"""
+                            yield f"""
                             <tr>
                                 <td>{news_item['published']}</td>
                                 <td><a href="{news_item['url']}" target="_blank">{news_item['headline']}</a></td>
@@ -198,27 +229,82 @@ class ReportGenerator:
                             </tr>
                             """
                             
-                        html_content += "</table>\n"
+                        yield "</table>\n"
                 else:
-                    html_content += f"<p>Research analysis error: {research['error']}</p>\n"
+                    yield f"<p>Research analysis error: {research['error']}</p>\n"
                 
-                html_content += """
+                yield """
                 </div>  <!-- Close position div -->
                 """
             
-            html_content += """
+            yield """
             </div>  <!-- Close account div -->
             """
         
         # Close HTML content
-        html_content += """
+        yield """
         </body>
         </html>
         """
+    def render_portfolio_risk(self, risk):
+        """Yield the portfolio risk section: per-portfolio risk figures, top risk contributors and correlated pairs"""
+        confidence = f"{risk['confidence'] * 100:g}%"
+        yield f"""
+        <div class="account">
+            <h2>Portfolio Risk</h2>
+            <p>One-day {confidence} Value at Risk and Conditional VaR from {risk['observations']} daily returns</p>
+            <table>
+                <tr>
+                    <th>Portfolio</th>
+                    <th>Holdings</th>
+                    <th>Market Value</th>
+                    <th>Annualized Volatility</th>
+                    <th>Historical VaR</th>
+                    <th>Historical CVaR</th>
+                    <th>Parametric VaR</th>
+                    <th>Parametric CVaR</th>
+                </tr>
+        """
+        for name, stats in risk['portfolios'].items():
+            value = stats['value']
+            losses = "".join(
+                f"<td>${stats[key] * value:,.2f} ({stats[key] * 100:.2f}%)</td>"
+                for key in ('var_historical', 'cvar_historical', 'var_parametric', 'cvar_parametric')
+            )
+            yield f"""
+                <tr>
+                    <td>{name}</td>
+                    <td>{stats['holdings']}</td>
+                    <td>${value:,.2f}</td>
+                    <td>{stats['volatility_annual'] * 100:.2f}%</td>
+                    {losses}
+                </tr>
+            """
+        yield "</table>\n"
         
-        # Write to file
-        with open(output_file, 'w') as f:
-            f.write(html_content)
-            
-        self.logger.info(f"Generated report: {output_file}")
-        return output_file
\ No newline at end of file
+        for name, stats in risk['portfolios'].items():
+            yield f"""
+            <h4>{name}: Largest Risk Contributors</h4>
+            <table>
+                <tr><th>Symbol</th><th>Weight</th><th>Share of Variance</th></tr>
+            """
+            for holding in stats['risk_contributions']:
+                yield f"<tr><td>{holding['symbol']}</td><td>{holding['weight'] * 100:.2f}%</td><td>{holding['contribution'] * 100:.2f}%</td></tr>\n"
+            yield "</table>\n"
+        
+        if risk['correlated_pairs']:
+            yield """
+            <h4>Most Correlated Holdings</h4>
+            <table>
+                <tr><th>Symbol</th><th>Symbol</th><th>Correlation</th></tr>
+            """
+            for first, second, correlation in risk['correlated_pairs']:
+                yield f"<tr><td>{first}</td><td>{second}</td><td>{correlation:.2f}</td></tr>\n"
+            yield "</table>\n"
+        
+        if risk['unpriced']:
+            yield f"<p>Left out (no price history or market value): {', '.join(risk['unpriced'])}</p>\n"
+        
+        yield """
+        </div>  <!-- Close portfolio risk div -->
+        """
@@ -1,15 +1,153 @@
-import json, openai, settings
+import hashlib, json, random, threading, time, openai, settings
+from concurrent.futures import ThreadPoolExecutor
+from openai.types.chat import ChatCompletion
 from logger import Logger
 from datetime import datetime
 import yfinance as yf
+from rate_limiter import RateLimiter
+from research_cache import ResearchCache
+from metrics import metrics, profiled
+from cassette import get_cassette
+
+PROMPT_VERSION = 1  # bump whenever the prompt template changes so cached results are not reused
+SYSTEM_PROMPT = "You are a financial analyst providing concise stock analysis."
+EXPECTED_COMPLETION_TOKENS = 500  # budgeted against the tokens-per-minute limit for each request
+EXPECTED_BATCH_COMPLETION_TOKENS = 200  # per symbol in a batched request, where answers are terser
+RESULT_FIELDS = ('sentiment', 'key_drivers', 'risks', 'future_outlook')
+
 class ResearchAnalysis:
-    def __init__(self):
+    def __init__(self, refresh=False):
         self.logger = Logger("ResearchAnalysis")
+        self.cassette = get_cassette()
+        # A recording has to capture real completions, and a replay should only see recorded ones
+        self.cache = ResearchCache() if settings.RESEARCH_CACHE_PATH and self.cassette is None else None
+        self.refresh = refresh  # skip cache lookups but still store fresh results
+        self.timeout = float(settings.RESEARCH_TIMEOUT_SECONDS)
+        self.max_retries = int(settings.RESEARCH_MAX_RETRIES)
+        self.rate_limiter = RateLimiter(int(settings.RESEARCH_RPM), int(settings.RESEARCH_TPM))
+        # Retries are handled here so they share the rate limiter and per-symbol deadline
+        self.client = openai.OpenAI(api_key=settings.API_KEY, base_url=settings.OPENAI_BASE_URL or None, max_retries=0)
         
-    
-    def research_analysis(self, symbol):
-        """Get research-based analysis for a symbol using OpenAI"""
-        self.logger.info(f"Performing research analysis for {symbol}")
+    def research_many(self, symbols):
+        """Run research_analysis for many symbols concurrently, keyed by symbol"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        self.logger.info(f"Researching {len(symbols)} symbols with concurrency {settings.RESEARCH_CONCURRENCY}")
+        if self.cache is not None:
+            self.cache.reset_stats()  # the logged hit rate is for this run, not every run of a daemon
+        with ThreadPoolExecutor(max_workers=max(1, int(settings.RESEARCH_CONCURRENCY))) as executor:
+            if int(settings.RESEARCH_BATCH_TOKENS) > 0 and settings.API_KEY != 'your_openai_api_key':
+                results = self._research_batched(symbols, executor)
+            else:
+                futures = {symbol: executor.submit(self.research_analysis, symbol) for symbol in symbols}
+                results = {symbol: future.result() for symbol, future in futures.items()}
+        if self.cache is not None:
+            self.cache.log_stats()
+        return results
+    def _research_batched(self, symbols, executor):
+        """Research many symbols with several symbols per request, up to RESEARCH_BATCH_TOKENS each
+
+        News and cache lookups still run per symbol. Any symbol whose part of a batched answer is
+        missing or malformed is researched again on its own.
+        """
+        model = settings.MODEL
+        results, pending = {}, {}
+        gathered = {symbol: executor.submit(self._news_and_cache, model, symbol) for symbol in symbols}
+        for symbol, future in gathered.items():
+            try:
+                news, cache_key, cached = future.result()
+            except Exception as e:
+                self.logger.error(f"Research analysis failed for {symbol}: {str(e)}", symbol=symbol)
+                results[symbol] = {"error": str(e)}
+                continue
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                pending[symbol] = (news, cache_key)
+        
+        batches = self._plan_batches(pending)
+        self.logger.info(f"Researching {len(pending)} uncached symbols in {len(batches)} requests")
+        # A symbol that fills a batch on its own just takes the regular single-symbol path
+        singles = {batch[0]: executor.submit(self.research_analysis, batch[0], *pending[batch[0]]) for batch in batches if len(batch) == 1}
+        futures = [executor.submit(self._research_batch, model, batch, pending) for batch in batches if len(batch) > 1]
+        results.update({symbol: future.result() for symbol, future in singles.items()})
+        retry = []
+        for future in futures:
+            batch_results, missing = future.result()
+            results.update(batch_results)
+            retry.extend(missing)
+        if retry:
+            self.logger.warning(f"Falling back to single-symbol research for {len(retry)} symbols")
+            metrics.count('research_batch_fallbacks', len(retry))
+            fallbacks = {symbol: executor.submit(self.research_analysis, symbol, *pending[symbol]) for symbol in retry}
+            results.update({symbol: future.result() for symbol, future in fallbacks.items()})
+        return {symbol: results[symbol] for symbol in symbols}
+    def _plan_batches(self, pending):
+        """Group symbols so each request's estimated prompt and completion tokens stay within the budget"""
+        budget = int(settings.RESEARCH_BATCH_TOKENS)
+        base = (len(SYSTEM_PROMPT) + len(batch_prompt({}))) // 4
+        batches, batch, used = [], [], base
+        for symbol, (news, _) in pending.items():
+            cost = len(symbol_section(symbol, news)) // 4 + EXPECTED_BATCH_COMPLETION_TOKENS
+            if batch and used + cost > budget:
+                batches.append(batch)
+                batch, used = [], base
+            batch.append(symbol)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+    def _research_batch(self, model, batch, pending):
+        """One request for a batch; returns (results for valid symbols, symbols to retry on their own)"""
+        deadline = time.monotonic() + self.timeout
+        prompt = batch_prompt({symbol: pending[symbol][0] for symbol in batch})
+        try:
+            with metrics.timer('openai_batch_call'):
+                response = self._complete(model, prompt, deadline, EXPECTED_BATCH_COMPLETION_TOKENS * len(batch))
+            metrics.count('llm_calls')
+            total_tokens = getattr(response.usage, 'total_tokens', 0) or 0
+            metrics.count('llm_tokens', total_tokens)
+            answer = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            self.logger.warning(f"Batched research for {len(batch)} symbols failed: {str(e)}")
+            return {}, batch
+        
+        results, missing = {}, []
+        for symbol in batch:
+            analysis = answer.get(symbol) if isinstance(answer, dict) else None
+            if not isinstance(analysis, dict) or any(field not in analysis for field in RESULT_FIELDS):
+                missing.append(symbol)
+                continue
+            news, cache_key = pending[symbol]
+            analysis = {field: analysis[field] for field in RESULT_FIELDS}
+            analysis['recent_news'] = news[:5] if news else []
+            if self.cache is not None:
+                self.cache.put(cache_key, symbol, analysis, total_tokens // len(batch))
+            results[symbol] = analysis
+        return results, missing
+    def _news_and_cache(self, model, symbol):
+        """(news, cache key, cached analysis or None) for a symbol; raises TimeoutError if the news hangs"""
+        with metrics.timer('news_fetch', symbol):
+            news = self.get_stock_news(symbol, deadline=time.monotonic() + self.timeout)
+        cache_key = ResearchCache.make_key(model, PROMPT_VERSION, symbol, [item['headline'] for item in news[:5]])
+        if self.cache is not None and not self.refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.debug(f"Research cache hit for {symbol}", symbol=symbol)
+                metrics.count('research_cache_hits')
+                return news, cache_key, cached
+        return news, cache_key, None
+    def research_analysis(self, symbol, news=None, cache_key=None):
+        """Get research-based analysis for a symbol using OpenAI
+
+        News is fetched unless given. A given cache_key means the cache was already checked for it.
+        """
+        with metrics.timer('research', symbol), profiled('research', symbol):
+            return self._research_analysis(symbol, news, cache_key)
+    def _research_analysis(self, symbol, news=None, cache_key=None):
+        self.logger.info(f"Performing research analysis for {symbol}", symbol=symbol)
+        deadline = time.monotonic() + self.timeout
         
         api_key = settings.API_KEY
         model = settings.MODEL  # Use the model from config, default to gpt-4
@@ -19,13 +157,22 @@ class ResearchAnalysis:
             return {"error": "OpenAI API key not configured"}
             
         try:
-            # Configure OpenAI client
-            openai.api_key = api_key
-            
             # Get recent news about the stock
-            news = self.get_stock_news(symbol)
+            if news is None:
+                with metrics.timer('news_fetch', symbol):
+                    news = self.get_stock_news(symbol, deadline=deadline)
             news_summary = "\n".join([f"- {item['headline']}" for item in news[:5]]) if news else "No recent news found."
             
+            # Same model, prompt and headlines as a previous run: reuse that analysis
+            if cache_key is None:
+                cache_key = ResearchCache.make_key(model, PROMPT_VERSION, symbol, [item['headline'] for item in news[:5]])
+                if self.cache is not None and not self.refresh:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        self.logger.debug(f"Research cache hit for {symbol}", symbol=symbol)
+                        metrics.count('research_cache_hits')
+                        return cached
+            
             # Prepare prompt for OpenAI
             prompt = f"""
             Please analyze the stock {symbol} based on the following recent news:
@@ -42,12 +189,10 @@ class ResearchAnalysis:
             """
             
             # Call OpenAI API
-            response = openai.chat.completions.create(
-                model=model,  # Use model from config
-                messages=[{"role": "system", "content": "You are a financial analyst providing concise stock analysis."},
-                         {"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
+            with metrics.timer('openai_call', symbol):
+                response = self._complete(model, prompt, deadline)
+            metrics.count('llm_calls')
+            metrics.count('llm_tokens', getattr(response.usage, 'total_tokens', 0) or 0)
             
             # Parse the response
             analysis_text = response.choices[0].message.content
@@ -56,17 +201,51 @@ class ResearchAnalysis:
             # Add news sources to the response
             analysis['recent_news'] = news[:5] if news else []
             
+            if self.cache is not None:
+                self.cache.put(cache_key, symbol, analysis, getattr(response.usage, 'total_tokens', 0))
+            
             return analysis
             
         except Exception as e:
-            self.logger.error(f"Research analysis failed for {symbol}: {str(e)}")
+            self.logger.error(f"Research analysis failed for {symbol}: {str(e)}", symbol=symbol)
             return {"error": str(e)}
-    def get_stock_news(self, symbol, max_items=10):
-        """Get recent news for a stock symbol"""
+    def _complete(self, model, prompt, deadline, completion_tokens=EXPECTED_COMPLETION_TOKENS):
+        """Chat completion, recorded to or replayed from the cassette when one is active"""
+        if self.cassette is None:
+            return self._complete_live(model, prompt, deadline, completion_tokens)
+        key = hashlib.sha256(json.dumps([model, SYSTEM_PROMPT, prompt]).encode()).hexdigest()
+        payload = self.cassette.through('completion', key, lambda: self._complete_live(model, prompt, deadline, completion_tokens).model_dump(mode='json'))
+        return ChatCompletion.model_validate(payload)
+    def _complete_live(self, model, prompt, deadline, completion_tokens=EXPECTED_COMPLETION_TOKENS):
+        """Chat completion with rate limiting and jittered exponential backoff on 429/5xx"""
+        estimated_tokens = (len(SYSTEM_PROMPT) + len(prompt)) // 4 + completion_tokens
+        for attempt in range(self.max_retries + 1):
+            if not self.rate_limiter.acquire(estimated_tokens, deadline):
+                raise TimeoutError("Rate limit wait would exceed the research timeout")
+            try:
+                return self.client.chat.completions.create(
+                    model=model,  # Use model from config
+                    messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                             {"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"},
+                    timeout=max(deadline - time.monotonic(), 0.001)
+                )
+            except (openai.RateLimitError, openai.InternalServerError, openai.APITimeoutError, openai.APIConnectionError) as e:
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                backoff = random.uniform(0, min(30.0, 2 ** attempt))
+                if attempt == self.max_retries or time.monotonic() + backoff >= deadline:
+                    raise
+                self.logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {backoff:.1f}s")
+                time.sleep(backoff)
+    def get_stock_news(self, symbol, max_items=10, deadline=None):
+        """Get recent news for a stock symbol; raises TimeoutError if it has not arrived by the deadline"""
         try:
             # Using Yahoo Finance for news
-            stock = yf.Ticker(symbol)
-            news = stock.news
+            if self.cassette is None:
+                fetch = lambda: yf.Ticker(symbol).news
+            else:
+                fetch = lambda: self.cassette.through('news', symbol, lambda: yf.Ticker(symbol).news)
+            news = fetch() if deadline is None else call_with_deadline(fetch, deadline, f"News for {symbol}")
             
             # Format news items
             formatted_news = []
@@ -79,6 +258,44 @@ class ResearchAnalysis:
                 })
                 
             return formatted_news
+        except TimeoutError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Failed to get news for {symbol}: {str(e)}", symbol=symbol)
+            return []
+
+def call_with_deadline(function, deadline, what):
+    """function() on a daemon thread, raising TimeoutError if it has not returned by the deadline
+
+    A hung call cannot be stopped, only abandoned; as a daemon its thread does not hold up exit.
+    """
+    outcome = {}
+    def run():
+        try:
+            outcome['value'] = function()
         except Exception as e:
-            self.logger.error(f"Failed to get news for {symbol}: {str(e)}")
-            return []
\ No newline at end of file
+            outcome['error'] = e
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(max(deadline - time.monotonic(), 0))
+    if thread.is_alive():
+        raise TimeoutError(f"{what} did not arrive within the research timeout")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+def symbol_section(symbol, news):
+    headlines = "\n".join(f"- {item['headline']}" for item in news[:5]) if news else "- No recent news found."
+    return f"### {symbol}\n{headlines}\n"
+
+def batch_prompt(news_by_symbol):
+    """One prompt covering several symbols; the answer must be a JSON object keyed by symbol"""
+    sections = "\n".join(symbol_section(symbol, news) for symbol, news in news_by_symbol.items())
+    return (
+        "Analyze each of the following stocks based on its recent news headlines.\n"
+        f"Symbols: {', '.join(news_by_symbol)}\n\n"
+        f"{sections}\n"
+        "Respond with a single JSON object with one key per symbol, exactly as listed above. Each value is an "
+        "object with the fields: sentiment (bullish/bearish/neutral), key_drivers (list of strings), "
+        "risks (list of strings) and future_outlook (string). Keep each analysis concise.\n"
+    )
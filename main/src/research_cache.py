@@ -0,0 +1,72 @@
+import hashlib, json, os, sqlite3, threading, time
+import settings
+from logger import Logger
+
+class ResearchCache:
+    """SQLite store of LLM research results keyed by a hash of everything that shaped the prompt"""
+    def __init__(self, path=None, ttl_hours=None, max_entries=None):
+        self.logger = Logger("ResearchCache")
+        self.path = path or settings.RESEARCH_CACHE_PATH
+        self.ttl_seconds = float(ttl_hours if ttl_hours is not None else settings.RESEARCH_CACHE_TTL_HOURS) * 3600
+        self.max_entries = int(max_entries if max_entries is not None else settings.RESEARCH_CACHE_MAX_ENTRIES)
+        self.reset_stats()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # research_many calls in from worker threads
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS research (
+                key TEXT PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+
+    @staticmethod
+    def make_key(model, prompt_version, symbol, headlines):
+        """Content address for a research request; headline order does not matter"""
+        payload = json.dumps([model, prompt_version, symbol, sorted(headlines)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """Return the cached analysis dict, or None on a miss or expired entry"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT analysis, total_tokens, created_at FROM research WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[2] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE research SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            self.tokens_saved += row[1]
+            return json.loads(row[0])
+
+    def put(self, key, symbol, analysis, total_tokens=0):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO research VALUES (?, ?, ?, ?, ?, ?)",
+                (key, symbol, json.dumps(analysis), int(total_tokens or 0), now, now),
+            )
+            # LRU eviction beyond the entry cap
+            self.conn.execute(
+                "DELETE FROM research WHERE key IN (SELECT key FROM research ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def reset_stats(self):
+        """Start counting hits and misses afresh, e.g. for each cycle of a daemon"""
+        self.hits = self.misses = self.tokens_saved = 0
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        self.logger.info(
+            f"Research cache: {self.hits}/{total} hits ({self.hits / total * 100 if total else 0:.1f}%), "
+            f"~{self.tokens_saved} tokens saved"
+        )
@@ -0,0 +1,51 @@
+import threading, time
+from logger import Logger
+
+class Scheduler:
+    """Runs a job every interval_hours in one long-lived process
+
+    Cycles never overlap: a cycle that is still running when the next one is due makes the
+    missed ticks coalesce into the next slot instead of queueing up back-to-back runs.
+    """
+    def __init__(self, interval_hours, job):
+        self.logger = Logger("Scheduler")
+        self.interval = float(interval_hours) * 3600
+        if self.interval <= 0:
+            raise ValueError("update_frequency_hours must be positive to run as a daemon")
+        self.job = job
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run_once(self):
+        """Run the job unless a cycle is already in progress; returns False if skipped"""
+        if not self.lock.acquire(blocking=False):
+            self.logger.warning("Previous cycle still running, skipping this one")
+            return False
+        started = time.monotonic()
+        try:
+            self.job()
+        except Exception as e:
+            self.logger.error(f"Cycle failed: {str(e)}")
+        finally:
+            self.lock.release()
+        self.logger.info(f"Cycle finished in {time.monotonic() - started:.1f}s")
+        return True
+
+    def run_forever(self):
+        self.logger.info(f"Running every {self.interval / 3600:g} hours")
+        next_run = time.monotonic()
+        try:
+            while not self.stopped.is_set():
+                self.run_once()
+                next_run += self.interval
+                now = time.monotonic()
+                if next_run <= now:
+                    missed = int((now - next_run) // self.interval) + 1
+                    next_run += missed * self.interval
+                    self.logger.warning(f"Cycle overran its interval, skipping {missed} scheduled run(s)")
+                self.stopped.wait(next_run - now)
+        except KeyboardInterrupt:
+            self.logger.info("Stopping scheduler")
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,151 @@
+import csv, hashlib, os, sqlite3, time
+import pandas as pd
+import settings
+from logger import Logger
+from metrics import metrics
+from snapshot_store import TECHNICAL_FIELDS, TEXT_FIELDS, to_sql
+
+# Points each reported signal adds to a symbol's screening score
+SIGNAL_SCORES = {
+    'sma_trend': {'bullish': 1, 'bearish': -1},
+    'rsi_signal': {'oversold': 1, 'overbought': -1},
+    'macd_signal': {'bullish': 1, 'bearish': -1},
+    'bb_signal': {'lower_touch': 1, 'upper_touch': -1},
+}
+COLUMNS = ('symbol', 'position', 'score') + tuple(TECHNICAL_FIELDS) + ('error',)
+# Settings that change a symbol's results; a checkpoint only resumes under the same values
+RESULT_SETTINGS = ('TECHNICAL_INDICATORS', 'RSI_SMOOTHING', 'INDICATOR_MODE', 'INDICATOR_ENGINE', 'LOOKBACK_PERIOD_DAYS')
+
+class Screener:
+    """Runs TechnicalAnalysis's indicator pipeline over an arbitrary universe of Yahoo tickers
+
+    The universe file is read lazily and screened in fixed-size chunks; only one chunk's prices and
+    results are in memory at a time. Each finished chunk is committed to a SQLite checkpoint, so an
+    interrupted screen resumes where it stopped, and the ranked CSV is streamed from that checkpoint.
+    """
+    def __init__(self, tech_analysis, chunk_size=None):
+        self.logger = Logger("Screener")
+        self.tech_analysis = tech_analysis
+        self.chunk_size = max(1, int(chunk_size or settings.SCREEN_CHUNK_SIZE))
+
+    def run(self, universe_path, output_path, checkpoint_path=None, restart=False, rank_by='score', ascending=False):
+        """Screen universe_path into a ranked CSV at output_path and return a summary dict"""
+        if rank_by not in COLUMNS[2:-1]:
+            raise ValueError(f"Cannot rank by {rank_by}; choose one of {', '.join(COLUMNS[2:-1])}")
+        checkpoint_path = checkpoint_path or os.path.splitext(output_path)[0] + ".checkpoint.sqlite"
+        conn = self._open_checkpoint(checkpoint_path, universe_path, restart)
+        screened = skipped = 0
+        started = time.perf_counter()
+        try:
+            for offset, chunk in chunked(read_universe(universe_path), self.chunk_size):
+                positions = {}
+                for i, symbol in enumerate(chunk):
+                    positions.setdefault(symbol, offset + i)
+                placeholders = ', '.join('?' * len(positions))
+                done = {row[0] for row in conn.execute(f"SELECT symbol FROM results WHERE symbol IN ({placeholders})", list(positions))}
+                todo = [symbol for symbol in positions if symbol not in done]
+                skipped += len(positions) - len(todo)  # screened before the interruption, or listed twice
+                if not todo:
+                    continue
+                chunk_started = time.perf_counter()
+                results = self.tech_analysis.technical_many(todo)
+                # Drop the chunk's prices so memory does not grow with the universe
+                self.tech_analysis.price_data = pd.DataFrame()
+                with conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                        (screen_row(symbol, positions[symbol], results[symbol]) for symbol in todo),
+                    )
+                screened += len(todo)
+                metrics.count('symbols_screened', len(todo))
+                rate = len(todo) / (time.perf_counter() - chunk_started)
+                self.logger.info(f"Screened {screened + skipped} symbols ({rate:.1f} symbols/s for the last chunk)")
+            total = self._write_ranked(conn, output_path, rank_by, ascending)
+            errors = conn.execute("SELECT COUNT(*) FROM results WHERE error IS NOT NULL").fetchone()[0]
+        finally:
+            conn.close()
+        seconds = time.perf_counter() - started
+        return {
+            'symbols': total, 'screened': screened, 'skipped': skipped, 'errors': errors, 'seconds': seconds,
+            'symbols_per_second': screened / seconds if seconds else None, 'output': output_path, 'checkpoint': checkpoint_path,
+        }
+
+    def _open_checkpoint(self, path, universe_path, restart):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path)
+        if restart:
+            conn.executescript("DROP TABLE IF EXISTS results; DROP TABLE IF EXISTS meta;")
+        types = lambda column: 'TEXT' if column in TEXT_FIELDS | {'error'} else 'INTEGER' if column in ('position', 'score') else 'REAL'
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS results ({', '.join(f'{column} {types(column)}' for column in COLUMNS)}, PRIMARY KEY (symbol));
+        """)
+        # A checkpoint only resumes the same universe with the same indicator settings
+        fingerprint = '|'.join([file_digest(universe_path)] + [f"{name}={getattr(settings, name)}" for name in RESULT_SETTINGS])
+        stored = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        if stored is None:
+            with conn:
+                conn.execute("INSERT INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+        elif stored[0] != fingerprint:
+            conn.close()
+            raise ValueError(f"Checkpoint {path} is for another universe or indicator settings; restart to discard it")
+        else:
+            count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count:
+                self.logger.info(f"Resuming from {path}: {count} symbols already screened")
+        return conn
+
+    def _write_ranked(self, conn, output_path, rank_by, ascending):
+        """Stream the checkpoint, best first and symbols without a value last, into a CSV; returns the row count"""
+        cursor = conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM results ORDER BY {rank_by} IS NULL, {rank_by} {'ASC' if ascending else 'DESC'}, position"
+        )
+        tmp = f"{output_path}.tmp"
+        rows = 0
+        with open(tmp, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('rank',) + COLUMNS)
+            for rows, row in enumerate(cursor, start=1):
+                writer.writerow((rows,) + row)
+        os.replace(tmp, output_path)
+        return rows
+
+def read_universe(path):
+    """Yield tickers from a one-per-line or CSV file (its symbol or ticker column, else the first), in file order"""
+    with open(path, newline='') as f:
+        column = None
+        for row in csv.reader(line for line in f if line.strip() and not line.lstrip().startswith('#')):
+            if column is None:
+                header = [cell.strip().lower() for cell in row]
+                column = next((header.index(name) for name in ('symbol', 'ticker') if name in header), None)
+                if column is not None:
+                    continue
+                column = 0
+            if len(row) > column and row[column].strip():
+                yield row[column].strip().upper()
+
+def chunked(symbols, size):
+    """Yield (offset, list of up to size symbols) from an iterable without reading it all"""
+    chunk, offset = [], 0
+    for symbol in symbols:
+        chunk.append(symbol)
+        if len(chunk) == size:
+            yield offset, chunk
+            offset, chunk = offset + size, []
+    if chunk:
+        yield offset, chunk
+
+def screen_row(symbol, position, technical):
+    """Checkpoint row: flattened indicators, a signal score and the error if analysis failed"""
+    values = {column: (technical.get(group) or {}).get(field) for column, (group, field) in TECHNICAL_FIELDS.items()}
+    error = technical.get('error')
+    score = None if error else sum(scores.get(values[column], 0) for column, scores in SIGNAL_SCORES.items())
+    return (symbol, position, score) + tuple(to_sql(column, values[column]) for column in TECHNICAL_FIELDS) + (error,)
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
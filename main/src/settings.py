@@ -10,7 +10,48 @@ USERNAME = os.getenv("username", "")
 PASSWORD = os.getenv("password", "")
 API_KEY = os.getenv("api_key", "")
 LOOKBACK_PERIOD_DAYS = os.getenv("lookback_period_days","365")
-TECHNICAL_INDICATORS = os.getenv("technical_indicators","")
+TECHNICAL_INDICATORS = os.getenv("technical_indicators","")  # comma separated: sma, rsi, macd, bollinger_bands, performance, volatility (empty = all)
 UPDATE_FREQUENCY_HOURS = os.getenv("update_frequency_hours","")
+HOLDINGS_CONCURRENCY = os.getenv("holdings_concurrency","4")
+HOLDINGS_TIMEOUT_SECONDS = os.getenv("holdings_timeout_seconds","30")
+HOLDINGS_MAX_RETRIES = os.getenv("holdings_max_retries","2")
 IS_DEBUG = os.getenv("is_debug","")
-MODEL = os.getenv("model","gpt-4o")
\ No newline at end of file
+LOG_DIR = os.getenv("log_dir","logs")
+LOG_FORMAT = os.getenv("log_format","text")  # text or json (JSON lines)
+LOG_MAX_BYTES = os.getenv("log_max_bytes","10485760")
+LOG_BACKUP_COUNT = os.getenv("log_backup_count","5")
+LOG_SAMPLE_RATE = os.getenv("log_sample_rate","1")  # fraction of symbols whose per-symbol info/debug lines are kept
+METRICS_PATH = os.getenv("metrics_path","")  # *.prom for a Prometheus textfile, anything else for JSON; empty = off
+PROFILE_SYMBOL = os.getenv("profile_symbol","")  # cProfile this symbol's research (and per-symbol technical analysis)
+CASSETTE_MODE = os.getenv("cassette_mode","")  # record or replay external responses; empty = live
+CASSETTE_PATH = os.getenv("cassette_path","cassettes/latest.sqlite")
+MODEL = os.getenv("model","gpt-4o")
+DOWNLOAD_BATCH_SIZE = os.getenv("download_batch_size","100")
+PRICE_CACHE_PATH = os.getenv("price_cache_path","cache/prices.sqlite")
+PRICE_CACHE_TTL_HOURS = os.getenv("price_cache_ttl_hours","6")
+PRICE_CACHE_MAX_SYMBOLS = os.getenv("price_cache_max_symbols","2000")
+PRICE_STORE = os.getenv("price_store","sqlite")  # sqlite (price_cache_path) or archive (memory-mapped arrays in price_archive_dir)
+PRICE_ARCHIVE_DIR = os.getenv("price_archive_dir","cache/archive")
+PRICE_ARCHIVE_DTYPE = os.getenv("price_archive_dtype","float64")  # float32 halves the archive; volumes above 2^24 lose precision
+SYMBOL_INDEX_PATH = os.getenv("symbol_index_path","cache/symbols.sqlite")  # resolved Yahoo tickers, kept across runs
+OPENAI_BASE_URL = os.getenv("openai_base_url","")
+RESEARCH_CONCURRENCY = os.getenv("research_concurrency","4")
+RESEARCH_RPM = os.getenv("research_rpm","500")
+RESEARCH_TPM = os.getenv("research_tpm","30000")
+RESEARCH_TIMEOUT_SECONDS = os.getenv("research_timeout_seconds","60")
+RESEARCH_MAX_RETRIES = os.getenv("research_max_retries","3")
+RESEARCH_BATCH_TOKENS = os.getenv("research_batch_tokens","0")  # token budget per multi-symbol request; 0 = one symbol per request
+RESEARCH_CACHE_PATH = os.getenv("research_cache_path","cache/research.sqlite")
+RESEARCH_CACHE_TTL_HOURS = os.getenv("research_cache_ttl_hours","24")
+RESEARCH_CACHE_MAX_ENTRIES = os.getenv("research_cache_max_entries","5000")
+INDICATOR_ENGINE = os.getenv("indicator_engine","panel")  # panel or symbol; only used when indicator_mode is full
+INDICATOR_WORKERS = os.getenv("indicator_workers","1")  # processes for indicator math; 0 = one per CPU, 1 = in-process
+INDICATOR_WORKERS_MIN_SYMBOLS = os.getenv("indicator_workers_min_symbols","500")  # smaller runs are not worth the process overhead
+INDICATOR_MODE = os.getenv("indicator_mode","full")  # full, latest or streaming; latest and streaming run per symbol and override indicator_engine
+RSI_SMOOTHING = os.getenv("rsi_smoothing","simple")
+INDICATOR_STATE_DIR = os.getenv("indicator_state_dir","cache/indicator_state")
+SNAPSHOT_PATH = os.getenv("snapshot_path","snapshots/portfolio.sqlite")  # append-only history of every run; empty = not kept
+RISK_CONFIDENCE = os.getenv("risk_confidence","0.95")  # VaR/CVaR confidence level for the portfolio risk section
+BACKTEST_HORIZONS = os.getenv("backtest_horizons","5,20")  # forward windows, in bars, that signals are scored over
+BACKTEST_YEARS = os.getenv("backtest_years","5")
+SCREEN_CHUNK_SIZE = os.getenv("screen_chunk_size","250")  # symbols per chunk in screen mode; bounds its memory
\ No newline at end of file
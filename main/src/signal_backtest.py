@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import settings
+from logger import Logger
+from metrics import timed
+from indicator_engine import IndicatorEngine
+
+# Signal -> the move it predicts: 1 for a rise, -1 for a fall. Band touches are read as mean reversion.
+SIGNALS = {
+    'sma_bullish': 1, 'sma_bearish': -1,
+    'rsi_oversold': 1, 'rsi_overbought': -1,
+    'macd_bullish': 1, 'macd_bearish': -1,
+    'macd_bullish_cross': 1, 'macd_bearish_cross': -1,
+    'bb_lower_touch': 1, 'bb_upper_touch': -1,
+}
+
+class SignalBacktest:
+    """Checks the signals technical analysis reports against what prices did next, for all symbols at once
+
+    The signals follow the rules of IndicatorEngine.symbol_result and use its indicator series, with every
+    (dates x symbols) bar evaluated as one array. The only Python loops are over signals and horizons.
+    """
+    def __init__(self, horizons=None, wilder_rsi=None):
+        self.logger = Logger("SignalBacktest")
+        horizons = horizons if horizons is not None else settings.BACKTEST_HORIZONS
+        self.horizons = [int(h) for h in horizons.split(',')] if isinstance(horizons, str) else list(horizons)
+        if wilder_rsi is None:
+            wilder_rsi = settings.RSI_SMOOTHING == 'wilder'
+        self.engine = IndicatorEngine(wilder_rsi=wilder_rsi)
+
+    def signals(self, close):
+        """{signal: (dates x symbols) bool array} for an aligned close frame"""
+        series = {name: frame.to_numpy() for name, frame in self.engine.series(close).items()}
+        price = close.to_numpy(dtype=float)
+        sma20, sma50, rsi = series['sma20'], series['sma50'], series['rsi']
+        macd, signal_line = series['macd_line'], series['signal_line']
+        # Comparisons with NaN are False, so bars before an indicator's warm-up never signal
+        with np.errstate(invalid='ignore'):
+            macd_bullish = macd > signal_line
+            macd_bearish = macd <= signal_line
+            previous = lambda flags: np.vstack([np.zeros((1, flags.shape[1]), dtype=bool), flags[:-1]])
+            return {
+                'sma_bullish': (sma20 > sma50) & (price > sma20),
+                'sma_bearish': (sma20 < sma50) & (price < sma20),
+                'rsi_oversold': rsi < 30,
+                'rsi_overbought': rsi > 70,
+                'macd_bullish': macd_bullish,
+                'macd_bearish': macd_bearish,
+                'macd_bullish_cross': macd_bullish & previous(macd_bearish),
+                'macd_bearish_cross': macd_bearish & previous(macd_bullish),
+                'bb_lower_touch': price <= series['bb_lower'],
+                'bb_upper_touch': price >= series['bb_upper'],
+            }
+
+    @timed('backtest')
+    def run(self, closes):
+        """Hit rate, average forward return and drawdown of every signal at every horizon
+
+        closes is a (dates x symbols) close matrix, e.g. years of history. A signal counts as a hit when
+        the return over the next horizon bars has the predicted sign. 'drawdown' is the average and worst
+        move against the signal within those bars; 'strategy_drawdown' is the maximum drawdown of holding
+        every signalled symbol for the next day, equal weighted.
+
+        Signals and per-symbol returns run on right-aligned columns, each symbol's own trading days. The
+        basket has to compare symbols on the same day, so it runs on closes' dates instead, and a symbol
+        keeps its last signal, at a 0 return, over days it did not trade.
+        """
+        close = IndicatorEngine.align_right(closes)
+        price = close.to_numpy(dtype=float)
+        signals = self.signals(close)
+        dated = closes.to_numpy(dtype=float)
+        order, traded = IndicatorEngine.align_order(dated), ~np.isnan(dated)
+        filled = closes.ffill().to_numpy(dtype=float)
+        # Nothing to hold after a symbol's last bar
+        listed = np.flip(np.logical_or.accumulate(np.flip(traded, axis=0), axis=0), axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            next_day = np.where(shifted(listed.astype(float), 1) == 1, shifted(filled, 1) / filled - 1, np.nan)
+            windows = {}
+            for horizon in self.horizons:
+                # Lowest and highest close in the horizon bars after each bar
+                lowest = close.rolling(horizon).min().shift(-horizon).to_numpy() / price - 1
+                highest = close.rolling(horizon).max().shift(-horizon).to_numpy() / price - 1
+                windows[horizon] = (shifted(price, horizon) / price - 1, lowest, highest)
+
+        results = {}
+        for name, direction in SIGNALS.items():
+            active = signals[name]
+            held = on_dates(active, order, traded)
+            stats = {'direction': direction, 'strategy_drawdown': strategy_drawdown(held, next_day * direction), 'horizons': {}}
+            for horizon, (forward, lowest, highest) in windows.items():
+                mask = active & np.isfinite(forward)
+                returns = forward[mask]
+                adverse = np.minimum(lowest[mask], 0) if direction > 0 else -np.maximum(highest[mask], 0)
+                stats['horizons'][horizon] = {
+                    'occurrences': int(mask.sum()),
+                    'symbols': int(mask.any(axis=0).sum()),
+                    'hit_rate': float(np.mean(returns * direction > 0)) if returns.size else None,
+                    'avg_forward_return': float(returns.mean()) if returns.size else None,
+                    'avg_drawdown': float(np.nanmean(adverse)) if returns.size else None,
+                    'max_drawdown': float(np.nanmin(adverse)) if returns.size else None,
+                }
+            results[name] = stats
+        self.logger.info(f"Backtested {len(SIGNALS)} signals over {price.shape[0]} bars of {price.shape[1]} symbols")
+        return {'symbols': int(price.shape[1]), 'bars': int(price.shape[0]), 'horizons': self.horizons, 'signals': results}
+
+def shifted(values, periods):
+    """values moved up by periods rows, NaN-padded at the end: row t holds row t + periods"""
+    out = np.full_like(values, np.nan)
+    if periods < len(values):
+        out[:len(values) - periods] = values[periods:]
+    return out
+
+def on_dates(aligned, order, traded):
+    """Right-aligned (rows x symbols) flags back on each symbol's own dates, carried over the days it did not trade"""
+    flags = np.zeros(aligned.shape)
+    np.put_along_axis(flags, order, aligned.astype(float), axis=0)
+    flags[~traded] = np.nan
+    return pd.DataFrame(flags).ffill().to_numpy() == 1
+
+def strategy_drawdown(active, returns):
+    """Maximum drawdown of an equal-weighted, next-bar-rebalanced basket of the symbols where active is set"""
+    held = active & np.isfinite(returns)
+    count = held.sum(axis=1)
+    daily = np.where(count > 0, np.where(held, returns, 0.0).sum(axis=1) / np.maximum(count, 1), 0.0)
+    equity = np.cumprod(1 + daily)
+    return float((equity / np.maximum.accumulate(equity) - 1).min()) if len(equity) else 0.0
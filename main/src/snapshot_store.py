@@ -0,0 +1,167 @@
+import json, os, sqlite3
+from datetime import datetime, timedelta
+import settings
+from logger import Logger
+
+# Flat column -> (indicator, field) of the technical analysis dict; every indicator IndicatorEngine produces
+TECHNICAL_FIELDS = {
+    'price': ('sma', 'price'), 'sma20': ('sma', 'sma20'), 'sma50': ('sma', 'sma50'), 'sma200': ('sma', 'sma200'),
+    'sma_trend': ('sma', 'sma_trend'),
+    'rsi': ('rsi', 'value'), 'rsi_signal': ('rsi', 'signal'),
+    'macd_line': ('macd', 'macd_line'), 'macd_signal_line': ('macd', 'signal_line'),
+    'macd_histogram': ('macd', 'histogram'), 'macd_signal': ('macd', 'signal'),
+    'bb_upper': ('bollinger_bands', 'upper'), 'bb_middle': ('bollinger_bands', 'middle'),
+    'bb_lower': ('bollinger_bands', 'lower'), 'bb_width': ('bollinger_bands', 'width'),
+    'bb_signal': ('bollinger_bands', 'signal'),
+    'period_start': ('performance', 'start_date'), 'period_end': ('performance', 'end_date'),
+    'start_price': ('performance', 'start_price'), 'current_price': ('performance', 'current_price'),
+    'percent_change': ('performance', 'percent_change'), 'performance_trend': ('performance', 'trend'),
+    'daily_std_dev': ('volatility', 'daily_std_dev'), 'annualized_volatility': ('volatility', 'annualized_volatility'),
+}
+POSITION_FIELDS = ('name', 'exchange', 'quantity', 'quote', 'market_value', 'currency')
+TEXT_FIELDS = {'account', 'symbol', 'yf_symbol', 'name', 'exchange', 'currency', 'sma_trend', 'rsi_signal', 'macd_signal',
+               'bb_signal', 'period_start', 'period_end', 'performance_trend', 'technical_error', 'technical_extra',
+               'research', 'recommendation', 'key_points', 'taken_at'}
+JSON_FIELDS = ('technical_extra', 'research', 'key_points')
+
+class PositionResult:
+    """One account/symbol row of one run: position, flattened indicators, research and summary
+
+    Indicator groups IndicatorEngine does not produce are kept as JSON in technical_extra, and research
+    stays JSON since its shape is up to the model.
+    """
+    __slots__ = ('run_id', 'taken_at', 'account', 'symbol', 'yf_symbol') + POSITION_FIELDS + tuple(TECHNICAL_FIELDS) + (
+        'technical_error', 'technical_extra', 'research', 'recommendation', 'key_points')
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    @classmethod
+    def from_analysis(cls, account, symbol, analysis):
+        """Record for analysis_results[account][symbol] as returned by TechnicalAnalysis.analyze_performance"""
+        position = analysis.get('position_data') or {}
+        technical = dict(analysis.get('technical_analysis') or {})
+        summary = analysis.get('summary') or {}
+        values = {field: position.get(field) for field in POSITION_FIELDS}
+        for column, (group, field) in TECHNICAL_FIELDS.items():
+            values[column] = (technical.get(group) or {}).get(field)
+        extra = {group: value for group, value in technical.items() if group not in {g for g, _ in TECHNICAL_FIELDS.values()} | {'error'}}
+        return cls(account=account, symbol=symbol, yf_symbol=analysis.get('yf_symbol'), technical_error=technical.get('error'),
+                   technical_extra=extra or None, research=analysis.get('research_analysis'),
+                   recommendation=summary.get('overall_recommendation'), key_points=summary.get('key_points'), **values)
+
+    def to_analysis(self):
+        """The analysis_results entry this record was made from, as ReportGenerator expects it"""
+        if self.technical_error is not None:
+            technical = {'error': self.technical_error}
+        else:
+            technical = {}
+            for column, (group, field) in TECHNICAL_FIELDS.items():
+                technical.setdefault(group, {})[field] = getattr(self, column)
+            # A group is present when any of its fields is; sma20 alone may legitimately be None
+            technical = {group: fields for group, fields in technical.items() if any(value is not None for value in fields.values())}
+            technical.update(self.technical_extra or {})
+        position = {'symbol': self.symbol}
+        position.update((field, getattr(self, field)) for field in POSITION_FIELDS)
+        position['account'] = self.account
+        return {
+            'position_data': position,
+            'yf_symbol': self.yf_symbol,
+            'technical_analysis': technical,
+            'research_analysis': self.research if self.research is not None else {"error": "Research was not run"},
+            'summary': {'overall_recommendation': self.recommendation, 'key_points': self.key_points},
+        }
+
+class SnapshotStore:
+    """Append-only SQLite history of analysis runs, one row per account/symbol per run
+
+    Runs are never updated or deleted, so trend queries (an indicator's history, portfolio value per
+    day) are indexed lookups over past rows, and any past report can be rendered again offline.
+    """
+    def __init__(self, path=None):
+        self.logger = Logger("SnapshotStore")
+        self.path = path or settings.SNAPSHOT_PATH
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        # quantity has no declared type so whole share counts come back as ints, as in the live results
+        types = lambda field: 'TEXT' if field in TEXT_FIELDS else '' if field == 'quantity' else 'REAL'
+        columns = ",\n".join(f"{field} {types(field)}".rstrip() for field in PositionResult.__slots__[1:])
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                taken_at TEXT NOT NULL,
+                positions INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id INTEGER NOT NULL REFERENCES runs(run_id),
+                {columns},
+                PRIMARY KEY (run_id, account, symbol)
+            );
+            CREATE INDEX IF NOT EXISTS results_symbol ON results (symbol, taken_at);
+            CREATE INDEX IF NOT EXISTS results_yf_symbol ON results (yf_symbol, taken_at);
+            CREATE INDEX IF NOT EXISTS runs_taken_at ON runs (taken_at);
+        """)
+
+    def save(self, analysis_results, taken_at=None):
+        """Append a run's analysis_results as a new snapshot and return its run id"""
+        taken_at = (taken_at or datetime.now()).isoformat(timespec='seconds')
+        records = [PositionResult.from_analysis(account, symbol, analysis)
+                   for account, positions in analysis_results.items() for symbol, analysis in positions.items()]
+        fields = PositionResult.__slots__
+        with self.conn:
+            run_id = self.conn.execute("INSERT INTO runs (taken_at, positions) VALUES (?, ?)", (taken_at, len(records))).lastrowid
+            self.conn.executemany(
+                f"INSERT INTO results ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                ([run_id, taken_at] + [to_sql(field, getattr(record, field)) for field in fields[2:]] for record in records),
+            )
+        self.logger.info(f"Saved snapshot {run_id} with {len(records)} positions to {self.path}")
+        return run_id
+
+    def runs(self, limit=20):
+        """[(run_id, taken_at, positions)] for the most recent runs, newest first"""
+        return self.conn.execute("SELECT run_id, taken_at, positions FROM runs ORDER BY run_id DESC LIMIT ?", (limit,)).fetchall()
+
+    def records(self, run_id=None):
+        """PositionResult rows of a run (the latest when run_id is None)"""
+        if run_id is None:
+            run_id = self.conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+        cursor = self.conn.execute(f"SELECT {', '.join(PositionResult.__slots__)} FROM results WHERE run_id = ? ORDER BY rowid", (run_id,))
+        return [PositionResult(**{field: from_sql(field, value) for field, value in zip(PositionResult.__slots__, row)}) for row in cursor]
+
+    def load(self, run_id=None):
+        """analysis_results of a stored run, ready for ReportGenerator; {} if there is no such run"""
+        analysis_results = {}
+        for record in self.records(run_id):
+            analysis_results.setdefault(record.account, {})[record.symbol] = record.to_analysis()
+        return analysis_results
+
+    def history(self, symbol, field, days=90):
+        """[(taken_at, account, value)] of one column for a symbol (or its Yahoo ticker) over the last days"""
+        if field not in PositionResult.__slots__[2:]:
+            raise ValueError(f"Unknown snapshot field: {field}")
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        return self.conn.execute(f"""
+            SELECT taken_at, account, {field} FROM results
+            WHERE (symbol = ? OR yf_symbol = ?) AND taken_at >= ?
+            ORDER BY taken_at, account
+        """, (symbol, symbol, since)).fetchall()
+
+    def portfolio_value(self, days=90):
+        """[(day, currency, market value)] from the last run of each day; currencies are not converted"""
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        return self.conn.execute("""
+            SELECT day, currency, SUM(market_value) FROM results
+            JOIN (SELECT MAX(run_id) AS run_id, date(taken_at) AS day FROM runs WHERE taken_at >= ? GROUP BY day) USING (run_id)
+            GROUP BY day, currency ORDER BY day, currency
+        """, (since,)).fetchall()
+
+def to_sql(field, value):
+    if field in JSON_FIELDS:
+        return None if value is None else json.dumps(value, default=lambda v: v.item() if hasattr(v, 'item') else str(v))
+    # numpy scalars from the indicator math are not sqlite-adaptable
+    return value.item() if hasattr(value, 'item') else value
+
+def from_sql(field, value):
+    return json.loads(value) if field in JSON_FIELDS and value is not None else value
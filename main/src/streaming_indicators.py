@@ -0,0 +1,239 @@
+import json, math, os
+from collections import deque
+import pandas as pd
+from indicator_engine import IndicatorEngine
+
+# Scalar state a bar overwrites, saved before each bar so it can be revised
+SCALARS = ('avg_gain', 'avg_loss', 'ema_fast', 'ema_slow', 'ema_signal', 'macd_line', 'bars', 'signal_count', 'last_date', 'last_close')
+
+class RollingStats:
+    """Mean and variance over a sliding window, updated with Welford add/remove steps"""
+    def __init__(self, size=None):
+        self.size = size
+        self.items = deque()  # (key, value); key is the bar date for date-bounded windows
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value, key=None):
+        """Append a value; returns the (key, value) item it pushed out of a full window, if any"""
+        self.items.append((key, value))
+        self._include(value)
+        if self.size is not None and len(self.items) > self.size:
+            return self.pop()
+        return None
+
+    def pop(self):
+        item = self.items.popleft()
+        self._exclude(item[1])
+        return item
+
+    def undo(self, evicted=None):
+        """Take back the latest add(), putting back the item it pushed out"""
+        self._exclude(self.items.pop()[1])
+        if evicted is not None:
+            self.items.appendleft(tuple(evicted))
+            self._include(evicted[1])
+
+    def _include(self, value):
+        delta = value - self.mean
+        self.mean += delta / len(self.items)
+        self.m2 += delta * (value - self.mean)
+
+    def _exclude(self, value):
+        count = len(self.items)
+        if count == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / count
+        self.m2 -= delta * (value - self.mean)
+
+    def pop_before(self, key):
+        while self.items and self.items[0][0] < key:
+            self.pop()
+
+    def full(self):
+        return len(self.items) == self.size
+
+    def std(self, ddof=0):
+        count = len(self.items)
+        return math.sqrt(max(self.m2, 0.0) / (count - ddof)) if count > ddof else math.nan
+
+    def to_dict(self):
+        return {'size': self.size, 'items': list(self.items), 'mean': self.mean, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['size'])
+        stats.items = deque(tuple(item) for item in data['items'])
+        stats.mean, stats.m2 = data['mean'], data['m2']
+        return stats
+
+class StreamingIndicators:
+    """Indicator state that absorbs one daily bar at a time and reports current values in O(1)
+
+    Holds rolling sums for the SMAs, EMA states for MACD, simple or Wilder averages for RSI and
+    Welford variances for Bollinger Bands and volatility. The state round-trips through JSON so a
+    scheduled run can resume from the previous one instead of recomputing a year of history.
+    """
+    def __init__(self, wilder_rsi=False, rsi_window=14, macd_fast=12, macd_slow=26, macd_signal=9, bb_window=20, bb_dev=2):
+        self.config = {
+            'wilder_rsi': wilder_rsi, 'rsi_window': rsi_window, 'macd_fast': macd_fast,
+            'macd_slow': macd_slow, 'macd_signal': macd_signal, 'bb_window': bb_window, 'bb_dev': bb_dev,
+        }
+        self.sma = {window: RollingStats(window) for window in (20, 50, 200)}
+        self.bollinger = RollingStats(bb_window)
+        self.gains, self.losses = RollingStats(rsi_window), RollingStats(rsi_window)
+        self.avg_gain = self.avg_loss = None
+        self.ema_fast = self.ema_slow = self.ema_signal = None
+        self.macd_line = math.nan
+        self.bars = self.signal_count = 0
+        # Lookback window, trimmed by date: first price for performance and returns for volatility
+        self.closes, self.returns = RollingStats(), RollingStats()
+        self.last_date = self.last_close = None
+        # What last_date's bar changed (scalars and evicted items only), so an intraday bar can be revised
+        self.undo = None
+
+    def update(self, bar):
+        """Apply a (date, close) bar; a bar for the current last date replaces it, older bars are ignored"""
+        date, close = pd.Timestamp(bar[0]).strftime('%Y-%m-%d'), float(bar[1])
+        if math.isnan(close) or (self.last_date is not None and date < self.last_date):
+            return False
+        if date == self.last_date:
+            if self.undo is None or close == self.last_close:
+                return False
+            self._undo()
+        self._apply(date, close)
+        return True
+
+    def _apply(self, date, close):
+        cfg = self.config
+        undo = {key: getattr(self, key) for key in SCALARS}
+        undo['evicted'] = {str(window): stats.add(close) for window, stats in self.sma.items()}
+        undo['evicted']['bollinger'] = self.bollinger.add(close)
+
+        if self.last_close is not None:
+            change = close - self.last_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            undo['evicted']['gains'] = self.gains.add(gain)
+            undo['evicted']['losses'] = self.losses.add(loss)
+            alpha = 1 / cfg['rsi_window']
+            self.avg_gain = gain if self.avg_gain is None else (1 - alpha) * self.avg_gain + alpha * gain
+            self.avg_loss = loss if self.avg_loss is None else (1 - alpha) * self.avg_loss + alpha * loss
+            self.returns.add(close / self.last_close - 1, date)
+
+        a_fast, a_slow, a_signal = (2 / (cfg[key] + 1) for key in ('macd_fast', 'macd_slow', 'macd_signal'))
+        self.ema_fast = close if self.ema_fast is None else (1 - a_fast) * self.ema_fast + a_fast * close
+        self.ema_slow = close if self.ema_slow is None else (1 - a_slow) * self.ema_slow + a_slow * close
+        self.bars += 1
+        if self.bars >= max(cfg['macd_fast'], cfg['macd_slow']):
+            self.macd_line = self.ema_fast - self.ema_slow
+            self.ema_signal = self.macd_line if self.ema_signal is None else (1 - a_signal) * self.ema_signal + a_signal * self.macd_line
+            self.signal_count += 1
+
+        self.closes.add(close, date)
+        self.last_date, self.last_close = date, close
+        undo['macd_line'] = None if math.isnan(undo['macd_line']) else undo['macd_line']
+        self.undo = undo
+
+    def _undo(self):
+        """Return to the state before last_date's bar in O(1)"""
+        undo, date = self.undo, self.last_date
+        for window, stats in self.sma.items():
+            stats.undo(undo['evicted'][str(window)])
+        self.bollinger.undo(undo['evicted']['bollinger'])
+        if 'gains' in undo['evicted']:
+            self.gains.undo(undo['evicted']['gains'])
+            self.losses.undo(undo['evicted']['losses'])
+        # Lookback bars are only ever trimmed from the front, but the bar's own entries may be gone with them
+        for stats in (self.closes, self.returns):
+            if stats.items and stats.items[-1][0] == date:
+                stats.undo()
+        for key in SCALARS:
+            setattr(self, key, undo[key])
+        self.macd_line = math.nan if self.macd_line is None else self.macd_line
+        self.undo = None
+
+    def trim(self, start_date):
+        """Drop lookback bars before start_date, and the returns measured from them"""
+        start = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        self.closes.pop_before(start)
+        if self.closes.items:
+            # A return dated on the first kept bar was measured from a dropped one
+            first_date = self.closes.items[0][0]
+            while self.returns.items and self.returns.items[0][0] <= first_date:
+                self.returns.pop()
+
+    def result(self, start_date, end_date, engine=None, indicators=None):
+        """Current values in the per-symbol technical analysis dict shape, limited to indicators if given"""
+        self.trim(start_date)
+        if not self.closes.items:
+            return {"error": "No historical data available"}
+        cfg = self.config
+        sma = {window: stats.mean if stats.full() else math.nan for window, stats in self.sma.items()}
+        if cfg['wilder_rsi']:
+            avg_gain, avg_loss = (self.avg_gain, self.avg_loss) if self.gains.full() else (math.nan, math.nan)
+        else:
+            avg_gain, avg_loss = (self.gains.mean, self.losses.mean) if self.gains.full() else (math.nan, math.nan)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss)) if avg_loss else (100.0 if avg_gain else math.nan)
+        signal_line = self.ema_signal if self.signal_count >= cfg['macd_signal'] else math.nan
+        if self.bollinger.full():
+            bb_middle, bb_std = self.bollinger.mean, self.bollinger.std(ddof=0)
+            bb_upper, bb_lower = bb_middle + cfg['bb_dev'] * bb_std, bb_middle - cfg['bb_dev'] * bb_std
+            bb_width = (bb_upper - bb_lower) / bb_middle * 100
+        else:
+            bb_upper = bb_middle = bb_lower = bb_width = math.nan
+        engine = engine or IndicatorEngine()
+        return engine.symbol_result(
+            len(self.closes.items), self.last_close, self.closes.items[0][1], sma[20], sma[50], sma[200], rsi,
+            self.macd_line, signal_line, bb_upper, bb_middle, bb_lower, bb_width,
+            self.returns.std(ddof=1), start_date, end_date, indicators,
+        )
+
+    def to_dict(self):
+        return {
+            'config': self.config,
+            'sma': {str(window): stats.to_dict() for window, stats in self.sma.items()},
+            'bollinger': self.bollinger.to_dict(),
+            'gains': self.gains.to_dict(), 'losses': self.losses.to_dict(),
+            'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss,
+            'ema_fast': self.ema_fast, 'ema_slow': self.ema_slow, 'ema_signal': self.ema_signal,
+            'macd_line': None if math.isnan(self.macd_line) else self.macd_line,
+            'bars': self.bars, 'signal_count': self.signal_count,
+            'closes': self.closes.to_dict(), 'returns': self.returns.to_dict(),
+            'last_date': self.last_date, 'last_close': self.last_close,
+            'undo': self.undo,
+        }
+
+    def _restore(self, data):
+        self.config = data['config']
+        self.sma = {int(window): RollingStats.from_dict(stats) for window, stats in data['sma'].items()}
+        self.bollinger = RollingStats.from_dict(data['bollinger'])
+        self.gains, self.losses = RollingStats.from_dict(data['gains']), RollingStats.from_dict(data['losses'])
+        self.avg_gain, self.avg_loss = data['avg_gain'], data['avg_loss']
+        self.ema_fast, self.ema_slow, self.ema_signal = data['ema_fast'], data['ema_slow'], data['ema_signal']
+        self.macd_line = math.nan if data['macd_line'] is None else data['macd_line']
+        self.bars, self.signal_count = data['bars'], data['signal_count']
+        self.closes, self.returns = RollingStats.from_dict(data['closes']), RollingStats.from_dict(data['returns'])
+        self.last_date, self.last_close = data['last_date'], data['last_close']
+        self.undo = data.get('undo')
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('previous'):
+            # Older files kept a full copy of the state before the last bar; resume from it so that bar is applied again
+            data = data['previous']
+        state = cls(**data['config'])
+        state._restore(data)
+        return state
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
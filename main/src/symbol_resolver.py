@@ -0,0 +1,110 @@
+import os, sqlite3, time
+import settings
+from logger import Logger
+from metrics import metrics
+
+# Yahoo Finance suffix for each exchange code Wealthsimple reports; US listings have none
+EXCHANGE_SUFFIXES = {
+    'TSX': '.TO', 'TSE': '.TO',
+    'TSXV': '.V', 'TSX-V': '.V', 'CDNX': '.V',
+    'NEO': '.NE', 'AEQUITAS': '.NE', 'CBOE CANADA': '.NE',
+    'CSE': '.CN', 'CNSX': '.CN',
+    'NYSE': '', 'NASDAQ': '', 'NYSE ARCA': '', 'ARCA': '', 'NYSE AMERICAN': '', 'AMEX': '', 'BATS': '',
+    'CBOE': '', 'OTC': '', 'OTCMKTS': '',
+}
+KNOWN_SUFFIXES = ('.TO', '.V', '.NE', '.CN')
+
+def index_code(code, currency):
+    """Index key for a holding's exchange; probed answers depend on the currency, so it is part of theirs"""
+    if code in EXCHANGE_SUFFIXES:
+        return code
+    return f"{code}?{(currency or '').strip().upper()}"
+
+class SymbolResolver:
+    """Maps Wealthsimple symbols to Yahoo Finance tickers, remembering every answer in SQLite
+
+    The position's exchange decides when it is known; otherwise the plain and .TO tickers are both
+    checked in one batched probe download, and the position's currency breaks the tie. Resolved symbols are stored, so later runs do no lookups.
+    """
+    def __init__(self, path=None, probe=None):
+        self.logger = Logger("SymbolResolver")
+        self.path = path or settings.SYMBOL_INDEX_PATH
+        self.probe = probe  # probe(candidates) -> set of tickers that returned price data
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT NOT NULL,
+                exchange TEXT NOT NULL,
+                yf_symbol TEXT NOT NULL,
+                source TEXT NOT NULL,
+                resolved_at REAL NOT NULL,
+                PRIMARY KEY (symbol, exchange)
+            )
+        """)
+
+    def resolve_many(self, holdings, guess):
+        """Return {(symbol, exchange, currency): Yahoo ticker} for holdings given as such triples
+
+        Exchange and currency may be None. guess(symbol) is the fallback for symbols the probe cannot
+        settle; those are not stored.
+        """
+        resolved, unknown = {}, []
+        stored = dict(((symbol, exchange), yf_symbol) for symbol, exchange, yf_symbol in
+                      self.conn.execute("SELECT symbol, exchange, yf_symbol FROM symbols"))
+        for holding in dict.fromkeys(holdings):
+            symbol, exchange, currency = holding
+            code = (exchange or '').strip().upper()
+            if symbol.endswith(KNOWN_SUFFIXES):
+                resolved[holding] = symbol
+            elif (symbol, index_code(code, currency)) in stored:
+                resolved[holding] = stored[(symbol, index_code(code, currency))]
+            elif code in EXCHANGE_SUFFIXES:
+                resolved[holding] = symbol + EXCHANGE_SUFFIXES[code]
+                self._store(symbol, code, resolved[holding], 'exchange')
+            else:
+                if code:
+                    self.logger.warning(f"Unknown exchange {exchange} for {symbol}, probing Yahoo Finance", symbol=symbol)
+                unknown.append(holding)
+        if unknown:
+            resolved.update(self._probe(unknown, guess))
+        return resolved
+
+    def _probe(self, holdings, guess):
+        """Settle symbols without a usable exchange with one batched download of all candidates"""
+        candidates = {holding: self._candidates(holding[0], holding[2], guess) for holding in holdings}
+        tickers = list(dict.fromkeys(ticker for options in candidates.values() for ticker in options))
+        self.logger.info(f"Probing {len(tickers)} candidate tickers for {len(holdings)} symbols")
+        metrics.count('symbol_probes')
+        try:
+            found = self.probe(tickers) if self.probe is not None else set()
+        except Exception as e:
+            self.logger.error(f"Symbol probe failed: {str(e)}")
+            found = set()
+        resolved = {}
+        for holding, options in candidates.items():
+            symbol, exchange, currency = holding
+            match = next((ticker for ticker in options if ticker in found), None)
+            if match is None:
+                # Not stored, so the next run tries again
+                resolved[holding] = guess(symbol)
+                self.logger.warning(f"Could not resolve {symbol} on Yahoo Finance, guessing {resolved[holding]}", symbol=symbol)
+                continue
+            self._store(symbol, index_code((exchange or '').strip().upper(), currency), match, 'probe')
+            resolved[holding] = match
+        return resolved
+
+    @staticmethod
+    def _candidates(symbol, currency, guess):
+        """Tickers to try, most likely first when both listings exist
+
+        A CAD position prefers the TSX listing; otherwise the plain US ticker wins, since a short
+        symbol such as T is far more often the US listing than the heuristic guess assumes.
+        """
+        listings = [f"{symbol}.TO", symbol] if (currency or '').strip().upper() == 'CAD' else [symbol, f"{symbol}.TO"]
+        return list(dict.fromkeys(listings + [guess(symbol)]))
+
+    def _store(self, symbol, exchange, yf_symbol, source):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?, ?)", (symbol, exchange, yf_symbol, source, time.time()))
@@ -1,18 +1,55 @@
 from logger import Logger
+import os
 import numpy as np
 from datetime import datetime, timedelta
 import yfinance as yf
 import pandas as pd
-from ta.trend import SMAIndicator, MACD
-from ta.volatility import BollingerBands
 from technical_indicators import TechnicalIndicators
+from indicator_registry import select_indicators, history_days
 import settings
-from research_analysis import ResearchAnalysis
+from price_cache import PriceCache
+from price_archive import PriceArchive
+from indicator_engine import IndicatorEngine
+from parallel_indicators import ShardedIndicators
+from streaming_indicators import StreamingIndicators
+from metrics import metrics, profiled
+from cassette import CassetteMiss, get_cassette
+from symbol_resolver import SymbolResolver
+from portfolio_risk import PortfolioRisk
 class TechnicalAnalysis:
-    def __init__(self):
+    def __init__(self, refresh_research=False):
         self.logger = Logger("TechnicalAnalysis")
+        self.refresh_research = refresh_research
+        self.research = None
+        self.price_data = pd.DataFrame()
+        self.indicators, unknown = select_indicators(settings.TECHNICAL_INDICATORS)
+        if unknown:
+            self.logger.warning(f"Ignoring unknown technical indicators: {', '.join(unknown)}")
+        self.indicator_names = {indicator.name for indicator in self.indicators}
+        self.cassette = get_cassette()
+        self.reset_window()
+        # Recording needs the full window from Yahoo and replay must not mix in cached bars
+        self.price_cache = None
+        if self.cassette is None and settings.PRICE_STORE == 'archive' and settings.PRICE_ARCHIVE_DIR:
+            self.price_cache = PriceArchive()
+        elif self.cassette is None and settings.PRICE_CACHE_PATH:
+            self.price_cache = PriceCache()
+        self.engine = IndicatorEngine(wilder_rsi=settings.RSI_SMOOTHING == 'wilder')
+        self.sharded = None  # process pool, started on the first large enough analysis
+        # Under a cassette, resolutions must come from the recorded probe rather than this machine's index
+        self.resolver = SymbolResolver(':memory:' if self.cassette is not None else None, probe=self._probe_symbols)
+    def reset_window(self):
+        """Move the analysis window to end now and drop in-memory prices; the on-disk caches stay warm"""
+        # Download only as much history as the largest requested indicator window needs
+        self.end_date = datetime.now()
+        self.start_date = self.end_date - timedelta(days=history_days(self.indicators, int(settings.LOOKBACK_PERIOD_DAYS)))
+        self.price_data = pd.DataFrame()
+        if self.cassette is not None:
+            # A replay analyzes the recorded window, not one ending today
+            window = self.cassette.through('meta', 'window', lambda: [self.start_date.isoformat(), self.end_date.isoformat()])
+            self.start_date, self.end_date = (datetime.fromisoformat(value) for value in window)
     def get_symbol_with_exchange(self, symbol):
-        """Add exchange suffix for non-US stocks if needed"""        
+        """Guess the exchange suffix from the symbol alone; the fallback when SymbolResolver cannot tell"""
             
         # Simple heuristic: Canadian stocks often need .TO suffix
         # This is a simplified approach - in production, you'd want a more robust mapping
@@ -37,190 +74,299 @@ class TechnicalAnalysis:
             return f"{symbol}.TO"  # Try TSX
             
         return symbol  # Default: assume US stock
-    def analyze_performance(self, positions_by_account):
-        """Analyze performance of all holdings"""
+    def _probe_symbols(self, candidates):
+        """Tickers among candidates with recent price data, checked in one batched download"""
+        with metrics.timer('symbol_probe'):
+            frame = self._fetch_prices(candidates, self.end_date - timedelta(days=10))
+        if frame.empty:
+            return set()
+        return {ticker for ticker in frame.columns.get_level_values(0).unique() if frame[ticker]['Close'].notna().any()}
+    def prefetch_prices(self, symbols):
+        """Download price history for many symbols in batched requests"""
+        with metrics.timer('prefetch_prices'):
+            return self._prefetch_prices(symbols)
+    def _prefetch_prices(self, symbols):
+        loaded = set(self.price_data.columns.get_level_values(0)) if not self.price_data.empty else set()
+        missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in loaded]
+        if not missing:
+            return self.price_data
+        
+        frames = [self.price_data] if not self.price_data.empty else []
+        if self.price_cache is None:
+            frames.extend(self._download(missing, self.start_date))
+        else:
+            frames.append(self._prefetch_cached(missing))
+        
+        self.price_data = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        return self.price_data
+    def _download(self, symbols, start_date):
+        """Fetch symbols from Yahoo Finance in chunks of DOWNLOAD_BATCH_SIZE"""
+        batch_size = max(1, int(settings.DOWNLOAD_BATCH_SIZE))
+        frames = []
+        for i in range(0, len(symbols), batch_size):
+            batch = symbols[i:i + batch_size]
+            self.logger.info(f"Downloading price history for {len(batch)} symbols")
+            try:
+                with metrics.timer('price_download'):
+                    frame = self._fetch_prices(batch, start_date)
+                # Size of the parsed frame; yfinance does not expose the bytes it read off the wire
+                metrics.count('price_bytes', int(frame.memory_usage(deep=True).sum()))
+                frames.append(frame)
+            except Exception as e:
+                self.logger.error(f"Price download failed for {', '.join(batch)}: {str(e)}")
+        return frames
+    def _fetch_prices(self, batch, start_date):
+        """yf.download for a batch, recorded to or replayed from the cassette when one is active"""
+        if self.cassette is not None and not self.cassette.recording:
+            frames = {}
+            for symbol in batch:
+                try:
+                    frames[symbol] = frame_from_payload(self.cassette.get('prices', symbol))
+                except CassetteMiss as e:
+                    self.logger.warning(str(e), symbol=symbol)
+            return pd.concat(frames, axis=1, names=['Ticker', 'Price']) if frames else pd.DataFrame()
+        # group_by='ticker' keeps one (symbol, field) column block per ticker, even for a single symbol
+        frame = yf.download(batch, start=start_date, end=self.end_date, group_by='ticker', progress=False)
+        if self.cassette is not None:
+            for symbol in frame.columns.get_level_values(0).unique():
+                self.cassette.put('prices', symbol, frame_payload(frame[symbol].dropna(how='all')))
+        return frame
+    def _prefetch_cached(self, symbols):
+        """Serve symbols from the price cache, downloading only missing history and stale tails"""
+        full, tails = [], {}
+        for symbol in symbols:
+            fetch_from = self.price_cache.plan(symbol, self.start_date)
+            if fetch_from == self.start_date:
+                full.append(symbol)
+            elif fetch_from is not None:
+                tails[symbol] = fetch_from
+        
+        # Tails share one request window so they can still be batched together
+        requests = [(full, self.start_date)]
+        if tails:
+            requests.append((list(tails), min(tails.values())))
+        for batch_symbols, start_date in requests:
+            for frame in self._download(batch_symbols, start_date) if batch_symbols else []:
+                for symbol in frame.columns.get_level_values(0).unique():
+                    self.price_cache.store(symbol, frame[symbol], start_date)
+        
+        frame = pd.concat({symbol: self.price_cache.load(symbol, self.start_date, self.end_date) for symbol in symbols}, axis=1)
+        self.price_cache.evict(keep=symbols)
+        self.price_cache.log_stats()
+        return frame
+    def get_price_data(self, symbol):
+        """Return the OHLCV slice for one symbol from the shared multi-ticker frame"""
+        if self.price_data.empty or symbol not in self.price_data.columns.get_level_values(0):
+            self.prefetch_prices([symbol])
+        if self.price_data.empty or symbol not in self.price_data.columns.get_level_values(0):
+            return pd.DataFrame()
+        # Rows only exist for this symbol's trading days once the batch is aligned on a shared index
+        return self.price_data[symbol].dropna(how='all')
+    def close_matrix(self, symbols):
+        """Wide (dates x symbols) close prices for the given symbols from the shared frame"""
+        if self.price_data.empty:
+            return pd.DataFrame(columns=symbols, dtype=float)
+        return self.price_data.xs('Close', axis=1, level=1).reindex(columns=symbols)
+    def analyze_performance(self, positions_by_account, research=True):
+        """Analyze performance of all holdings (technical only when research is False)"""
         if not positions_by_account:
             self.logger.warning("No positions found. Run get_holdings() first.")
             return
         analysis_results = {}
-        research = ResearchAnalysis()
-        for account_type, positions in positions_by_account.items():
-            self.logger.info(f"Analyzing performance for account: {account_type}")
+        work_plan, total_positions = self._work_plan(positions_by_account)
+        
+        calls_saved = 2 * (total_positions - len(work_plan))  # one technical and one research call per duplicate
+        self.logger.info(f"Analyzing {len(work_plan)} unique symbols for {total_positions} positions ({calls_saved} analysis calls saved)")
+        self.prefetch_prices(list(work_plan))
+        research_results = self._research().research_many(list(work_plan)) if research else {}
+        technical_results = self._indicator_results(list(work_plan))
+        
+        for yf_symbol, holdings in work_plan.items():
+            try:
+                self.logger.info(f"Using symbol {yf_symbol} for Yahoo Finance", symbol=yf_symbol)
+                
+                # Combine technical and research analysis
+                technical_analysis = technical_results.get(yf_symbol) or self.technical_analysis(yf_symbol)
+                research_analysis = research_results[yf_symbol] if research else {"error": "Research was not run"}
+            except Exception as e:
+                self.logger.error(f"Error analyzing {yf_symbol}: {str(e)}", symbol=yf_symbol)
+                continue
             
-            for position in positions:
-                symbol = position.get('stock', {}).get('symbol')
-                if not symbol:
-                    continue
+            # Fan the shared analysis back out to every account holding the symbol
+            for account_type, symbol, position in holdings:
+                if account_type not in analysis_results:
+                    analysis_results[account_type] = {}
                     
-                try:
-                    # Add exchange suffix if needed
-                    yf_symbol = self.get_symbol_with_exchange(symbol)
-                    self.logger.info(f"Using symbol {yf_symbol} for Yahoo Finance")
-                    
-                    # Combine technical and research analysis
-                    technical_analysis = self.technical_analysis(yf_symbol)
-                    research_analysis = research.research_analysis(yf_symbol) #:TODO
-                    # research_analysis = {"error": str(e)}
-                    
-                    # Store the combined analysis
-                    if account_type not in analysis_results:
-                        analysis_results[account_type] = {}
-                        
-                    analysis_results[account_type][symbol] = {
-                        'position_data': position,
-                        'technical_analysis': technical_analysis,
-                        'research_analysis': research_analysis,
-                        'summary': {"overall_recommendation": "BUY", "key_points": "TODO"} # TODO generateSummary()
-                    }
-                    
-                except Exception as e:
-                    self.logger.error(f"Error analyzing {symbol}: {str(e)}")
-            return analysis_results
+                analysis_results[account_type][symbol] = {
+                    'position_data': position,
+                    'yf_symbol': yf_symbol,
+                    'technical_analysis': technical_analysis,
+                    'research_analysis': research_analysis,
+                    'summary': {"overall_recommendation": "BUY", "key_points": "TODO"} # TODO generateSummary()
+                }
+        return analysis_results
+    def technical_many(self, symbols):
+        """{symbol: technical analysis} for Yahoo symbols without positions, the way analyze_performance computes it"""
+        self.prefetch_prices(symbols)
+        technical_results = self._indicator_results(symbols)
+        return {symbol: technical_results.get(symbol) or self.technical_analysis(symbol) for symbol in symbols}
+    def _indicator_results(self, symbols):
+        """Bulk indicator results from the worker pool or the panel engine; {} when each symbol runs on its own"""
+        # The mode wins over the engine: latest and streaming values are computed per symbol whatever INDICATOR_ENGINE says
+        if settings.INDICATOR_MODE != 'full':
+            return {}
+        if self._use_workers(len(symbols)):
+            with metrics.timer('indicators_sharded'):
+                return self.sharded.compute(
+                    self.close_matrix(symbols), self.start_date, self.end_date,
+                    [indicator.name for indicator in self.indicators],
+                    per_symbol=settings.INDICATOR_ENGINE != 'panel', wilder_rsi=settings.RSI_SMOOTHING == 'wilder',
+                )
+        if settings.INDICATOR_ENGINE == 'panel':
+            with metrics.timer('indicators_panel'):
+                return self.engine.compute(self.close_matrix(symbols), self.start_date, self.end_date, self.indicator_names)
+        return {}
+    def portfolio_risk(self, analysis_results):
+        """Portfolio risk per account and in total from analyze_performance results and the prices it downloaded"""
+        holdings = [
+            (account_type, analysis['yf_symbol'], analysis['position_data'].get('market_value'))
+            for account_type, positions in (analysis_results or {}).items() for analysis in positions.values()
+        ]
+        return PortfolioRisk().analyze(self.close_matrix(list(dict.fromkeys(symbol for _, symbol, _ in holdings))), holdings)
+    def yahoo_symbols(self, positions_by_account):
+        """The distinct Yahoo tickers for a set of holdings"""
+        return list(self._work_plan(positions_by_account)[0])
+    def price_history(self, symbols, start_date, cache_only=False):
+        """(dates x symbols) closes from start_date to the window's end, e.g. years of history for a backtest
+
+        Moves the analysis window's start; with cache_only, nothing is downloaded.
+        """
+        self.start_date, self.price_data = start_date, pd.DataFrame()
+        if not cache_only:
+            self.prefetch_prices(symbols)
+            return self.close_matrix(symbols)
+        if self.price_cache is None:
+            raise ValueError("Reading only from the price cache needs price_cache_path to be set")
+        return pd.DataFrame({symbol: self.price_cache.load(symbol, start_date, self.end_date)['Close'] for symbol in symbols})
+    def _use_workers(self, num_symbols):
+        """Whether to shard indicator math across processes; latest and streaming modes stay in-process"""
+        workers = int(settings.INDICATOR_WORKERS) or os.cpu_count() or 1
+        if workers <= 1 or num_symbols < int(settings.INDICATOR_WORKERS_MIN_SYMBOLS):
+            return False
+        if settings.INDICATOR_MODE != 'full':
+            return False
+        if self.sharded is None:
+            self.sharded = ShardedIndicators(workers)
+        return True
+    def add_research(self, analysis_results):
+        """Fill in research_analysis for technical-only results from analyze_performance(research=False)"""
+        positions_by_account = {
+            account_type: [analysis['position_data'] for analysis in positions.values()]
+            for account_type, positions in analysis_results.items()
+        }
+        work_plan, _ = self._work_plan(positions_by_account)
+        research_results = self._research().research_many(list(work_plan))
+        for yf_symbol, holdings in work_plan.items():
+            for account_type, symbol, _ in holdings:
+                analysis_results[account_type][symbol]['research_analysis'] = research_results[yf_symbol]
+        return analysis_results
+    def _research(self):
+        # Kept across calls so a daemon reuses the OpenAI client and research cache connection
+        if self.research is None:
+            from research_analysis import ResearchAnalysis  # pulls in openai, which technical-only runs never need
+            self.research = ResearchAnalysis(refresh=self.refresh_research)
+        return self.research
+    def _work_plan(self, positions_by_account):
+        """Map each Yahoo symbol to the (account type, symbol, position) holdings it covers
+
+        The same ticker held in several accounts is analyzed once. Returns (work_plan, total_positions).
+        """
+        held = [(account_type, position) for account_type, positions in positions_by_account.items()
+                for position in positions if position['symbol']]
+        # Holdings saved before positions carried an exchange resolve by probe instead
+        holding = lambda position: (position['symbol'], position.get('exchange'), position.get('currency'))
+        resolved = self.resolver.resolve_many([holding(position) for _, position in held], self.get_symbol_with_exchange)
+        work_plan = {}
+        for account_type, position in held:
+            symbol = position['symbol']
+            yf_symbol = resolved[holding(position)]
+            work_plan.setdefault(yf_symbol, []).append((account_type, symbol, position))
+        return work_plan, len(held)
     def technical_analysis(self, symbol):
         """Perform technical analysis on a symbol"""
-        self.logger.info(f"Performing technical analysis for {symbol}")
+        with metrics.timer('technical_analysis', symbol), profiled('technical_analysis', symbol):
+            return self._technical_analysis(symbol)
+    def _technical_analysis(self, symbol):
+        self.logger.info(f"Performing technical analysis for {symbol}", symbol=symbol)
         
         try:
-            # Get historical data
-            lookback_days = int(settings.LOOKBACK_PERIOD_DAYS)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=lookback_days)
+            start_date, end_date = self.start_date, self.end_date
             
-            # Get data from Yahoo Finance
-            stock_data = yf.download(symbol, start=start_date, end=end_date, progress=False)
+            # Slice from the prefetched multi-ticker frame (downloads on a miss)
+            stock_data = self.get_price_data(symbol)
             
             if stock_data.empty:
                 return {"error": "No historical data available"}
                 
             # Calculate technical indicators
             results = {}
+            close = stock_data['Close']
+            if settings.INDICATOR_MODE == 'latest':
+                return self._latest_analysis(close, start_date, end_date)
+            if settings.INDICATOR_MODE == 'streaming':
+                return self._streaming_analysis(symbol, close, start_date, end_date)
             
-            # Simple Moving Averages (20, 50, 200 day)
-            stock_data['SMA20'] = stock_data['Close'].rolling(window=20).mean()
-            stock_data['SMA50'] = stock_data['Close'].rolling(window=50).mean()
-            stock_data['SMA200'] = stock_data['Close'].rolling(window=200).mean()
-            
-            # Fix for truth value of DataFrame is ambiguous error
-            if len(stock_data) >= 20:  # Make sure we have enough data points for the SMA
-                sma20_val = stock_data['SMA20'].iloc[-1]
-                # Check if it's NaN
-                if pd.isna(sma20_val):
-                    sma20_val = None
-            else:
-                sma20_val = None
-            if len(stock_data) >= 50:  # Make sure we have enough data points for the SMA
-                sma50_val = stock_data['SMA50'].iloc[-1]
-                # Check if it's NaN
-                if pd.isna(sma50_val):
-                    sma50_val = None
-            else:
-                sma50_val = None
-            if len(stock_data) >= 200:  # Make sure we have enough data points for the SMA
-                sma200_val = stock_data['SMA200'].iloc[-1]
-                # Check if it's NaN
-                if pd.isna(sma200_val):
-                    sma200_val = None
-            else:
-                sma200_val = None
-            current_price = stock_data['Close'].iloc[-1].values[0] if not stock_data['Close'].empty else None
-            
-            sma_trend = 'neutral'
-            if sma20_val is not None and sma50_val is not None and current_price is not None:
-                if sma20_val > sma50_val and current_price > sma20_val:
-                    sma_trend = 'bullish'
-                elif sma20_val < sma50_val and current_price < sma20_val:
-                    sma_trend = 'bearish'
-            
-            results['sma'] = {
-                'sma20': sma20_val,
-                'sma50': sma50_val,
-                'sma200': sma200_val,
-                'price': current_price,
-                'sma_trend': sma_trend
+            # Only the indicators configured in TECHNICAL_INDICATORS
+            context = {
+                'start_date': start_date,
+                'end_date': end_date,
+                'price': close.iloc[-1] if not close.empty else None,
+                'wilder_rsi': settings.RSI_SMOOTHING == 'wilder',
             }
-            
-            # RSI (Relative Strength Index)
-            # rsi = RSIIndicator(close=stock_data['Close'].iloc[-1], window=14)
-            rsi_value = TechnicalIndicators.calculate_rsi(stock_data['Close'], window=14)
-            rsi_signal = 'neutral'
-            if rsi_value is not None:
-                if rsi_value < 30:
-                    rsi_signal = 'oversold'
-                elif rsi_value > 70:
-                    rsi_signal = 'overbought'
-                    
-            results['rsi'] = {
-                'value': rsi_value,
-                'signal': rsi_signal
-            }
-            
-            # MACD (Moving Average Convergence Divergence)
-            macd = MACD(close=stock_data['Close'])
-            macd_line = macd.macd().iloc[-1] if not macd.macd().empty else None
-            signal_line = macd.macd_signal().iloc[-1] if not macd.macd_signal().empty else None
-            histogram = macd.macd_diff().iloc[-1] if not macd.macd_diff().empty else None
-            
-            macd_signal = 'neutral'
-            if macd_line is not None and signal_line is not None:
-                if macd_line > signal_line:
-                    macd_signal = 'bullish'
-                else:
-                    macd_signal = 'bearish'
-                    
-            results['macd'] = {
-                'macd_line': macd_line,
-                'signal_line': signal_line,
-                'histogram': histogram,
-                'signal': macd_signal
-            }
-            
-            # Bollinger Bands
-            bb = BollingerBands(close=stock_data['Close'])
-            bb_upper = bb.bollinger_hband().iloc[-1] if not bb.bollinger_hband().empty else None
-            bb_middle = bb.bollinger_mavg().iloc[-1] if not bb.bollinger_mavg().empty else None
-            bb_lower = bb.bollinger_lband().iloc[-1] if not bb.bollinger_lband().empty else None
-            bb_width = bb.bollinger_wband().iloc[-1] if not bb.bollinger_wband().empty else None
-            
-            bb_signal = 'neutral'
-            if current_price is not None and bb_upper is not None and bb_lower is not None:
-                if current_price >= bb_upper:
-                    bb_signal = 'upper_touch'
-                elif current_price <= bb_lower:
-                    bb_signal = 'lower_touch'
-                    
-            results['bollinger_bands'] = {
-                'upper': bb_upper,
-                'middle': bb_middle,
-                'lower': bb_lower,
-                'width': bb_width,
-                'signal': bb_signal
-            }
-            
-            # Calculate historical performance
-            if len(stock_data) > 1:
-                start_price = stock_data['Close'].iloc[0]
-                current_price = stock_data['Close'].iloc[-1]
-                perf_pct = ((current_price - start_price) / start_price) * 100 if start_price != 0 else 0
-                
-                results['performance'] = {
-                    'start_date': start_date.strftime('%Y-%m-%d'),
-                    'end_date': end_date.strftime('%Y-%m-%d'),
-                    'start_price': start_price,
-                    'current_price': current_price,
-                    'percent_change': perf_pct,
-                    'trend': 'up' if perf_pct > 0 else 'down'
-                }
-            
-            # Calculate volatility (standard deviation of daily returns)
-            if len(stock_data) > 1:
-                daily_returns = stock_data['Close'].pct_change().dropna()
-                results['volatility'] = {
-                    'daily_std_dev': daily_returns.std() * 100 if not daily_returns.empty else None,  # as percentage
-                    'annualized_volatility': daily_returns.std() * np.sqrt(252) * 100 if not daily_returns.empty else None  # annualized
-                }
+            for indicator in self.indicators:
+                value = indicator.compute(close, context)
+                if value is not None:
+                    results[indicator.name] = value
             
             return results
             
         except Exception as e:
-            self.logger.error(f"Technical analysis failed for {symbol}: {str(e)}")
-            return {"error": str(e)}
\ No newline at end of file
+            self.logger.error(f"Technical analysis failed for {symbol}: {str(e)}", symbol=symbol)
+            return {"error": str(e)}
+    def _latest_analysis(self, close, start_date, end_date):
+        """Technical analysis from final indicator values only, without full-length series"""
+        prices = close.to_numpy(dtype=float)
+        names = self.indicator_names
+        sma20, sma50, sma200 = (TechnicalIndicators.latest_sma(prices, w) if 'sma' in names else np.nan for w in (20, 50, 200))
+        rsi = TechnicalIndicators.latest_rsi(prices, window=14, wilder=settings.RSI_SMOOTHING == 'wilder') if 'rsi' in names else np.nan
+        macd_line, signal_line, _ = TechnicalIndicators.latest_macd(prices) if 'macd' in names else (np.nan, np.nan, np.nan)
+        bb_upper, bb_middle, bb_lower, bb_width = TechnicalIndicators.latest_bollinger(prices) if 'bollinger_bands' in names else (np.nan,) * 4
+        daily_std = TechnicalIndicators.latest_volatility(prices) if 'volatility' in names else np.nan
+        return self.engine.symbol_result(
+            len(prices), prices[-1], prices[0], sma20, sma50, sma200, rsi,
+            macd_line, signal_line, bb_upper, bb_middle, bb_lower, bb_width,
+            daily_std, start_date, end_date, names,
+        )
+    def _streaming_analysis(self, symbol, close, start_date, end_date):
+        """Technical analysis from persisted indicator state, feeding only bars newer than the last run"""
+        path = os.path.join(settings.INDICATOR_STATE_DIR, f"{symbol}.json")
+        wilder_rsi = settings.RSI_SMOOTHING == 'wilder'
+        state = StreamingIndicators.load(path) if os.path.exists(path) else None
+        # Start over if the saved state is for other settings or too old to cover the lookback window
+        if state is None or state.config['wilder_rsi'] != wilder_rsi or state.last_date < start_date.strftime('%Y-%m-%d'):
+            state = StreamingIndicators(wilder_rsi=wilder_rsi)
+        
+        new_bars = close[close.index >= pd.Timestamp(state.last_date)] if state.last_date else close
+        applied = sum(state.update(bar) for bar in new_bars.items())
+        self.logger.debug(f"Applied {applied} bars to indicator state for {symbol}", symbol=symbol)
+        if applied:
+            state.save(path)
+        return state.result(start_date, end_date, self.engine, self.indicator_names)
+
+def frame_payload(frame):
+    """JSON-able OHLCV frame; floats go through json as repr, so a replay sees the exact recorded values"""
+    return {'index': list(frame.index.strftime('%Y-%m-%d')), 'columns': list(frame.columns), 'data': frame.to_numpy(dtype=float).tolist()}
+
+def frame_from_payload(payload):
+    index = pd.DatetimeIndex(pd.to_datetime(payload['index']), name='Date')
+    return pd.DataFrame(payload['data'], index=index, columns=payload['columns'], dtype=float)
@@ -1,14 +1,21 @@
+import numpy as np
+
+def settled_bars(alpha):
+    """Bars after which an adjust=False EMA's older history weighs less than float precision"""
+    return int(np.ceil(np.log(np.finfo(float).eps) / np.log(1 - alpha)))
+
 class TechnicalIndicators:
     def __init__(self, data):
         self.data = data
 
-    def calculate_rsi(prices, window=14):
+    def calculate_rsi(prices, window=14, wilder=False):
         """
         Calculate the Relative Strength Index (RSI) for a given price series
         
         Parameters:
         prices (pandas.Series): Series of closing prices
         window (int): RSI lookback period
+        wilder (bool): Use Wilder smoothing (EMA with alpha=1/window) instead of a simple moving average
         
         Returns:
         float: The RSI value for the last period
@@ -17,15 +24,16 @@ class TechnicalIndicators:
         delta = prices.diff().dropna()
         
         # Separate gains and losses
-        gains = delta.copy()
-        losses = delta.copy()
-        gains[gains < 0] = 0
-        losses[losses > 0] = 0
-        losses = abs(losses)
+        gains = delta.clip(lower=0)
+        losses = -delta.clip(upper=0)
         
         # Calculate average gains and losses
-        avg_gain = gains.rolling(window=window).mean()
-        avg_loss = losses.rolling(window=window).mean()
+        if wilder:
+            avg_gain = gains.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+            avg_loss = losses.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+        else:
+            avg_gain = gains.rolling(window=window).mean()
+            avg_loss = losses.rolling(window=window).mean()
         
         # Calculate RS
         rs = avg_gain / avg_loss
@@ -34,4 +42,82 @@ class TechnicalIndicators:
         rsi = 100 - (100 / (1 + rs))
         
         # Return the last RSI value
-        return rsi.iloc[-1] if not rsi.empty else None
\ No newline at end of file
+        return rsi.iloc[-1] if not rsi.empty else None
+
+    # Latest-only variants: the report only needs each indicator's final value, so these read the
+    # trailing window, or run the EMA recurrences over just the bars that still affect the result,
+    # instead of materializing full-length indicator series. They return NaN where the series
+    # versions would end in NaN.
+
+    @staticmethod
+    def latest_sma(prices, window):
+        """Simple moving average of the trailing window"""
+        prices = np.asarray(prices, dtype=float)
+        return prices[-window:].mean() if len(prices) >= window else np.nan
+
+    @staticmethod
+    def latest_rsi(prices, window=14, wilder=False):
+        """Final RSI value, matching calculate_rsi; None when there are fewer than two prices"""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < 2:
+            return None
+        if not wilder:
+            if len(prices) <= window:
+                return np.nan
+            delta = np.diff(prices[-(window + 1):])
+            avg_gain = delta[delta > 0].sum() / window
+            avg_loss = -delta[delta < 0].sum() / window
+        else:
+            alpha = 1 / window
+            avg_gain = avg_loss = None
+            if len(prices) - 1 < window:
+                return np.nan
+            # Older bars no longer move the averages, so only the settled tail is looped over
+            tail = prices[-(settled_bars(alpha) + 1):]
+            previous = tail[0]
+            for price in tail[1:].tolist():
+                change = price - previous
+                previous = price
+                gain, loss = max(change, 0.0), max(-change, 0.0)
+                avg_gain = gain if avg_gain is None else (1 - alpha) * avg_gain + alpha * gain
+                avg_loss = loss if avg_loss is None else (1 - alpha) * avg_loss + alpha * loss
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(avg_gain) / np.float64(avg_loss)
+            return 100 - (100 / (1 + rs))
+
+    @staticmethod
+    def latest_macd(prices, fast=12, slow=26, signal=9):
+        """Final (macd_line, signal_line, histogram) using adjust=False EMAs as in ta.trend.MACD"""
+        a_fast, a_slow, a_signal = 2 / (fast + 1), 2 / (slow + 1), 2 / (signal + 1)
+        ema_fast = ema_slow = ema_signal = None
+        macd_line, signal_count = np.nan, 0
+        # Only the tail that still moves the slowest EMA, and the signal EMA after its warm-up
+        tail = np.asarray(prices, dtype=float)[-(max(fast, slow) + settled_bars(min(a_fast, a_slow, a_signal))):]
+        for i, price in enumerate(tail.tolist()):
+            ema_fast = price if ema_fast is None else (1 - a_fast) * ema_fast + a_fast * price
+            ema_slow = price if ema_slow is None else (1 - a_slow) * ema_slow + a_slow * price
+            if i + 1 >= max(fast, slow):
+                macd_line = ema_fast - ema_slow
+                ema_signal = macd_line if ema_signal is None else (1 - a_signal) * ema_signal + a_signal * macd_line
+                signal_count += 1
+        signal_line = ema_signal if signal_count >= signal else np.nan
+        return np.float64(macd_line), np.float64(signal_line), np.float64(macd_line - signal_line)
+
+    @staticmethod
+    def latest_bollinger(prices, window=20, window_dev=2):
+        """Final (upper, middle, lower, width) Bollinger values from the trailing window"""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < window:
+            return np.nan, np.nan, np.nan, np.nan
+        tail = prices[-window:]
+        middle, std = tail.mean(), tail.std()
+        upper, lower = middle + window_dev * std, middle - window_dev * std
+        return upper, middle, lower, (upper - lower) / middle * 100
+
+    @staticmethod
+    def latest_volatility(prices):
+        """Sample standard deviation of daily returns over the whole window"""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < 3:
+            return np.nan
+        return np.float64((prices[1:] / prices[:-1] - 1).std(ddof=1))
\ No newline at end of file